@@ -0,0 +1,164 @@
+# analytics.py
+"""Cohort statistics over all users' scores.
+
+Scores are streamed from the database in chunks and reduced into fixed-size
+accumulators, so memory depends on the number of life areas/subcategories,
+never on the number of assessments:
+
+* Stored averages have one decimal between 0.0 and 10.0, i.e. 101 possible
+  values, so each series keeps an exact histogram of "tenths" and every
+  quantile, mean and standard deviation is derived from it.
+* Area correlations keep pairwise-complete sufficient statistics
+  (counts, sums, sums of squares and cross products) per area pair.
+
+Chunks are ``(assessment_id, entity_id, score_tenths)`` integer rows
+ordered by assessment_id.
+"""
+import numpy as np
+
+SCORE_STEPS = 101  # 0.0, 0.1, ..., 10.0
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+class ScoreDistribution:
+    """Exact per-series histograms of scores in tenths."""
+
+    def __init__(self, entity_ids):
+        self.entity_ids = list(entity_ids)
+        self.index = entity_index(self.entity_ids)
+        self.counts = np.zeros((len(self.entity_ids), SCORE_STEPS), dtype=np.int64)
+
+    def add(self, entity_ids, score_tenths):
+        positions = lookup(self.index, entity_ids)
+        valid = (positions >= 0) & (score_tenths >= 0) & (score_tenths < SCORE_STEPS)
+        flat = positions[valid] * SCORE_STEPS + score_tenths[valid]
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def summary(self, quantiles=DEFAULT_QUANTILES) -> list:
+        values = np.arange(SCORE_STEPS) / 10
+        totals = self.counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (self.counts @ values) / totals
+            variances = (self.counts @ values ** 2) / totals - means ** 2
+        cumulative = np.cumsum(self.counts, axis=1)
+
+        results = []
+        for i, entity_id in enumerate(self.entity_ids):
+            total = int(totals[i])
+            result = {'id': entity_id, 'count': total, 'histogram': self.counts[i].tolist()}
+            if total:
+                # Nearest-rank quantiles straight from the cumulative histogram
+                ranks = np.maximum(np.ceil(np.asarray(quantiles) * total), 1)
+                steps = np.searchsorted(cumulative[i], ranks)
+                result.update({
+                    'mean': round(float(means[i]), 2),
+                    'std': round(float(np.sqrt(max(variances[i], 0.0))), 2),
+                    'quantiles': {f'p{round(q * 100)}': float(s) / 10 for q, s in zip(quantiles, steps)}
+                })
+            else:
+                result.update({'mean': None, 'std': None, 'quantiles': {}})
+            results.append(result)
+        return results
+
+
+class CorrelationAccumulator:
+    """Pairwise-complete Pearson correlations between series."""
+
+    def __init__(self, entity_ids):
+        self.entity_ids = list(entity_ids)
+        self.index = entity_index(self.entity_ids)
+        size = len(self.entity_ids)
+        self.pairs = np.zeros((size, size), dtype=np.int64)
+        self.sums = np.zeros((size, size))      # sum of x_i over rows where i and j are present
+        self.squares = np.zeros((size, size))   # sum of x_i**2 over the same rows
+        self.products = np.zeros((size, size))  # sum of x_i * x_j
+
+    def add(self, assessment_ids, entity_ids, score_tenths):
+        positions = lookup(self.index, entity_ids)
+        valid = positions >= 0
+        assessment_ids, positions = assessment_ids[valid], positions[valid]
+        scores = score_tenths[valid] / 10
+
+        # One row per assessment, one column per series
+        rows, row_index = np.unique(assessment_ids, return_inverse=True)
+        present = np.zeros((len(rows), len(self.entity_ids)))
+        values = np.zeros_like(present)
+        present[row_index, positions] = 1
+        values[row_index, positions] = scores
+
+        self.pairs += (present.T @ present).astype(np.int64)
+        self.sums += values.T @ present
+        self.squares += (values ** 2).T @ present
+        self.products += values.T @ values
+
+    def result(self):
+        n = self.pairs.astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = n * self.products - self.sums * self.sums.T
+            spread = (n * self.squares - self.sums ** 2) * (n * self.squares.T - self.sums.T ** 2)
+            matrix = covariance / np.sqrt(spread)
+        matrix[~np.isfinite(matrix)] = np.nan
+        return matrix, self.pairs
+
+
+def entity_index(entity_ids):
+    """Dense array mapping entity id -> position (-1 when unknown)."""
+    index = np.full(max(entity_ids, default=0) + 1, -1, dtype=np.int64)
+    index[list(entity_ids)] = np.arange(len(entity_ids))
+    return index
+
+
+def lookup(index, entity_ids):
+    positions = np.full(len(entity_ids), -1, dtype=np.int64)
+    known = (entity_ids >= 0) & (entity_ids < len(index))
+    positions[known] = index[entity_ids[known]]
+    return positions
+
+
+def complete_assessments(partitions):
+    """Re-chunk row partitions so no assessment is split across chunks.
+
+    Yields ``(assessment_ids, entity_ids, score_tenths)`` int64 arrays.
+    """
+    carry = None
+    for partition in partitions:
+        chunk = np.asarray(partition, dtype=np.int64).reshape(-1, 3)
+        if carry is not None:
+            chunk = np.concatenate((carry, chunk))
+        if not len(chunk):
+            continue
+        # Rows of the last assessment may continue in the next partition
+        split = np.searchsorted(chunk[:, 0], chunk[-1, 0])
+        carry = chunk[split:]
+        if split:
+            yield chunk[:split, 0], chunk[:split, 1], chunk[:split, 2]
+    if carry is not None and len(carry):
+        yield carry[:, 0], carry[:, 1], carry[:, 2]
+
+
+def cohort_statistics(area_partitions, subcategory_partitions, area_ids, subcategory_ids,
+                      quantiles=DEFAULT_QUANTILES):
+    """Distributions per area and subcategory plus the area correlation matrix."""
+    areas = ScoreDistribution(area_ids)
+    correlations = CorrelationAccumulator(area_ids)
+    assessment_count = 0
+    for assessment_ids, entity_ids, score_tenths in complete_assessments(area_partitions):
+        areas.add(entity_ids, score_tenths)
+        correlations.add(assessment_ids, entity_ids, score_tenths)
+        assessment_count += len(np.unique(assessment_ids))
+
+    subcategories = ScoreDistribution(subcategory_ids)
+    for _, entity_ids, score_tenths in complete_assessments(subcategory_partitions):
+        subcategories.add(entity_ids, score_tenths)
+
+    matrix, pairs = correlations.result()
+    return {
+        'assessment_count': assessment_count,
+        'areas': areas.summary(quantiles),
+        'subcategories': subcategories.summary(quantiles),
+        'correlation': {
+            'ids': list(area_ids),
+            'matrix': [[None if np.isnan(r) else round(float(r), 3) for r in row] for row in matrix],
+            'pairs': pairs.tolist()
+        }
+    }
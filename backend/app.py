@@ -1,20 +1,55 @@
 # app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from marshmallow import Schema, fields, ValidationError
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, post_load, pre_load, validate
 from werkzeug.exceptions import HTTPException
-import bcrypt
+import base64
+import binascii
+import click
+import csv
+import functools
+import hashlib
+import hmac
+import io
+import json
 import logging
+import signal
 import sqlalchemy.exc
+import time
 import traceback
-from datetime import datetime, timedelta
+import zlib
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 import os
 from dotenv import load_dotenv
 
+from passwords import (
+    PasswordHasherBusy, PasswordHashingService, BcryptHasher, Argon2Hasher, make_hasher, calibrate
+)
+from analytics import cohort_statistics
+from cache import TTLCache, make_cache
+from metrics import (
+    InstrumentedQueuePool, instrument_app, instrument_pool, observe_password_hash, query_budget, render_metrics,
+    within_query_budget
+)
+from catalog import Catalog, CatalogCache, EncodedPayload, LifeAreaEntry, SubcategoryEntry, QuestionEntry
+from scoring import compute_scores
+from importer import iter_assessments
+from jobs import (
+    DEFAULT_MAX_ATTEMPTS, JOB_STATUSES, enqueue_job, get_job, retry_job, run_next_job, worker_name
+)
+from serialization import OrjsonProvider, row_serializer, serializer
+from upsert import bulk_upsert
+from wire import (
+    CATALOG_VERSION_HEADER, DENSE_BINARY, DENSE_JSON, StaleCatalogVersion, WireFormatError,
+    check_version, decode_binary, decode_dense, encode_binary, encode_dense
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -25,16 +60,39 @@ if missing_vars:
     raise ValueError(f"Missing required environment variables: {missing_vars}")
 
 app = Flask(__name__)
+# orjson-backed jsonify/get_json; encodes datetime, date and Decimal natively
+app.json = OrjsonProvider(app)
+
+def default_db_pool_size() -> int:
+    """Size the per-worker DB pool for the gunicorn worker profile in use.
+
+    Mirrors gunicorn.conf.py: a gthread worker needs one connection per
+    thread; gevent workers run many greenlets, so the pool is capped and
+    excess greenlets wait up to pool_timeout for a connection.
+    """
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+    if worker_class == 'gthread':
+        return int(os.getenv('GUNICORN_THREADS', 8))
+    if worker_class == 'gevent':
+        return min(int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000)), 20)
+    return 5
 
 # Configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 300,
-    'pool_timeout': 20,
-    'max_overflow': 0
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true',
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 300)),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 20)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 0))
 }
+if not os.getenv('DATABASE_URL', '').startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', default_db_pool_size()))
+    })
+# Max SQL statements per route (@query_budget): warn, strict (tests/staging) or off
+app.config['QUERY_BUDGET_MODE'] = os.getenv('QUERY_BUDGET_MODE', 'warn')
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
@@ -43,6 +101,8 @@ DEBUG_MODE = os.getenv('FLASK_DEBUG', 'False').lower() == 'true' or os.getenv('F
 app.config['DEBUG'] = DEBUG_MODE
 
 # SECURITY IMPROVEMENT: Enhanced rate limiting
+# (RATELIMIT_ENABLED=False only for local load testing)
+app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', 'True').lower() == 'true'
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
@@ -55,6 +115,12 @@ limiter = Limiter(
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
 
+# Internal metrics (/api/metrics); disabled unless METRICS_TOKEN is set
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+with app.app_context():
+    instrument_pool(db.engine)
+    instrument_app(app, db.engine)
+
 # SECURITY IMPROVEMENT: More restrictive CORS
 allowed_origins = [
     "https://rdv.embedados.com",
@@ -80,27 +146,177 @@ logger = logging.getLogger(__name__)
 logger.info(f"Application starting in {'DEBUG' if DEBUG_MODE else 'PRODUCTION'} mode")
 logger.info(f"Allowed CORS origins: {allowed_origins}")
 
-# SECURITY IMPROVEMENT: Enhanced input validation schemas
+# SECURITY IMPROVEMENT: Enhanced input validation schemas.
+# Each schema is instantiated once below and reused by every request: building
+# a Schema deep-copies its fields, which cost more than validating the payload.
+ACTION_STATUSES = ('planned', 'in_progress', 'completed', 'cancelled')
+
 class UserRegistrationSchema(Schema):
-    name = fields.Str(required=True, validate=lambda x: 2 <= len(x.strip()) <= 100)
+    name = fields.Str(required=True, validate=validate.Length(min=2, max=100))
     email = fields.Email(required=True)
-    password = fields.Str(required=True, validate=lambda x: len(x) >= 8)
+    password = fields.Str(required=True, validate=validate.Length(min=8))
+
+    @pre_load
+    def strip_name(self, data, **kwargs):
+        if isinstance(data.get('name'), str):
+            data = {**data, 'name': data['name'].strip()}
+        return data
 
 class UserLoginSchema(Schema):
     email = fields.Email(required=True)
-    password = fields.Str(required=True, validate=lambda x: len(x) >= 1)
+    password = fields.Str(required=True, validate=validate.Length(min=1))
 
 class ResponseSchema(Schema):
-    question_id = fields.Int(required=True, validate=lambda x: x > 0)
-    score = fields.Int(required=True, validate=lambda x: 0 <= x <= 10)
+    question_id = fields.Int(required=True, validate=validate.Range(min=1))
+    score = fields.Int(required=True, validate=validate.Range(min=0, max=10))
 
 class ResponsesSchema(Schema):
-    responses = fields.List(fields.Nested(ResponseSchema), required=True, validate=lambda x: len(x) > 0)
+    responses = fields.List(fields.Nested(ResponseSchema), required=True, validate=validate.Length(min=1))
+
+class ActionSchema(Schema):
+    """One action of a plan; `id` refers to a stored action on update"""
+    class Meta:
+        unknown = EXCLUDE  # Actions read back from GET carry created_at/updated_at
+
+    id = fields.Int(strict=True, load_default=None, validate=validate.Range(min=1))
+    action_text = fields.Str(load_default=None)
+    strategy_text = fields.Str(load_default=None)
+    target_date = fields.Date(format='%Y-%m-%d', allow_none=True, load_default=None,
+                              error_messages={'invalid': 'Formato de data inválido. Use YYYY-MM-DD'})
+    status = fields.Str(load_default=None, validate=validate.OneOf(ACTION_STATUSES, error='Status de ação inválido'))
+
+    @pre_load
+    def blank_date_as_none(self, data, **kwargs):
+        if isinstance(data, dict) and data.get('target_date') == '':
+            data = {**data, 'target_date': None}
+        return data
+
+class ContributionPointSchema(Schema):
+    life_area_id = fields.Int(required=True, validate=validate.Range(min=1))
+    points = fields.Int(required=True, validate=validate.Range(min=0, max=100))
+
+def check_action_plan(data) -> dict:
+    """Plan-level rules on top of the per-item schemas, for both load paths"""
+    errors = {}
+    if 'actions' in data:
+        # Incomplete actions (blank rows of the form) are skipped
+        data['actions'] = [a for a in data['actions'] if a['action_text'] and a['strategy_text']]
+        action_ids = [a['id'] for a in data['actions'] if a['id'] is not None]
+        if len(action_ids) != len(set(action_ids)):
+            errors['actions'] = ['Ação repetida no plano']
+    if 'contribution_points' in data:
+        area_ids = [cp['life_area_id'] for cp in data['contribution_points']]
+        if len(area_ids) != len(set(area_ids)):
+            errors['contribution_points'] = ['Área da vida repetida nos pontos de contribuição']
+    if errors:
+        raise ValidationError(errors)
+    return data
 
 class ActionPlanSchema(Schema):
-    focus_area_id = fields.Int(required=True, validate=lambda x: x > 0)
-    actions = fields.List(fields.Dict(), missing=[])
-    contribution_points = fields.List(fields.Dict(), missing=[])
+    focus_area_id = fields.Int(required=True, validate=validate.Range(min=1))
+    actions = fields.List(fields.Nested(ActionSchema), load_default=list)
+    contribution_points = fields.List(fields.Nested(ContributionPointSchema), load_default=list)
+
+    @post_load
+    def check_plan(self, data, **kwargs):
+        return check_action_plan(data)
+
+user_registration_schema = UserRegistrationSchema()
+user_login_schema = UserLoginSchema()
+responses_schema = ResponsesSchema()
+action_plan_schema = ActionPlanSchema()
+# PUT sends only the parts of the plan that change
+ACTION_PLAN_UPDATE_FIELDS = ('focus_area_id', 'actions', 'contribution_points')
+
+# Fast paths: marshmallow spends ~15-25us of generic machinery per list item,
+# which dominates for questionnaires and large plans. These accept only the
+# plain well-formed shape (exact types, no coercion) in one pass and return
+# None for anything else, so the schema still decides every rejection and
+# its error messages.
+RESPONSE_KEYS = {'question_id', 'score'}
+CONTRIBUTION_POINT_KEYS = {'life_area_id', 'points'}
+
+def fast_load_responses(data):
+    responses = data.get('responses') if type(data) is dict else None
+    if type(responses) is not list or not responses or len(data) != 1:
+        return None
+    for response in responses:
+        if type(response) is not dict or response.keys() != RESPONSE_KEYS:
+            return None
+        question_id, score = response['question_id'], response['score']
+        if type(question_id) is not int or type(score) is not int or question_id < 1 or not 0 <= score <= 10:
+            return None
+    return {'responses': responses}
+
+def fast_load_action(action_data):
+    if type(action_data) is not dict:
+        return None
+    action_id = action_data.get('id')
+    action_text = action_data.get('action_text')
+    strategy_text = action_data.get('strategy_text')
+    target_date = action_data.get('target_date')
+    status = action_data.get('status')
+    if not ((action_id is None or type(action_id) is int and action_id >= 1)
+            and (action_text is None or type(action_text) is str)
+            and (strategy_text is None or type(strategy_text) is str)
+            and (status is None or status in ACTION_STATUSES)):
+        return None
+    if target_date == '':
+        target_date = None
+    elif target_date is not None:
+        # Only the exact YYYY-MM-DD form; fromisoformat alone accepts more
+        if type(target_date) is not str or len(target_date) != 10 or target_date[4] != '-' or target_date[7] != '-':
+            return None
+        try:
+            target_date = date.fromisoformat(target_date)
+        except ValueError:
+            return None
+    return {
+        'id': action_id,
+        'action_text': action_text,
+        'strategy_text': strategy_text,
+        'target_date': target_date,
+        'status': status
+    }
+
+def fast_load_action_plan(data, partial=False):
+    if type(data) is not dict or not data.keys() <= set(ACTION_PLAN_UPDATE_FIELDS):
+        return None
+    loaded = {}
+    if 'focus_area_id' in data:
+        focus_area_id = data['focus_area_id']
+        if type(focus_area_id) is not int or focus_area_id < 1:
+            return None
+        loaded['focus_area_id'] = focus_area_id
+    elif not partial:
+        return None
+    actions = data.get('actions', [])
+    if type(actions) is not list:
+        return None
+    if 'actions' in data or not partial:
+        loaded['actions'] = []
+        for action_data in actions:
+            action = fast_load_action(action_data)
+            if action is None:
+                return None
+            loaded['actions'].append(action)
+    contribution_points = data.get('contribution_points', [])
+    if type(contribution_points) is not list:
+        return None
+    if 'contribution_points' in data or not partial:
+        for cp_data in contribution_points:
+            if type(cp_data) is not dict or cp_data.keys() != CONTRIBUTION_POINT_KEYS:
+                return None
+            life_area_id, points = cp_data['life_area_id'], cp_data['points']
+            if type(life_area_id) is not int or type(points) is not int or life_area_id < 1 or not 0 <= points <= 100:
+                return None
+        loaded['contribution_points'] = contribution_points
+    return check_action_plan(loaded)
+
+def load_payload(schema, data, fast_load, **kwargs) -> dict:
+    """Validated request payload; raises ValidationError"""
+    loaded = fast_load(data)
+    return loaded if loaded is not None else schema.load(data, **kwargs)
 
 # Enhanced error handlers
 @app.errorhandler(500)
@@ -169,6 +385,13 @@ def handle_rate_limit(e):
     logger.warning(f"Rate limit exceeded: {request.remote_addr}")
     return jsonify({'error': 'Muitas tentativas. Tente novamente em alguns minutos.'}), 429
 
+@app.errorhandler(PasswordHasherBusy)
+def handle_password_hasher_busy(e):
+    logger.warning(f"Password hashing unavailable: {e} {password_hasher.stats()}")
+    response = jsonify({'error': 'Serviço temporariamente sobrecarregado. Tente novamente em instantes.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @app.errorhandler(401)
 def handle_unauthorized(e):
     return jsonify({'error': 'Não autorizado'}), 401
@@ -206,6 +429,20 @@ def debug_api_call(func):
     wrapper.__name__ = func.__name__
     return wrapper
 
+# Users allowed to call /api/admin/* (comma-separated emails)
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()}
+
+def admin_required(func):
+    """Restrict a @jwt_required route to the users listed in ADMIN_EMAILS"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        user = db.session.get(User, get_jwt_identity())
+        if not user or user.email.lower() not in ADMIN_EMAILS:
+            logger.warning(f"Admin access denied for user {get_jwt_identity()} on {request.path}")
+            return jsonify({'error': 'Acesso negado'}), 403
+        return func(*args, **kwargs)
+    return wrapper
+
 # IMPROVED MODELS with indexes and constraints
 
 class User(db.Model):
@@ -263,6 +500,16 @@ class Question(db.Model):
     def __repr__(self):
         return f'<Question {self.id}>'
 
+class CatalogVersion(db.Model):
+    """Manual catalog version, bumped to force workers to reload the catalog"""
+    __tablename__ = 'catalog_versions'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=1, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<CatalogVersion {self.version}>'
+
 class Assessment(db.Model):
     __tablename__ = 'assessments'
     id = db.Column(db.Integer, primary_key=True)
@@ -272,6 +519,8 @@ class Assessment(db.Model):
     current_area_index = db.Column(db.Integer, default=0, nullable=False)
     started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     completed_at = db.Column(db.DateTime)
+    # Bumped whenever scores or the action plan change; part of response cache keys
+    version = db.Column(db.Integer, default=1, nullable=False)
     user = db.relationship('User', backref='assessments')
 
     __table_args__ = (
@@ -341,6 +590,29 @@ class AreaScore(db.Model):
     def __repr__(self):
         return f'<AreaScore {self.assessment_id}-{self.life_area_id}: {self.average_score}>'
 
+class AssessmentSummary(db.Model):
+    """Denormalized per-assessment listing row, maintained on save/calculate"""
+    __tablename__ = 'assessment_summaries'
+    assessment_id = db.Column(db.Integer, db.ForeignKey('assessments.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.Enum('in_progress', 'completed'), nullable=False)
+    current_area_index = db.Column(db.Integer, default=0, nullable=False)
+    response_count = db.Column(db.Integer, default=0, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    completed_at = db.Column(db.DateTime)
+    area_scores = db.Column(db.JSON, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    assessment = db.relationship('Assessment', backref=db.backref('summary', uselist=False))
+
+    __table_args__ = (
+        db.Index('idx_summary_user_started', 'user_id', 'started_at', 'assessment_id'),
+        db.Index('idx_summary_user_status_completed', 'user_id', 'status', 'completed_at'),
+    )
+
+    def __repr__(self):
+        return f'<AssessmentSummary {self.assessment_id} - {self.status}>'
+
 class ActionPlan(db.Model):
     __tablename__ = 'action_plans'
     id = db.Column(db.Integer, primary_key=True)
@@ -361,7 +633,7 @@ class Action(db.Model):
     action_text = db.Column(db.Text, nullable=False)
     strategy_text = db.Column(db.Text, nullable=False)
     target_date = db.Column(db.Date)
-    status = db.Column(db.Enum('planned', 'in_progress', 'completed', 'cancelled'), default='planned', nullable=False)
+    status = db.Column(db.Enum(*ACTION_STATUSES), default='planned', nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     action_plan = db.relationship('ActionPlan', backref='actions')
@@ -388,6 +660,33 @@ class ActionContributionPoint(db.Model):
     def __repr__(self):
         return f'<ActionContributionPoint {self.action_plan_id}-{self.life_area_id}: {self.contribution_points}>'
 
+class Job(db.Model):
+    """Background job run by `flask jobs-worker` (see jobs.py)"""
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    idempotency_key = db.Column(db.String(191), unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'))
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.Enum(*JOB_STATUSES), default='queued', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=DEFAULT_MAX_ATTEMPTS, nullable=False)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    result = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('idx_job_status_run_after', 'status', 'run_after', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} - {self.status}>'
+
 # Database connection testing
 def test_db_connection():
     try:
@@ -403,27 +702,1010 @@ with app.app_context():
 
 # UTILITY FUNCTIONS
 
-def hash_password(password: str) -> bytes:
-    """Hash password with bcrypt using 12 rounds"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=12))
+# Hashes run in a process pool bounded across all gunicorn workers (lock
+# files in PASSWORD_HASH_SLOTS_DIR) so login bursts fail fast with 503
+# instead of blocking every other request behind ~250ms hashes.
+# Stored hashes embed algorithm and cost; outdated ones are upgraded on login.
+PASSWORD_HASHERS = {
+    'bcrypt': BcryptHasher(rounds=int(os.getenv('BCRYPT_ROUNDS', 12))),
+    'argon2id': Argon2Hasher(
+        time_cost=int(os.getenv('ARGON2_TIME_COST', 3)),
+        memory_cost=int(os.getenv('ARGON2_MEMORY_COST', 65536)),
+        parallelism=int(os.getenv('ARGON2_PARALLELISM', 1))
+    )
+}
+PASSWORD_HASH_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'bcrypt')
+if PASSWORD_HASH_ALGORITHM not in PASSWORD_HASHERS:
+    raise ValueError(f"Unsupported PASSWORD_HASH_ALGORITHM: {PASSWORD_HASH_ALGORITHM}")
+
+# A sync gunicorn worker is tied up for as long as its login waits on a hash,
+# so there the host-wide limit must leave workers free for other requests
+SYNC_WORKERS = os.getenv('GUNICORN_WORKER_CLASS', 'sync') == 'sync'
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0 if SYNC_WORKERS else 4))
+if SYNC_WORKERS and max(PASSWORD_HASH_WORKERS, 1) + PASSWORD_HASH_MAX_PENDING >= int(os.getenv('GUNICORN_WORKERS', 4)):
+    raise ValueError(
+        "With GUNICORN_WORKER_CLASS=sync, PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING must be "
+        "lower than GUNICORN_WORKERS (or use gthread/gevent workers)"
+    )
+
+password_hasher = PasswordHashingService(
+    PASSWORD_HASHERS[PASSWORD_HASH_ALGORITHM],
+    legacy_hashers=PASSWORD_HASHERS.values(),
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT', 10)),
+    slots_dir=os.getenv('PASSWORD_HASH_SLOTS_DIR')
+)
+password_hasher.observers.append(observe_password_hash)
+
+def hash_password(password: str) -> str:
+    """Hash password with the configured algorithm and cost"""
+    return password_hasher.hash(password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Verify password against hash, whichever supported algorithm made it"""
+    return password_hasher.verify(password, password_hash)
+
+def upgrade_password_hash(user, password: str):
+    """Rehash a verified password if its algorithm or cost is outdated"""
+    if not password_hasher.needs_rehash(user.password_hash):
+        return
+    
+    try:
+        user.password_hash = hash_password(password)
+        db.session.commit()
+        logger.info(f"Upgraded password hash for user {user.id} to {password_hasher.hasher.describe()}")
+    except PasswordHasherBusy:
+        # Not worth failing a login over; retry on the next one
+        logger.warning(f"Skipped password hash upgrade for user {user.id}: hashing pool busy")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Password hash upgrade failed for user {user.id}: {e}")
+
+def load_catalog_version() -> str:
+    """Cheap token identifying the current catalog contents.
+
+    Combines row counts, max ids and ordering sums of the catalog tables with
+    the manual version from ``catalog_versions`` in a single round trip.
+    """
+    def stats(id_column, order_column):
+        return [
+            db.select(db.func.count(id_column)).scalar_subquery(),
+            db.select(db.func.max(id_column)).scalar_subquery(),
+            db.select(db.func.sum(order_column)).scalar_subquery(),
+        ]
+    
+    row = db.session.execute(db.select(
+        *stats(LifeArea.id, LifeArea.display_order),
+        *stats(Subcategory.id, Subcategory.display_order),
+        *stats(Question.id, Question.question_order),
+        db.select(db.func.max(CatalogVersion.version)).scalar_subquery()
+    )).one()
+    return hashlib.sha1(repr(tuple(row)).encode('utf-8')).hexdigest()[:16]
+
+def load_catalog(version: str) -> Catalog:
+    """Load the whole area/subcategory/question tree"""
+    areas = [LifeAreaEntry(*row) for row in db.session.query(
+        LifeArea.id, LifeArea.name, LifeArea.description, LifeArea.color, LifeArea.icon, LifeArea.display_order)]
+    subcategories = [SubcategoryEntry(*row) for row in db.session.query(
+        Subcategory.id, Subcategory.name, Subcategory.description, Subcategory.display_order, Subcategory.life_area_id)]
+    questions = [QuestionEntry(*row) for row in db.session.query(
+        Question.id, Question.question_text, Question.question_order, Question.subcategory_id)]
+    
+    logger.info(f"Loaded question catalog {version}: {len(areas)} areas, "
+                f"{len(subcategories)} subcategories, {len(questions)} questions")
+    return Catalog(version, areas, subcategories, questions)
+
+catalog_cache = CatalogCache(
+    load_catalog,
+    load_catalog_version,
+    refresh_interval=int(os.getenv('CATALOG_REFRESH_SECONDS', 60))
+)
+
+def get_catalog() -> Catalog:
+    """Return this worker's catalog snapshot, reloading it if the version changed"""
+    return catalog_cache.get()
+
+# Serialized results/action-plan responses, keyed by assessment id + version
+response_cache = make_cache(
+    os.getenv('RESPONSE_CACHE_BACKEND', 'memory'),
+    max_bytes=int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+    redis_url=os.getenv('REDIS_URL'),
+    ttl=int(os.getenv('RESPONSE_CACHE_TTL', 3600))
+)
+
+def bump_assessment_version(assessment):
+    """Invalidate cached responses for an assessment (applied on flush)"""
+    assessment.version = Assessment.version + 1
+
+def bump_assessment_version_by_id(assessment_id):
+    """bump_assessment_version for an assessment that isn't loaded"""
+    Assessment.query.filter_by(id=assessment_id)\
+        .update({'version': Assessment.version + 1}, synchronize_session=False)
+
+# Per-worker (user_id, assessment_id) -> AssessmentOwnership. Only owned
+# assessments are cached (ownership never changes); the action plan id is a
+# hint that writers re-check in their own WHERE clause.
+AssessmentOwnership = namedtuple('AssessmentOwnership', ['action_plan_id'])
+
+ownership_cache = TTLCache(
+    max_entries=int(os.getenv('OWNERSHIP_CACHE_SIZE', 10000)),
+    ttl=int(os.getenv('OWNERSHIP_CACHE_TTL', 300))
+)
+
+def load_owned_assessment(user_id, assessment_id):
+    """Fetch an assessment with its action plan id in one query.
+
+    Returns ``(assessment, action_plan_id)``, or ``(None, None)`` when the
+    assessment doesn't exist or belongs to someone else.
+    """
+    row = db.session.query(Assessment, ActionPlan.id)\
+        .outerjoin(ActionPlan, ActionPlan.assessment_id == Assessment.id)\
+        .filter(Assessment.id == assessment_id, Assessment.user_id == user_id).first()
+    if row is None:
+        return None, None
+    
+    assessment, action_plan_id = row
+    ownership_cache.set((user_id, assessment_id), AssessmentOwnership(action_plan_id))
+    return assessment, action_plan_id
+
+def get_assessment_ownership(user_id, assessment_id, refresh: bool = False):
+    """AssessmentOwnership if the user owns the assessment, else None.
+
+    Served from ownership_cache when possible, otherwise one query.
+    """
+    key = (user_id, assessment_id)
+    if not refresh:
+        ownership = ownership_cache.get(key)
+        if ownership is not None:
+            return ownership
+    
+    row = db.session.query(Assessment.id, ActionPlan.id)\
+        .outerjoin(ActionPlan, ActionPlan.assessment_id == Assessment.id)\
+        .filter(Assessment.id == assessment_id, Assessment.user_id == user_id).first()
+    if row is None:
+        ownership_cache.delete(key)
+        return None
+    
+    ownership = AssessmentOwnership(row[1])
+    ownership_cache.set(key, ownership)
+    return ownership
+
+def claim_action_plan(user_id, assessment_id, ownership, query_for_plan):
+    """Run a write against the assessment's action plan row, by cached id.
+
+    ``query_for_plan(action_plan_id)`` must execute an UPDATE/DELETE scoped
+    to both the plan id and ``assessment_id`` and return the row count.
+    A stale cached id (plan replaced by another worker) matches no row and
+    is re-resolved once. Returns the plan id, or None if there is no plan.
+    """
+    for refresh in (False, True):
+        if refresh:
+            ownership = get_assessment_ownership(user_id, assessment_id, refresh=True)
+            if ownership is None:
+                return None
+        if ownership.action_plan_id is not None and query_for_plan(ownership.action_plan_id):
+            return ownership.action_plan_id
+    return None
+
+def parse_contribution_points(points_data) -> dict:
+    """Check validated contribution points against the catalog into
+    {life_area_id: points}; raises ValueError with the client message"""
+    points = {cp['life_area_id']: cp['points'] for cp in points_data}
+    if not points.keys() <= get_catalog().area_by_id.keys():
+        raise ValueError('Uma ou mais áreas da vida não existem')
+    total_points = sum(points.values())
+    if total_points != 100:
+        raise ValueError(f'Os pontos de contribuição devem somar 100, obtido {total_points}')
+    return points
+
+def sync_plan_actions(action_plan_id, actions) -> dict:
+    """Apply a plan's new action list as a diff against the stored rows.
+
+    Actions with an id are updated only if a field changed, actions without
+    one are inserted and stored actions left out are deleted: one bulk
+    statement per kind, so unchanged rows keep their ids and created_at.
+    Raises LookupError for ids outside the plan. The caller owns the
+    transaction. Returns counts per kind.
+    """
+    table = Action.__table__
+    existing = {
+        row.id: row for row in db.session.execute(
+            db.select(table.c.id, table.c.action_text, table.c.strategy_text, table.c.target_date, table.c.status)
+            .where(table.c.action_plan_id == action_plan_id)
+        )
+    }
+
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for action in actions:
+        if action['id'] is None:
+            inserts.append({
+                'action_plan_id': action_plan_id,
+                'action_text': action['action_text'],
+                'strategy_text': action['strategy_text'],
+                'target_date': action['target_date'],
+                'status': action['status'] or 'planned',
+                'created_at': now,
+                'updated_at': now
+            })
+            continue
+
+        current = existing.get(action['id'])
+        if current is None:
+            raise LookupError(action['id'])
+        values = {
+            'action_text': action['action_text'],
+            'strategy_text': action['strategy_text'],
+            'target_date': action['target_date'],
+            'status': action['status'] or current.status
+        }
+        if any(getattr(current, column) != value for column, value in values.items()):
+            updates.append({'action_id': action['id'], 'updated_at': now, **values})
+
+    kept = {action['id'] for action in actions}
+    deleted = [action_id for action_id in existing if action_id not in kept]
+
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+    if updates:
+        db.session.execute(table.update().where(table.c.id == db.bindparam('action_id')), updates)
+    if deleted:
+        db.session.execute(table.delete().where(table.c.id.in_(deleted)))
+    return {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deleted)}
+
+def sync_contribution_points(action_plan_id, points: dict) -> dict:
+    """Upsert changed contribution points and delete the removed ones (caller commits)"""
+    table = ActionContributionPoint.__table__
+    existing = dict(db.session.execute(
+        db.select(table.c.life_area_id, table.c.contribution_points)
+        .where(table.c.action_plan_id == action_plan_id)
+    ).all())
+
+    now = datetime.utcnow()
+    changed = [{
+        'action_plan_id': action_plan_id,
+        'life_area_id': life_area_id,
+        'contribution_points': value,
+        'created_at': now,
+        'updated_at': now
+    } for life_area_id, value in points.items() if existing.get(life_area_id) != value]
+    removed = [life_area_id for life_area_id in existing if life_area_id not in points]
+
+    bulk_upsert(
+        db.session, table, changed,
+        conflict_columns=('action_plan_id', 'life_area_id'),
+        update_columns=('contribution_points', 'updated_at')
+    )
+    if removed:
+        db.session.execute(table.delete().where(
+            table.c.action_plan_id == action_plan_id, table.c.life_area_id.in_(removed)
+        ))
+    return {'upserted': len(changed), 'deleted': len(removed)}
+
+def cached_json_response(key: str, build, mimetype: str = 'application/json'):
+    """Serve a JSON body from the response cache with ETag/304 support.
+
+    ``key`` must identify the exact representation (including versions and
+    the media type). ``build()`` returns the payload, or None when there is
+    nothing to serve, in which case None is returned and nothing is cached.
+    """
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+    
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        body = response_cache.get(key)
+        if body is None:
+            payload = build()
+            if payload is None:
+                return None
+            body = jsonify(payload).get_data()
+            response_cache.set(key, body)
+        response = app.response_class(body, mimetype=mimetype)
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+ASSESSMENTS_PAGE_SIZE = 20
+ASSESSMENTS_MAX_PAGE_SIZE = 100
+
+def encode_cursor(started_at: datetime, assessment_id: int) -> str:
+    """Opaque keyset cursor for the (started_at, id) listing order"""
+    raw = f"{started_at.isoformat()}|{assessment_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        started_at, assessment_id = raw.split('|')
+        return datetime.fromisoformat(started_at), int(assessment_id)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def negotiate_encoding(payload: EncodedPayload) -> str:
+    """Pick the best content-coding the client accepts for a precomputed payload"""
+    for encoding in ('br', 'gzip'):
+        if request.accept_encodings[encoding]:
+            return encoding
+    return 'identity'
+
+def encoded_json_response(payload: EncodedPayload, max_age: int = 300):
+    """Serve a precomputed JSON payload with ETag/304 and Cache-Control"""
+    encoding = negotiate_encoding(payload)
+    etag = payload.etag_for(encoding)
+    
+    if any(request.if_none_match.contains(payload.etag_for(e)) for e in ('identity', 'gzip', 'br')):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(payload.body_for(encoding), mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def negotiate_wire_format(*media_types) -> str:
+    """Plain JSON unless the client asks for one of the compact formats (wire.py)"""
+    return request.accept_mimetypes.best_match(('application/json',) + media_types, default='application/json')
+
+def read_compact_scores(catalog) -> dict:
+    """Decode a compact save_responses body into {question_id: score}.
+
+    Raises WireFormatError (StaleCatalogVersion when the client's catalog
+    is outdated).
+    """
+    if request.mimetype == DENSE_BINARY:
+        check_version(request.headers.get(CATALOG_VERSION_HEADER), catalog.version)
+        answers = decode_binary(request.get_data(cache=False), catalog.question_order)
+    else:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise WireFormatError('Corpo JSON inválido')
+        check_version(body.get('catalog_version'), catalog.version)
+        answers = decode_dense(body.get('scores'), catalog.question_order)
+    if not answers:
+        raise WireFormatError('Nenhuma resposta enviada')
+    return answers
+
+def calculate_assessment_scores(assessment_id):
+    """Compute and persist subcategory/area scores for an assessment.
+
+    Response totals come from one grouped query and both score tables are
+    written with one bulk upsert each. The caller owns the transaction.
+    """
+    totals = {
+        row.subcategory_id: (row.score_sum, row.response_count)
+        for row in db.session.query(
+            Question.subcategory_id,
+            db.func.sum(Response.score).label('score_sum'),
+            db.func.count(Response.id).label('response_count')
+        ).join(Question, Response.question_id == Question.id)
+        .filter(Response.assessment_id == assessment_id)
+        .group_by(Question.subcategory_id)
+    }
+    
+    catalog = get_catalog()
+    scores = compute_scores(totals, catalog.subcategories_by_id_order, catalog.areas_by_id_order)
+    
+    now = datetime.utcnow()
+    bulk_upsert(
+        db.session, SubcategoryScore.__table__,
+        [{
+            'assessment_id': assessment_id,
+            'subcategory_id': subcategory_id,
+            'average_score': avg_score,
+            'percentage': percentage,
+            'calculated_at': now
+        } for subcategory_id, (avg_score, percentage) in scores.subcategory_scores.items()],
+        conflict_columns=('assessment_id', 'subcategory_id'),
+        update_columns=('average_score', 'percentage', 'calculated_at')
+    )
+    bulk_upsert(
+        db.session, AreaScore.__table__,
+        [{
+            'assessment_id': assessment_id,
+            'life_area_id': life_area_id,
+            'average_score': avg_score,
+            'percentage': percentage,
+            'calculated_at': now
+        } for life_area_id, (avg_score, percentage) in scores.area_scores.items()],
+        conflict_columns=('assessment_id', 'life_area_id'),
+        update_columns=('average_score', 'percentage', 'calculated_at')
+    )
+    
+    return scores
+
+SUMMARY_COLUMNS = (
+    'user_id', 'title', 'status', 'current_area_index', 'response_count',
+    'started_at', 'completed_at', 'area_scores', 'updated_at'
+)
+
+def quantize(value, places: str) -> float:
+    """Round like the DECIMAL score columns do (half up)"""
+    return float(Decimal(str(value)).quantize(Decimal(places), rounding=ROUND_HALF_UP))
+
+def summary_area_scores(scores) -> list:
+    """Listing area scores from a freshly computed ScoreResult"""
+    catalog = get_catalog()
+    area_ids = sorted(
+        (area_id for area_id in scores.area_scores if area_id in catalog.area_by_id),
+        key=lambda area_id: catalog.area_by_id[area_id].display_order
+    )
+    return [{
+        'area_id': area_id,
+        'area_name': catalog.area_by_id[area_id].name,
+        'score': quantize(scores.area_scores[area_id][0], '0.1'),
+        'percentage': quantize(scores.area_scores[area_id][1], '0.01'),
+        'color': catalog.area_by_id[area_id].color
+    } for area_id in area_ids]
+
+def load_summary_area_scores(assessment_ids) -> dict:
+    """Stored area scores for several assessments, ordered by display_order"""
+    area_scores = {}
+    if not assessment_ids:
+        return area_scores
+    
+    scores = db.session.query(AreaScore, LifeArea)\
+        .join(LifeArea, AreaScore.life_area_id == LifeArea.id)\
+        .filter(AreaScore.assessment_id.in_(assessment_ids))\
+        .order_by(LifeArea.display_order).all()
+    
+    for score, area in scores:
+        area_scores.setdefault(score.assessment_id, []).append({
+            'area_id': score.life_area_id,
+            'area_name': area.name,
+            'score': float(score.average_score),
+            'percentage': float(score.percentage),
+            'color': area.color
+        })
+    return area_scores
+
+def summary_row(assessment, response_count: int, area_scores: list) -> dict:
+    return {
+        'assessment_id': assessment.id,
+        'user_id': assessment.user_id,
+        'title': assessment.title,
+        'status': assessment.status,
+        'current_area_index': assessment.current_area_index,
+        'response_count': response_count,
+        'started_at': assessment.started_at,
+        'completed_at': assessment.completed_at,
+        'area_scores': area_scores,
+        'updated_at': datetime.utcnow()
+    }
+
+def write_assessment_summary(assessment, response_count=None, area_scores=None):
+    """Upsert the summary row for an assessment; the caller owns the transaction.
+
+    Pieces not passed in are recomputed from responses/area_scores.
+    """
+    if response_count is None:
+        response_count = db.session.query(db.func.count(Response.id))\
+            .filter(Response.assessment_id == assessment.id).scalar()
+    if area_scores is None:
+        area_scores = load_summary_area_scores([assessment.id]).get(assessment.id, []) \
+            if assessment.status == 'completed' else []
+    
+    bulk_upsert(
+        db.session, AssessmentSummary.__table__,
+        [summary_row(assessment, response_count, area_scores)],
+        conflict_columns=('assessment_id',),
+        update_columns=SUMMARY_COLUMNS
+    )
+
+def refresh_summary_response_count(assessment_id):
+    """Recount responses in the summary with one statement after a save"""
+    updated = AssessmentSummary.query.filter_by(assessment_id=assessment_id).update({
+        'response_count': db.select(db.func.count(Response.id))
+            .where(Response.assessment_id == assessment_id).scalar_subquery(),
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+    if not updated:
+        write_assessment_summary(db.session.get(Assessment, assessment_id))
+
+def refresh_summary_progress(assessment_id, current_area_index: int):
+    """Mirror a progress change into the summary with one statement"""
+    updated = AssessmentSummary.query.filter_by(assessment_id=assessment_id).update({
+        'current_area_index': current_area_index,
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+    if not updated:
+        write_assessment_summary(db.session.get(Assessment, assessment_id))
+
+def load_assessment_state(user_id, assessment_id):
+    """An owned assessment and its saved answers in one query.
+
+    LEFT JOIN over the (assessment_id, question_id) unique index. Returns
+    ``(assessment, {question_id: score})``, or ``(None, None)`` when the
+    assessment doesn't exist or belongs to someone else.
+    """
+    rows = db.session.query(Assessment, Response.question_id, Response.score)\
+        .outerjoin(Response, Response.assessment_id == Assessment.id)\
+        .filter(Assessment.id == assessment_id, Assessment.user_id == user_id).all()
+    if not rows:
+        return None, None
+    return rows[0][0], {question_id: score for _, question_id, score in rows if question_id is not None}
+
+# Response layouts, compiled once per model (see serialization.serializer)
+assessment_to_dict = serializer('id', 'title', 'status', 'current_area_index', 'started_at', 'completed_at')
+assessment_info_to_dict = serializer('id', 'title', 'status', 'started_at', 'completed_at')
+# Listings select these columns and unpack the rows positionally
+SUMMARY_LIST_COLUMNS = (
+    AssessmentSummary.assessment_id.label('id'), AssessmentSummary.title, AssessmentSummary.status,
+    AssessmentSummary.current_area_index, AssessmentSummary.started_at, AssessmentSummary.completed_at,
+    AssessmentSummary.response_count, AssessmentSummary.area_scores
+)
+AREA_RESULT_COLUMNS = (
+    AreaScore.life_area_id, LifeArea.name.label('life_area_name'),
+    db.func.coalesce(db.func.nullif(LifeArea.color, ''), '#999').label('color'),
+    AreaScore.average_score, AreaScore.percentage
+)
+SUBCATEGORY_RESULT_COLUMNS = (
+    SubcategoryScore.subcategory_id, Subcategory.name.label('subcategory_name'), Subcategory.life_area_id,
+    LifeArea.name.label('life_area_name'), SubcategoryScore.average_score, SubcategoryScore.percentage
+)
+summary_to_dict = row_serializer(*(column.key for column in SUMMARY_LIST_COLUMNS))
+area_result_to_dict = row_serializer(*(column.key for column in AREA_RESULT_COLUMNS))
+subcategory_result_to_dict = row_serializer(*(column.key for column in SUBCATEGORY_RESULT_COLUMNS))
+action_plan_to_dict = serializer('id', 'assessment_id', 'focus_area_id', 'created_at', 'updated_at')
+action_to_dict = serializer('id', 'action_text', 'strategy_text', 'target_date', 'status', 'created_at', 'updated_at')
+contribution_point_to_dict = serializer('life_area_id', ('points', 'contribution_points'))
+
+TRENDS_DEFAULT_WINDOW = 3
+TRENDS_MAX_WINDOW = 12
+
+def load_score_trends(user_id, window: int):
+    """Area and subcategory score history for a user's completed assessments.
+
+    One query: area and subcategory scores are stacked with UNION ALL and
+    LAG/AVG window functions per series supply the previous score and the
+    rolling average over the last ``window`` assessments.
+    """
+    def series(score_model, entity_column, kind):
+        return db.select(
+            db.literal(kind).label('kind'),
+            entity_column.label('entity_id'),
+            Assessment.id.label('assessment_id'),
+            Assessment.completed_at.label('completed_at'),
+            score_model.average_score.label('score'),
+            score_model.percentage.label('percentage')
+        ).join(Assessment, score_model.assessment_id == Assessment.id)\
+            .where(Assessment.user_id == user_id, Assessment.status == 'completed')
+    
+    scores = db.union_all(
+        series(AreaScore, AreaScore.life_area_id, 'area'),
+        series(SubcategoryScore, SubcategoryScore.subcategory_id, 'subcategory')
+    ).subquery()
+    partition = (scores.c.kind, scores.c.entity_id)
+    ordering = (scores.c.completed_at, scores.c.assessment_id)
+    
+    return db.session.execute(db.select(
+        scores,
+        db.func.lag(scores.c.score).over(partition_by=partition, order_by=ordering).label('previous_score'),
+        db.func.avg(scores.c.score).over(
+            partition_by=partition, order_by=ordering, rows=(-(window - 1), 0)
+        ).label('rolling_average')
+    ).order_by(*partition, *ordering)).all()
+
+def build_trends_payload(rows, window: int) -> dict:
+    """Group load_score_trends rows into per-area and per-subcategory series"""
+    catalog = get_catalog()
+    assessments = {}
+    series = {'area': {}, 'subcategory': {}}
+    for row in rows:
+        assessments[row.assessment_id] = row.completed_at
+        series[row.kind].setdefault(row.entity_id, []).append({
+            'assessment_id': row.assessment_id,
+            'completed_at': row.completed_at,
+            'score': row.score,
+            'percentage': row.percentage,
+            'delta': round(float(row.score) - float(row.previous_score), 1)
+                if row.previous_score is not None else None,
+            'rolling_average': round(float(row.rolling_average), 2)
+        })
+    
+    areas = [{
+        'life_area_id': area.id,
+        'life_area_name': area.name,
+        'color': area.color,
+        'points': series['area'][area.id]
+    } for area in catalog.areas if area.id in series['area']]
+    
+    subcategories = [{
+        'subcategory_id': subcategory.id,
+        'subcategory_name': subcategory.name,
+        'life_area_id': area.id,
+        'points': series['subcategory'][subcategory.id]
+    } for area in catalog.areas
+        for subcategory in catalog.subcategories_for(area.id)
+        if subcategory.id in series['subcategory']]
+    
+    return {
+        'window': window,
+        'assessments': [{
+            'id': assessment_id,
+            'completed_at': completed_at
+        } for assessment_id, completed_at in sorted(assessments.items(), key=lambda item: (item[1], item[0]))],
+        'areas': areas,
+        'subcategories': subcategories
+    }
+
+ANALYTICS_CHUNK_SIZE = int(os.getenv('ANALYTICS_CHUNK_SIZE', 10000))
+COHORT_STATS_CACHE_SECONDS = int(os.getenv('COHORT_STATS_CACHE_SECONDS', 300))
+
+def stream_score_tenths(score_model, entity_column, chunk_size: int):
+    """Yield (assessment_id, entity_id, score * 10) rows in chunks, by assessment.
+
+    Rows are fetched with a server-side cursor (yield_per), so only one chunk
+    is held at a time. Scores only exist for calculated, i.e. completed,
+    assessments, so no join is needed.
+    """
+    result = db.session.execute(
+        db.select(
+            score_model.assessment_id,
+            entity_column,
+            db.cast(db.func.round(score_model.average_score * 10), db.Integer)
+        ).order_by(score_model.assessment_id).execution_options(yield_per=chunk_size)
+    )
+    yield from result.partitions()
+
+def compute_cohort_statistics(chunk_size: int = ANALYTICS_CHUNK_SIZE) -> dict:
+    """Population score distributions and area correlations (see analytics.py)"""
+    catalog = get_catalog()
+    stats = cohort_statistics(
+        stream_score_tenths(AreaScore, AreaScore.life_area_id, chunk_size),
+        stream_score_tenths(SubcategoryScore, SubcategoryScore.subcategory_id, chunk_size),
+        [area.id for area in catalog.areas_by_id_order],
+        [subcategory.id for subcategory in catalog.subcategories_by_id_order]
+    )
+    
+    def series_stats(item):
+        return {key: value for key, value in item.items() if key != 'id'}
+    
+    return {
+        'generated_at': datetime.utcnow().isoformat(),
+        'assessment_count': stats['assessment_count'],
+        'histogram_step': 0.1,
+        'areas': [{
+            'life_area_id': item['id'],
+            'life_area_name': catalog.area_by_id[item['id']].name,
+            **series_stats(item)
+        } for item in stats['areas']],
+        'subcategories': [{
+            'subcategory_id': item['id'],
+            'subcategory_name': catalog.subcategory_by_id[item['id']].name,
+            'life_area_id': catalog.subcategory_by_id[item['id']].life_area_id,
+            **series_stats(item)
+        } for item in stats['subcategories']],
+        'area_correlation': {
+            'life_area_ids': stats['correlation']['ids'],
+            'matrix': stats['correlation']['matrix'],
+            'pairs': stats['correlation']['pairs']
+        }
+    }
 
-def verify_password(password: str, password_hash: bytes) -> bool:
-    """Verify password against hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash)
+EXPORT_CHUNK_ROWS = 500
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+def export_record_queries(user_id) -> list:
+    """(record_type, select) pairs covering everything stored for a user"""
+    assessment_ids = db.select(Assessment.id).where(Assessment.user_id == user_id)
+    plan_ids = db.select(ActionPlan.id).where(ActionPlan.assessment_id.in_(assessment_ids))
+    
+    def rows(model, condition):
+        table = model.__table__
+        return db.select(*table.c).where(condition).order_by(table.c.id)
+    
+    return [
+        ('user', db.select(*[c for c in User.__table__.c if c.name != 'password_hash'])
+            .where(User.id == user_id)),
+        ('assessment', rows(Assessment, Assessment.user_id == user_id)),
+        ('response', rows(Response, Response.assessment_id.in_(assessment_ids))),
+        ('subcategory_score', rows(SubcategoryScore, SubcategoryScore.assessment_id.in_(assessment_ids))),
+        ('area_score', rows(AreaScore, AreaScore.assessment_id.in_(assessment_ids))),
+        ('action_plan', rows(ActionPlan, ActionPlan.assessment_id.in_(assessment_ids))),
+        ('action', rows(Action, Action.action_plan_id.in_(plan_ids))),
+        ('contribution_point', rows(ActionContributionPoint, ActionContributionPoint.action_plan_id.in_(plan_ids)))
+    ]
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def iter_export_lines(user_id, export_format: str):
+    """Serialize a user's records one line at a time.
+
+    Each query is read through a server-side cursor (yield_per), so at most
+    EXPORT_CHUNK_ROWS rows are in memory. CSV output is one table: a
+    ``type`` column plus the union of all record columns.
+    """
+    queries = export_record_queries(user_id)
+    
+    if export_format == 'csv':
+        columns = ['type']
+        for _, query in queries:
+            columns.extend(name for name in query.selected_columns.keys() if name not in columns)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+    
+    for record_type, query in queries:
+        result = db.session.execute(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        for row in result.mappings():
+            record = {'type': record_type}
+            record.update((key, export_value(value)) for key, value in row.items())
+            
+            if export_format == 'csv':
+                writer.writerow(record)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield app.json.dumps(record) + '\n'
+
+def iter_export_chunks(lines, compress: bool):
+    """Group lines into ~EXPORT_FLUSH_BYTES chunks, gzip-compressed on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    pending = []
+    pending_bytes = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        pending.append(data)
+        pending_bytes += len(data)
+        if pending_bytes >= EXPORT_FLUSH_BYTES:
+            chunk = b''.join(pending)
+            pending = []
+            pending_bytes = 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+    
+    chunk = b''.join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+IMPORT_BATCH_SIZE = 500
+# Users created by the importer cannot log in until their password is reset
+IMPORTED_PASSWORD_HASH = '!imported'
+
+def next_row_id(model) -> int:
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+def resolve_import_users(records, known_users: dict, create_users: bool):
+    """Look up (and optionally create) the users of a batch.
+
+    Returns the email -> id entries not yet in known_users and the number of
+    users created; the caller owns the transaction and merges the entries
+    once it commits.
+    """
+    emails = {record.user_email for record in records} - known_users.keys()
+    if not emails:
+        return {}, 0
+
+    found = dict(db.session.query(User.email, User.id).filter(User.email.in_(emails)))
+    missing = sorted(emails - found.keys())
+    if missing and create_users:
+        names = {}
+        for record in records:
+            names.setdefault(record.user_email, record.user_name)
+        first_id = next_row_id(User)
+        now = datetime.utcnow()
+        rows = [{
+            'id': first_id + i,
+            'email': email,
+            'password_hash': IMPORTED_PASSWORD_HASH,
+            'name': names[email],
+            'created_at': now,
+            'updated_at': now
+        } for i, email in enumerate(missing)]
+        db.session.execute(User.__table__.insert(), rows)
+        found.update((row['email'], row['id']) for row in rows)
+        return found, len(rows)
+    return found, 0
+
+def import_assessment_batch(records, user_ids: dict) -> dict:
+    """Insert a batch of validated ImportedAssessment records.
+
+    Ids are allocated from MAX(id) so every table is written with one
+    multi-row INSERT (no per-row round trips to fetch generated keys). Scores
+    come from the shared scoring engine over the in-memory response totals,
+    so they match what /calculate would store. The caller owns the
+    transaction. Returns row counts per table.
+    """
+    catalog = get_catalog()
+    default_title = Assessment.title.default.arg
+    last_area_index = len(catalog.areas) - 1
+    now = datetime.utcnow()
+    assessment_id = next_row_id(Assessment)
+
+    rows = {name: [] for name in ('assessments', 'responses', 'subcategory_scores', 'area_scores', 'summaries')}
+    for record in records:
+        completed = record.completed_at is not None
+        assessment = Assessment(
+            id=assessment_id,
+            user_id=user_ids[record.user_email],
+            title=record.title or default_title,
+            status='completed' if completed else 'in_progress',
+            current_area_index=last_area_index if completed else 0,
+            started_at=record.started_at,
+            completed_at=record.completed_at,
+            version=1
+        )
+        rows['assessments'].append({
+            column.name: getattr(assessment, column.key) for column in Assessment.__table__.columns
+        })
+
+        totals = {}
+        answered_at = record.completed_at or record.started_at
+        for question_id, score in record.responses.items():
+            subcategory_id = catalog.question_subcategory[question_id]
+            score_sum, count = totals.get(subcategory_id, (0, 0))
+            totals[subcategory_id] = (score_sum + score, count + 1)
+            rows['responses'].append({
+                'assessment_id': assessment_id,
+                'question_id': question_id,
+                'score': score,
+                'created_at': answered_at,
+                'updated_at': answered_at
+            })
+
+        area_scores = []
+        if completed:
+            scores = compute_scores(totals, catalog.subcategories_by_id_order, catalog.areas_by_id_order)
+            rows['subcategory_scores'].extend({
+                'assessment_id': assessment_id,
+                'subcategory_id': subcategory_id,
+                'average_score': avg_score,
+                'percentage': percentage,
+                'calculated_at': now
+            } for subcategory_id, (avg_score, percentage) in scores.subcategory_scores.items())
+            rows['area_scores'].extend({
+                'assessment_id': assessment_id,
+                'life_area_id': life_area_id,
+                'average_score': avg_score,
+                'percentage': percentage,
+                'calculated_at': now
+            } for life_area_id, (avg_score, percentage) in scores.area_scores.items())
+            area_scores = summary_area_scores(scores)
+        rows['summaries'].append(summary_row(assessment, len(record.responses), area_scores))
+        assessment_id += 1
+
+    for name, table in (
+        ('assessments', Assessment.__table__),
+        ('responses', Response.__table__),
+        ('subcategory_scores', SubcategoryScore.__table__),
+        ('area_scores', AreaScore.__table__),
+        ('summaries', AssessmentSummary.__table__),
+    ):
+        if rows[name]:
+            db.session.execute(table.insert(), rows[name])
+    return {name: len(table_rows) for name, table_rows in rows.items()}
+
+# Background jobs: `flask jobs-worker` runs these handlers, payload -> result
+CALCULATE_MODE = os.getenv('CALCULATE_MODE', 'sync')
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 300))
+IDEMPOTENCY_KEY_MAX_LENGTH = 100
+
+def complete_assessment(assessment):
+    """Persist scores and mark the assessment completed; the caller owns the transaction"""
+    scores = calculate_assessment_scores(assessment.id)
+    assessment.status = 'completed'
+    assessment.completed_at = datetime.utcnow()
+    bump_assessment_version(assessment)
+    write_assessment_summary(
+        assessment,
+        response_count=scores.response_count,
+        area_scores=summary_area_scores(scores)
+    )
+    return scores
+
+def run_calculate_job(payload) -> dict:
+    assessment = Assessment.query.filter_by(id=payload['assessment_id'], user_id=payload['user_id']).first()
+    if not assessment:
+        raise LookupError(f"Assessment {payload['assessment_id']} not found")
+    scores = complete_assessment(assessment)
+    return {'assessment_id': assessment.id, 'response_count': scores.response_count}
+
+JOB_HANDLERS = {
+    'calculate_scores': run_calculate_job,
+}
+
+def wants_async() -> bool:
+    """Async via `Prefer: respond-async` or ?mode=async; CALCULATE_MODE sets the default"""
+    if 'respond-async' in request.headers.get('Prefer', ''):
+        return True
+    return request.args.get('mode', CALCULATE_MODE) == 'async'
+
+def job_to_dict(job) -> dict:
+    data = {
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'max_attempts': job['max_attempts'],
+        'created_at': job['created_at'],
+        'finished_at': job.get('finished_at'),
+        'status_url': f"/api/jobs/{job['id']}"
+    }
+    if job['status'] == 'failed':
+        data['error'] = 'Falha ao processar tarefa'
+    if job['status'] == 'succeeded' and job['kind'] == 'calculate_scores':
+        data['result_url'] = f"/api/assessments/{job['payload']['assessment_id']}/results"
+    return data
+
+def enqueue_calculation(user_id, assessment):
+    """Queue calculate_scores and answer 202 with the job status URL.
+
+    Repeated requests return the same job: per client Idempotency-Key, or
+    per assessment version (bumped when a calculation succeeds).
+    """
+    client_key = request.headers.get('Idempotency-Key')
+    if client_key is not None and not 0 < len(client_key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        return jsonify({'error': 'Idempotency-Key inválida'}), 400
+    idempotency_key = f"calculate:{user_id}:{client_key}" if client_key \
+        else f"calculate:{assessment.id}:v{assessment.version}"
+    
+    try:
+        job, created = enqueue_job(
+            db.session, Job.__table__, 'calculate_scores',
+            {'assessment_id': assessment.id, 'user_id': user_id},
+            idempotency_key=idempotency_key, user_id=user_id
+        )
+        if not created and job['status'] == 'failed' and not client_key:
+            retry_job(db.session, Job.__table__, job['id'])
+            db.session.commit()
+            job = get_job(db.session, Job.__table__, job['id'])
+        
+        logger.info(f"{'Queued' if created else 'Reused'} job {job['id']} to calculate assessment {assessment.id}")
+        response = jsonify(job_to_dict(job))
+        response.status_code = 202
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error queueing calculation for assessment {assessment.id}: {e}")
+        return jsonify({'error': 'Erro ao agendar cálculo'}), 500
 
 # ROUTES
 
 @app.route('/api/health', methods=['GET'])
+@query_budget(1)
 def health_check():
     """Health check endpoint"""
     try:
         db.session.execute(db.text('SELECT 1'))
-        return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()}), 200
+        return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow()}), 200
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 503
 
+@app.route('/api/metrics', methods=['GET'])
+@query_budget(0)
+@limiter.exempt
+def get_metrics():
+    """Prometheus metrics for internal scraping (Bearer METRICS_TOKEN)"""
+    expected = f'Bearer {METRICS_TOKEN}' if METRICS_TOKEN else None
+    provided = request.headers.get('Authorization', '')
+    if not expected or not hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+        return jsonify({'error': 'Recurso não encontrado'}), 404
+
+    body, content_type = render_metrics()
+    return app.response_class(body, mimetype=None, content_type=content_type)
+
 @app.route('/api/debug/test-error')
+@query_budget(0)
 def debug_test_error():
     """Test endpoint to verify error handling works"""
     if DEBUG_MODE:
@@ -443,12 +1725,12 @@ def debug_test_error():
         return jsonify({'error': 'Debug mode disabled'}), 403
 
 @app.route('/api/auth/register', methods=['POST'])
+@query_budget(3)
 @limiter.limit("5 per minute")
 def register():
     """User registration endpoint"""
-    schema = UserRegistrationSchema()
     try:
-        data = schema.load(request.get_json() or {})
+        data = user_registration_schema.load(request.get_json() or {})
     except ValidationError as err:
         return jsonify({'error': 'Dados inválidos', 'details': err.messages}), 400
     
@@ -497,12 +1779,12 @@ def register():
         return jsonify({'error': 'Erro ao criar usuário'}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
+@query_budget(3)
 @limiter.limit("10 per minute")
 def login():
     """User login endpoint"""
-    schema = UserLoginSchema()
     try:
-        data = schema.load(request.get_json() or {})
+        data = user_login_schema.load(request.get_json() or {})
     except ValidationError as err:
         return jsonify({'error': 'Dados inválidos', 'details': err.messages}), 400
     
@@ -510,6 +1792,7 @@ def login():
     user = User.query.filter_by(email=email).first()
     
     if user and verify_password(data['password'], user.password_hash):
+        upgrade_password_hash(user, data['password'])
         access_token = create_access_token(identity=user.id)
         logger.info(f"User logged in: {email}")
         return jsonify({
@@ -524,116 +1807,103 @@ def login():
     logger.warning(f"Failed login attempt for: {email}")
     return jsonify({'error': 'Credenciais inválidas'}), 401
 
+@app.route('/api/questionnaire', methods=['GET'])
+@query_budget(4)
+def get_questionnaire():
+    """Get the full life area -> subcategory -> question tree in one response"""
+    try:
+        return encoded_json_response(get_catalog().questionnaire)
+    except Exception as e:
+        logger.error(f"Error fetching questionnaire: {e}")
+        return jsonify({'error': 'Erro ao buscar questionário'}), 500
+
 @app.route('/api/life-areas', methods=['GET'])
+@query_budget(4)
 def get_life_areas():
     """Get all life areas"""
     try:
-        areas = LifeArea.query.order_by(LifeArea.display_order, LifeArea.name).all()
-        return jsonify([{
-            'id': area.id,
-            'name': area.name,
-            'description': area.description,
-            'color': area.color,
-            'icon': area.icon,
-            'display_order': area.display_order
-        } for area in areas])
+        return encoded_json_response(get_catalog().life_areas_json)
     except Exception as e:
         logger.error(f"Error fetching life areas: {e}")
         return jsonify({'error': 'Erro ao buscar áreas da vida'}), 500
 
 @app.route('/api/life-areas/<int:area_id>/subcategories', methods=['GET'])
+@query_budget(4)
 def get_area_subcategories(area_id):
     """Get subcategories for a specific life area"""
     try:
+        catalog = get_catalog()
+        
         # Verify life area exists
-        life_area = LifeArea.query.get(area_id)
-        if not life_area:
+        if area_id not in catalog.area_by_id:
             return jsonify({'error': 'Área da vida não encontrada'}), 404
         
-        subcategories = Subcategory.query.filter_by(life_area_id=area_id)\
-            .order_by(Subcategory.display_order, Subcategory.name).all()
-        
-        return jsonify([{
-            'id': sub.id,
-            'name': sub.name,
-            'description': sub.description,
-            'display_order': sub.display_order,
-            'life_area_id': sub.life_area_id
-        } for sub in subcategories])
+        return encoded_json_response(catalog.subcategories_json[area_id])
     except Exception as e:
         logger.error(f"Error fetching subcategories for area {area_id}: {e}")
         return jsonify({'error': 'Erro ao buscar subcategorias'}), 500
 
 @app.route('/api/subcategories/<int:subcategory_id>/questions', methods=['GET'])
+@query_budget(4)
 def get_subcategory_questions(subcategory_id):
     """Get questions for a specific subcategory"""
     try:
+        catalog = get_catalog()
+        
         # Verify subcategory exists
-        subcategory = Subcategory.query.get(subcategory_id)
-        if not subcategory:
+        if subcategory_id not in catalog.subcategory_by_id:
             return jsonify({'error': 'Subcategoria não encontrada'}), 404
         
-        questions = Question.query.filter_by(subcategory_id=subcategory_id)\
-            .order_by(Question.question_order, Question.id).all()
-        
-        return jsonify([{
-            'id': q.id,
-            'question_text': q.question_text,
-            'question_order': q.question_order,
-            'subcategory_id': q.subcategory_id
-        } for q in questions])
+        return encoded_json_response(catalog.questions_json[subcategory_id])
     except Exception as e:
         logger.error(f"Error fetching questions for subcategory {subcategory_id}: {e}")
         return jsonify({'error': 'Erro ao buscar questões'}), 500
 
 @app.route('/api/user/assessments', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def get_user_assessments():
-    """Get all assessments for the current user"""
+    """Get a page of assessments for the current user, newest first"""
     user_id = get_jwt_identity()
     
+    limit = min(max(request.args.get('limit', ASSESSMENTS_PAGE_SIZE, type=int), 1), ASSESSMENTS_MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor')
+    
     try:
-        assessments = Assessment.query.filter_by(user_id=user_id)\
-            .order_by(Assessment.started_at.desc()).all()
+        query = db.session.query(*SUMMARY_LIST_COLUMNS).filter(AssessmentSummary.user_id == user_id)
+        
+        # Keyset pagination on (started_at, id), newest first
+        if cursor:
+            try:
+                cursor_started_at, cursor_id = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Cursor inválido'}), 400
+            query = query.filter(db.or_(
+                AssessmentSummary.started_at < cursor_started_at,
+                db.and_(AssessmentSummary.started_at == cursor_started_at,
+                        AssessmentSummary.assessment_id < cursor_id)
+            ))
+        
+        summaries = query.order_by(AssessmentSummary.started_at.desc(), AssessmentSummary.assessment_id.desc())\
+            .limit(limit + 1).all()
+        has_more = len(summaries) > limit
+        summaries = summaries[:limit]
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(summaries[-1].started_at, summaries[-1].id)
         
-        assessment_list = []
-        for assessment in assessments:
-            # Count total responses for this assessment
-            response_count = Response.query.filter_by(assessment_id=assessment.id).count()
-            
-            # Get area scores if completed
-            area_scores = []
-            if assessment.status == 'completed':
-                scores = db.session.query(AreaScore, LifeArea)\
-                    .join(LifeArea, AreaScore.life_area_id == LifeArea.id)\
-                    .filter(AreaScore.assessment_id == assessment.id)\
-                    .order_by(LifeArea.display_order).all()
-                
-                area_scores = [{
-                    'area_id': score.life_area_id,
-                    'area_name': area.name,
-                    'score': float(score.average_score),
-                    'percentage': float(score.percentage),
-                    'color': area.color
-                } for score, area in scores]
-            
-            assessment_list.append({
-                'id': assessment.id,
-                'title': assessment.title,
-                'status': assessment.status,
-                'current_area_index': assessment.current_area_index,
-                'started_at': assessment.started_at.isoformat(),
-                'completed_at': assessment.completed_at.isoformat() if assessment.completed_at else None,
-                'response_count': response_count,
-                'area_scores': area_scores
-            })
-        
-        return jsonify(assessment_list)
+        return jsonify({
+            'assessments': [summary_to_dict(summary) for summary in summaries],
+            'next_cursor': next_cursor
+        })
     except Exception as e:
         logger.error(f"Error fetching assessments for user {user_id}: {e}")
         return jsonify({'error': 'Erro ao buscar avaliações'}), 500
 
 @app.route('/api/assessments/start', methods=['POST'])
+@app.route('/api/assessments/continue-or-create', methods=['POST'])
+@query_budget(4)
 @jwt_required()
 def start_assessment():
     """Start a new assessment or continue an existing one"""
@@ -649,13 +1919,15 @@ def start_assessment():
                 'title': in_progress.title,
                 'status': in_progress.status,
                 'current_area_index': in_progress.current_area_index,
-                'started_at': in_progress.started_at.isoformat(),
+                'started_at': in_progress.started_at,
                 'is_continuation': True
             })
         
         # Create new assessment
         assessment = Assessment(user_id=user_id)
         db.session.add(assessment)
+        db.session.flush()
+        write_assessment_summary(assessment, response_count=0, area_scores=[])
         db.session.commit()
         
         logger.info(f"Created new assessment {assessment.id} for user {user_id}")
@@ -665,7 +1937,7 @@ def start_assessment():
             'title': assessment.title,
             'status': assessment.status,
             'current_area_index': 0,
-            'started_at': assessment.started_at.isoformat(),
+            'started_at': assessment.started_at,
             'is_continuation': False
         }), 201
     except Exception as e:
@@ -674,6 +1946,7 @@ def start_assessment():
         return jsonify({'error': 'Erro ao iniciar avaliação'}), 500
 
 @app.route('/api/assessments', methods=['POST'])
+@query_budget(3)
 @jwt_required()
 def create_assessment():
     """Create a new assessment (legacy endpoint)"""
@@ -682,6 +1955,8 @@ def create_assessment():
     try:
         assessment = Assessment(user_id=user_id)
         db.session.add(assessment)
+        db.session.flush()
+        write_assessment_summary(assessment, response_count=0, area_scores=[])
         db.session.commit()
         
         logger.info(f"Created assessment {assessment.id} for user {user_id}")
@@ -690,7 +1965,7 @@ def create_assessment():
             'id': assessment.id,
             'title': assessment.title,
             'status': assessment.status,
-            'started_at': assessment.started_at.isoformat()
+            'started_at': assessment.started_at
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -698,63 +1973,80 @@ def create_assessment():
         return jsonify({'error': 'Erro ao criar avaliação'}), 500
 
 @app.route('/api/assessments/<int:assessment_id>/responses', methods=['POST'])
+@query_budget(7)
 @jwt_required()
 @limiter.limit("50 per minute")
 def save_responses(assessment_id):
     """Save responses for an assessment"""
     user_id = get_jwt_identity()
     
-    # Input validation
-    schema = ResponsesSchema()
-    try:
-        data = schema.load(request.get_json() or {})
-    except ValidationError as err:
-        return jsonify({'error': 'Dados inválidos', 'details': err.messages}), 400
+    # Input validation: compact dense scores (wire.py) or a list of objects
+    catalog = get_catalog()
+    compact = request.mimetype in (DENSE_JSON, DENSE_BINARY)
+    if compact:
+        try:
+            scores_by_question = read_compact_scores(catalog)
+        except StaleCatalogVersion:
+            return jsonify({'error': 'Versão do catálogo desatualizada', 'catalog_version': catalog.version}), 409
+        except WireFormatError as e:
+            return jsonify({'error': 'Dados inválidos', 'details': str(e)}), 400
+    else:
+        try:
+            data = load_payload(responses_schema, request.get_json() or {}, fast_load_responses)
+        except ValidationError as err:
+            return jsonify({'error': 'Dados inválidos', 'details': err.messages}), 400
     
     # Verify assessment ownership
-    assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
-    if not assessment:
+    if not get_assessment_ownership(user_id, assessment_id):
         logger.warning(f"Assessment {assessment_id} not found for user {user_id}")
         return jsonify({'error': 'Avaliação não encontrada'}), 404
     
     try:
-        saved_count = 0
-        for response_data in data['responses']:
-            if response_data.get('score') is None:
-                logger.warning(f"Skipping response for question {response_data.get('question_id')} due to null score")
-                continue
+        if compact:
+            saved_count, skipped_count = len(scores_by_question), 0
+        else:
+            # Validate every question id against the catalog in one step; later
+            # entries for the same question win, as they did with per-row updates
+            valid_question_ids = catalog.question_ids
+            scores_by_question = {}
+            skipped_count = 0
+            for response_data in data['responses']:
+                if response_data.get('score') is None:
+                    logger.warning(f"Skipping response for question {response_data.get('question_id')} due to null score")
+                    skipped_count += 1
+                    continue
                 
-            # Verify question exists
-            question = Question.query.get(response_data['question_id'])
-            if not question:
-                logger.warning(f"Question {response_data['question_id']} not found")
-                continue
-            
-            # Use merge for upsert functionality
-            existing_response = Response.query.filter_by(
-                assessment_id=assessment_id,
-                question_id=response_data['question_id']
-            ).first()
-            
-            if existing_response:
-                existing_response.score = response_data['score']
-                existing_response.updated_at = datetime.utcnow()
-            else:
-                response = Response(
-                    assessment_id=assessment_id,
-                    question_id=response_data['question_id'],
-                    score=response_data['score']
-                )
-                db.session.add(response)
+                if response_data['question_id'] not in valid_question_ids:
+                    logger.warning(f"Question {response_data['question_id']} not found")
+                    skipped_count += 1
+                    continue
+                
+                scores_by_question[response_data['question_id']] = response_data['score']
             
-            saved_count += 1
+            saved_count = len(data['responses']) - skipped_count
+        
+        now = datetime.utcnow()
+        bulk_upsert(
+            db.session, Response.__table__,
+            [{
+                'assessment_id': assessment_id,
+                'question_id': question_id,
+                'score': score,
+                'created_at': now,
+                'updated_at': now
+            } for question_id, score in scores_by_question.items()],
+            conflict_columns=('assessment_id', 'question_id'),
+            update_columns=('score', 'updated_at')
+        )
+        refresh_summary_response_count(assessment_id)
         
         db.session.commit()
         
         logger.info(f"Saved {saved_count} responses for assessment {assessment_id}")
         return jsonify({
             'message': 'Respostas salvas com sucesso',
-            'saved_count': saved_count
+            'saved_count': saved_count,
+            'skipped_count': skipped_count
         }), 200
         
     except sqlalchemy.exc.IntegrityError as ie:
@@ -766,120 +2058,172 @@ def save_responses(assessment_id):
         logger.error(f"Failed to save responses for assessment {assessment_id}: {str(e)}")
         return jsonify({'error': 'Falha ao salvar respostas. Tente novamente.'}), 500
 
+@app.route('/api/assessments/<int:assessment_id>', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def get_assessment(assessment_id):
+    """Get an assessment's details and progress"""
+    user_id = get_jwt_identity()
+    
+    try:
+        assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
+        if not assessment:
+            return jsonify({'error': 'Avaliação não encontrada'}), 404
+        return jsonify(assessment_to_dict(assessment))
+    except Exception as e:
+        logger.error(f"Error fetching assessment {assessment_id}: {e}")
+        return jsonify({'error': 'Erro ao buscar avaliação'}), 500
+
+@app.route('/api/assessments/<int:assessment_id>/responses', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def get_responses(assessment_id):
+    """Get the answers saved so far"""
+    user_id = get_jwt_identity()
+    
+    try:
+        assessment, answers = load_assessment_state(user_id, assessment_id)
+        if not assessment:
+            return jsonify({'error': 'Avaliação não encontrada'}), 404
+        return jsonify({
+            'responses': [{'question_id': question_id, 'score': score} for question_id, score in answers.items()]
+        })
+    except Exception as e:
+        logger.error(f"Error fetching responses for assessment {assessment_id}: {e}")
+        return jsonify({'error': 'Erro ao buscar respostas'}), 500
+
+@app.route('/api/assessments/<int:assessment_id>/resume', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def resume_assessment(assessment_id):
+    """Everything needed to continue an assessment: details, progress and answers"""
+    user_id = get_jwt_identity()
+    
+    try:
+        assessment, answers = load_assessment_state(user_id, assessment_id)
+        if not assessment:
+            return jsonify({'error': 'Avaliação não encontrada'}), 404
+        return jsonify({
+            'assessment': assessment_to_dict(assessment),
+            'current_area_index': assessment.current_area_index,
+            'responses': answers
+        })
+    except Exception as e:
+        logger.error(f"Error resuming assessment {assessment_id}: {e}")
+        return jsonify({'error': 'Erro ao carregar avaliação'}), 500
+
+@app.route('/api/assessments/<int:assessment_id>/progress', methods=['PATCH'])
+@query_budget(5)
+@jwt_required()
+@limiter.limit("50 per minute")
+def update_progress(assessment_id):
+    """Save the area the user is on"""
+    user_id = get_jwt_identity()
+    
+    current_area_index = (request.get_json(silent=True) or {}).get('current_area_index')
+    if not isinstance(current_area_index, int) or isinstance(current_area_index, bool) \
+            or not 0 <= current_area_index < len(get_catalog().areas):
+        return jsonify({'error': 'Índice de área inválido'}), 400
+    
+    try:
+        updated = Assessment.query.filter_by(id=assessment_id, user_id=user_id, status='in_progress')\
+            .update({'current_area_index': current_area_index}, synchronize_session=False)
+        if not updated:
+            if Assessment.query.filter_by(id=assessment_id, user_id=user_id).count():
+                return jsonify({'error': 'Avaliação já concluída'}), 409
+            return jsonify({'error': 'Avaliação não encontrada'}), 404
+        
+        refresh_summary_progress(assessment_id, current_area_index)
+        db.session.commit()
+        
+        return jsonify({'id': assessment_id, 'current_area_index': current_area_index})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to update progress for assessment {assessment_id}: {e}")
+        return jsonify({'error': 'Falha ao salvar progresso. Tente novamente.'}), 500
+
 @app.route('/api/assessments/<int:assessment_id>/calculate', methods=['POST'])
+@query_budget(10)
 @jwt_required()
 def calculate_scores(assessment_id):
-    """Calculate scores for an assessment"""
+    """Calculate scores for an assessment (or queue the calculation, see wants_async)"""
     user_id = get_jwt_identity()
     
     assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
     if not assessment:
         return jsonify({'error': 'Avaliação não encontrada'}), 404
     
+    if wants_async():
+        return enqueue_calculation(user_id, assessment)
+    
     try:
-        # Calculate scores for each subcategory first
-        subcategories = Subcategory.query.all()
-        subcategory_results = []
-        
-        for subcategory in subcategories:
-            # Get all responses for this subcategory's questions
-            responses = db.session.query(Response)\
-                .join(Question, Response.question_id == Question.id)\
-                .filter(
-                    Response.assessment_id == assessment_id,
-                    Question.subcategory_id == subcategory.id
-                ).all()
-            
-            if responses:
-                avg_score = sum(r.score for r in responses) / len(responses)
-                percentage = (avg_score / 10) * 100
-                
-                # Save or update subcategory score
-                existing_score = SubcategoryScore.query.filter_by(
-                    assessment_id=assessment_id,
-                    subcategory_id=subcategory.id
-                ).first()
-                
-                if existing_score:
-                    existing_score.average_score = avg_score
-                    existing_score.percentage = percentage
-                    existing_score.calculated_at = datetime.utcnow()
-                else:
-                    subcategory_score = SubcategoryScore(
-                        assessment_id=assessment_id,
-                        subcategory_id=subcategory.id,
-                        average_score=avg_score,
-                        percentage=percentage
-                    )
-                    db.session.add(subcategory_score)
-                
-                subcategory_results.append({
-                    'subcategory_id': subcategory.id,
-                    'subcategory_name': subcategory.name,
-                    'life_area_id': subcategory.life_area_id,
-                    'average_score': round(float(avg_score), 1),
-                    'percentage': round(float(percentage), 1)
-                })
-        
-        # Calculate area scores from subcategory averages
-        life_areas = LifeArea.query.all()
-        area_results = []
-        
-        for area in life_areas:
-            area_subcategory_scores = [
-                result for result in subcategory_results 
-                if result['life_area_id'] == area.id
-            ]
-            
-            if area_subcategory_scores:
-                area_avg_score = sum(s['average_score'] for s in area_subcategory_scores) / len(area_subcategory_scores)
-                area_percentage = (area_avg_score / 10) * 100
-                
-                # Save or update area score
-                existing_area_score = AreaScore.query.filter_by(
-                    assessment_id=assessment_id,
-                    life_area_id=area.id
-                ).first()
-                
-                if existing_area_score:
-                    existing_area_score.average_score = area_avg_score
-                    existing_area_score.percentage = area_percentage
-                    existing_area_score.calculated_at = datetime.utcnow()
-                else:
-                    area_score = AreaScore(
-                        assessment_id=assessment_id,
-                        life_area_id=area.id,
-                        average_score=area_avg_score,
-                        percentage=area_percentage
-                    )
-                    db.session.add(area_score)
-                
-                area_results.append({
-                    'life_area_id': area.id,
-                    'life_area_name': area.name,
-                    'average_score': round(float(area_avg_score), 1),
-                    'percentage': round(float(area_percentage), 1),
-                    'color': area.color
-                })
-        
-        # Mark assessment as completed
-        assessment.status = 'completed'
-        assessment.completed_at = datetime.utcnow()
-        
+        scores = complete_assessment(assessment)
         db.session.commit()
         
         logger.info(f"Calculated scores for assessment {assessment_id}")
         
         return jsonify({
-            'area_results': area_results,
-            'subcategory_results': subcategory_results
+            'area_results': scores.area_results,
+            'subcategory_results': scores.subcategory_results
         })
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error calculating scores for assessment {assessment_id}: {e}")
         return jsonify({'error': 'Erro ao calcular pontuações'}), 500
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def get_job_status(job_id):
+    """Status of a background job started by the current user"""
+    user_id = get_jwt_identity()
+    
+    job = get_job(db.session, Job.__table__, job_id)
+    if not job or job['user_id'] != user_id:
+        return jsonify({'error': 'Tarefa não encontrada'}), 404
+    
+    response = jsonify(job_to_dict(job))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/assessments/<int:assessment_id>/complete', methods=['POST'])
+@query_budget(10)
+@jwt_required()
+def complete_assessment_route(assessment_id):
+    """Finish an assessment: every question answered, scores calculated, one transaction"""
+    user_id = get_jwt_identity()
+    
+    assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
+    if not assessment:
+        return jsonify({'error': 'Avaliação não encontrada'}), 404
+    if assessment.status == 'completed':
+        return jsonify({**assessment_to_dict(assessment), 'message': 'Avaliação já concluída'})
+    
+    try:
+        catalog = get_catalog()
+        assessment.current_area_index = len(catalog.areas) - 1
+        scores = complete_assessment(assessment)
+        missing = len(catalog.question_ids) - scores.response_count
+        if missing > 0:
+            db.session.rollback()
+            return jsonify({'error': f'Responda todas as perguntas antes de concluir ({missing} pendentes)'}), 400
+        
+        db.session.commit()
+        
+        logger.info(f"Completed assessment {assessment_id} for user {user_id}")
+        
+        return jsonify({
+            **assessment_to_dict(assessment),
+            'area_results': scores.area_results,
+            'subcategory_results': scores.subcategory_results
+        })
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error completing assessment {assessment_id}: {e}")
+        return jsonify({'error': 'Erro ao concluir avaliação'}), 500
+
 @app.route('/api/assessments/<int:assessment_id>/results', methods=['GET'])
+@query_budget(7)
 @jwt_required()
 def get_assessment_results(assessment_id):
     """Get results for a specific assessment"""
@@ -889,54 +2233,67 @@ def get_assessment_results(assessment_id):
     if not assessment:
         return jsonify({'error': 'Avaliação não encontrada'}), 404
     
-    try:
+    assessment_info = assessment_info_to_dict(assessment)
+    
+    def build_payload():
         # Get area scores with explicit join
-        area_scores = db.session.query(AreaScore, LifeArea)\
+        area_scores = db.session.query(*AREA_RESULT_COLUMNS)\
             .join(LifeArea, AreaScore.life_area_id == LifeArea.id)\
             .filter(AreaScore.assessment_id == assessment_id)\
             .order_by(LifeArea.display_order).all()
         
-        area_results = [{
-            'life_area_id': score.life_area_id,
-            'life_area_name': area.name,
-            'color': area.color or '#999',
-            'average_score': float(score.average_score),
-            'percentage': float(score.percentage)
-        } for score, area in area_scores]
+        area_results = [area_result_to_dict(row) for row in area_scores]
         
         # Get subcategory scores with explicit joins
-        subcategory_scores = db.session.query(SubcategoryScore, Subcategory, LifeArea)\
+        subcategory_scores = db.session.query(*SUBCATEGORY_RESULT_COLUMNS)\
             .select_from(SubcategoryScore)\
             .join(Subcategory, SubcategoryScore.subcategory_id == Subcategory.id)\
             .join(LifeArea, Subcategory.life_area_id == LifeArea.id)\
             .filter(SubcategoryScore.assessment_id == assessment_id)\
             .order_by(LifeArea.display_order, Subcategory.display_order).all()
         
-        subcategory_results = [{
-            'subcategory_id': score.subcategory_id,
-            'subcategory_name': subcategory.name,
-            'life_area_id': subcategory.life_area_id,
-            'life_area_name': area.name,
-            'average_score': float(score.average_score),
-            'percentage': float(score.percentage)
-        } for score, subcategory, area in subcategory_scores]
+        subcategory_results = [subcategory_result_to_dict(row) for row in subcategory_scores]
         
-        return jsonify({
-            'assessment': {
-                'id': assessment.id,
-                'title': assessment.title,
-                'status': assessment.status,
-                'started_at': assessment.started_at.isoformat(),
-                'completed_at': assessment.completed_at.isoformat() if assessment.completed_at else None
-            },
+        return {
+            'assessment': assessment_info,
             'area_results': area_results,
             'subcategory_results': subcategory_results
-        })
+        }
+    
+    def build_dense_payload():
+        # Names and colors come from the client's copy of the catalog
+        catalog = get_catalog()
+        area_scores = db.session.query(AreaScore.life_area_id, AreaScore.average_score, AreaScore.percentage)\
+            .filter(AreaScore.assessment_id == assessment_id).all()
+        subcategory_scores = db.session.query(
+            SubcategoryScore.subcategory_id, SubcategoryScore.average_score, SubcategoryScore.percentage
+        ).filter(SubcategoryScore.assessment_id == assessment_id).all()
+        return {
+            'assessment': assessment_info,
+            'catalog_version': catalog.version,
+            'area_scores': encode_dense({a: score for a, score, _ in area_scores}, catalog.area_order),
+            'area_percentages': encode_dense({a: pct for a, _, pct in area_scores}, catalog.area_order),
+            'subcategory_scores': encode_dense(
+                {s: score for s, score, _ in subcategory_scores}, catalog.subcategory_order),
+            'subcategory_percentages': encode_dense(
+                {s: pct for s, _, pct in subcategory_scores}, catalog.subcategory_order)
+        }
+    
+    try:
+        media_type = negotiate_wire_format(DENSE_JSON)
+        key = f"results:{assessment.id}:{assessment.version}:{get_catalog().version}"
+        if media_type == DENSE_JSON:
+            response = cached_json_response(f"{key}:dense", build_dense_payload, mimetype=DENSE_JSON)
+        else:
+            response = cached_json_response(key, build_payload)
+        response.vary.add('Accept')
+        return response
     except Exception as e:
         logger.error(f"Error fetching results for assessment {assessment_id}: {e}")
         return jsonify({'error': 'Erro ao buscar resultados'}), 500
 
 @app.route('/api/user/last-assessment', methods=['GET'])
+@query_budget(2)
 @jwt_required()
 def get_last_assessment():
     """Get the last completed assessment for the current user"""
@@ -944,89 +2301,178 @@ def get_last_assessment():
     
     try:
         # Get the most recent completed assessment
-        last_assessment = Assessment.query.filter_by(
+        last_assessment = AssessmentSummary.query.filter_by(
             user_id=user_id,
             status='completed'
-        ).order_by(Assessment.completed_at.desc()).first()
+        ).order_by(AssessmentSummary.completed_at.desc()).first()
         
         if not last_assessment:
             return jsonify({'message': 'Nenhuma avaliação anterior encontrada'}), 404
         
-        # Get all responses for this assessment
-        responses = Response.query.filter_by(assessment_id=last_assessment.id).all()
-        
-        # Format responses by question_id
-        response_data = {
-            response.question_id: response.score 
-            for response in responses
-        }
+        # Get all responses for this assessment, by question_id
+        answers = dict(
+            db.session.query(Response.question_id, Response.score)
+            .filter(Response.assessment_id == last_assessment.assessment_id)
+        )
         
-        return jsonify({
-            'assessment_id': last_assessment.id,
-            'completed_at': last_assessment.completed_at.isoformat(),
-            'responses': response_data
-        })
+        media_type = negotiate_wire_format(DENSE_JSON, DENSE_BINARY)
+        catalog = get_catalog()
+        if media_type == DENSE_BINARY:
+            response = app.response_class(encode_binary(answers, catalog.question_order), mimetype=DENSE_BINARY)
+            response.headers[CATALOG_VERSION_HEADER] = catalog.version
+            response.headers['X-Assessment-Id'] = str(last_assessment.assessment_id)
+            response.headers['X-Completed-At'] = last_assessment.completed_at.isoformat()
+        elif media_type == DENSE_JSON:
+            response = jsonify({
+                'assessment_id': last_assessment.assessment_id,
+                'completed_at': last_assessment.completed_at,
+                'catalog_version': catalog.version,
+                'scores': encode_dense(answers, catalog.question_order)
+            })
+            response.mimetype = DENSE_JSON
+        else:
+            response = jsonify({
+                'assessment_id': last_assessment.assessment_id,
+                'completed_at': last_assessment.completed_at,
+                'responses': answers
+            })
+        response.vary.add('Accept')
+        return response
     except Exception as e:
         logger.error(f"Error fetching last assessment for user {user_id}: {e}")
         return jsonify({'error': 'Erro ao buscar última avaliação'}), 500
 
+@app.route('/api/user/trends', methods=['GET'])
+@query_budget(6)
+@jwt_required()
+def get_user_trends():
+    """Score time series, deltas and rolling averages across completed assessments"""
+    user_id = get_jwt_identity()
+    window = min(max(request.args.get('window', TRENDS_DEFAULT_WINDOW, type=int), 1), TRENDS_MAX_WINDOW)
+    
+    try:
+        # Every (re)calculation bumps the assessment's version, so the count
+        # and version sum of completed assessments identify the score history
+        # (summary timestamps have one-second resolution on MySQL)
+        completed_count, version_sum = db.session.query(
+            db.func.count(Assessment.id),
+            db.func.coalesce(db.func.sum(Assessment.version), 0)
+        ).filter_by(user_id=user_id, status='completed').one()
+        history_key = f"{completed_count}:{version_sum}"
+        
+        return cached_json_response(
+            f"trends:{user_id}:{history_key}:{window}:{get_catalog().version}",
+            lambda: build_trends_payload(load_score_trends(user_id, window), window)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching trends for user {user_id}: {e}")
+        return jsonify({'error': 'Erro ao buscar tendências'}), 500
+
+@app.route('/api/admin/cohort-stats', methods=['GET'])
+@query_budget(7)
+@jwt_required()
+@admin_required
+def get_cohort_stats():
+    """Score distributions, quantiles and area correlations across all users"""
+    try:
+        # Recomputed at most once per COHORT_STATS_CACHE_SECONDS per worker
+        bucket = int(time.time() // COHORT_STATS_CACHE_SECONDS)
+        return cached_json_response(
+            f"cohort-stats:{bucket}:{get_catalog().version}",
+            compute_cohort_statistics
+        )
+    except Exception as e:
+        logger.error(f"Error computing cohort statistics: {e}")
+        return jsonify({'error': 'Erro ao calcular estatísticas'}), 500
+
+@app.route('/api/user/export', methods=['GET'])
+@query_budget(8)
+@jwt_required()
+@limiter.limit("5 per minute")
+def export_user_data():
+    """Stream everything stored for the current user as NDJSON or CSV"""
+    user_id = get_jwt_identity()
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Formato inválido. Use ndjson ou csv'}), 400
+    
+    compress = request.accept_encodings['gzip'] > 0
+    
+    def generate():
+        # Runs after the view returns: one query per record type
+        try:
+            yield from iter_export_chunks(iter_export_lines(user_id, export_format), compress)
+            logger.info(f"Exported data for user {user_id} as {export_format}")
+        except Exception as e:
+            logger.error(f"Error exporting data for user {user_id}: {e}")
+            raise
+    
+    response = app.response_class(
+        stream_with_context(within_query_budget(generate())),
+        mimetype='application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+    )
+    filename = f"roda-da-vida-{user_id}-{datetime.utcnow():%Y%m%d}.{export_format}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 # ACTION PLAN ROUTES (CONSOLIDATED)
 
 @app.route('/api/assessments/<int:assessment_id>/action-plan', methods=['GET'])
+@query_budget(8)
 @jwt_required()
 def get_action_plan(assessment_id):
     """Get action plan for a specific assessment"""
     user_id = get_jwt_identity()
     
     try:
-        # Verify assessment ownership
-        assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
+        # Verify assessment ownership (and find the plan) in one query
+        assessment, action_plan_id = load_owned_assessment(user_id, assessment_id)
         if not assessment:
             return jsonify({'error': 'Avaliação não encontrada'}), 404
-        
-        # Get action plan
-        action_plan = ActionPlan.query.filter_by(assessment_id=assessment_id).first()
-        if not action_plan:
+        if action_plan_id is None:
             return jsonify({'error': 'Plano de ação não encontrado'}), 404
         
-        # Get actions
-        actions = Action.query.filter_by(action_plan_id=action_plan.id)\
-            .order_by(Action.created_at).all()
-        
-        # Get contribution points
-        contribution_points = ActionContributionPoint.query.filter_by(
-            action_plan_id=action_plan.id
-        ).all()
-        
-        # Get focus area information
-        focus_area = LifeArea.query.get(action_plan.focus_area_id)
+        def build_payload():
+            action_plan = db.session.get(ActionPlan, action_plan_id)
+            if not action_plan:
+                return None
+            
+            # Get actions
+            actions = Action.query.filter_by(action_plan_id=action_plan.id)\
+                .order_by(Action.created_at, Action.id).all()
+            
+            # Get contribution points
+            contribution_points = ActionContributionPoint.query.filter_by(
+                action_plan_id=action_plan.id
+            ).all()
+            
+            # Get focus area information
+            focus_area = get_catalog().area_by_id.get(action_plan.focus_area_id)
+            
+            return {
+                **action_plan_to_dict(action_plan),
+                'focus_area_name': focus_area.name if focus_area else None,
+                'actions': [action_to_dict(action) for action in actions],
+                'contribution_points': [contribution_point_to_dict(cp) for cp in contribution_points]
+            }
         
-        return jsonify({
-            'id': action_plan.id,
-            'assessment_id': action_plan.assessment_id,
-            'focus_area_id': action_plan.focus_area_id,
-            'focus_area_name': focus_area.name if focus_area else None,
-            'created_at': action_plan.created_at.isoformat(),
-            'updated_at': action_plan.updated_at.isoformat(),
-            'actions': [{
-                'id': action.id,
-                'action_text': action.action_text,
-                'strategy_text': action.strategy_text,
-                'target_date': action.target_date.isoformat() if action.target_date else None,
-                'status': action.status,
-                'created_at': action.created_at.isoformat(),
-                'updated_at': action.updated_at.isoformat()
-            } for action in actions],
-            'contribution_points': [{
-                'life_area_id': cp.life_area_id,
-                'points': cp.contribution_points
-            } for cp in contribution_points]
-        })
+        response = cached_json_response(
+            f"action-plan:{assessment.id}:{assessment.version}:{get_catalog().version}",
+            build_payload
+        )
+        if response is None:
+            return jsonify({'error': 'Plano de ação não encontrado'}), 404
+        return response
     except Exception as e:
         logger.error(f"Error fetching action plan for assessment {assessment_id}: {e}")
         return jsonify({'error': 'Erro ao buscar plano de ação'}), 500
 
 @app.route('/api/assessments/<int:assessment_id>/action-plan', methods=['POST'])
+@query_budget(7)
 @jwt_required()
 @limiter.limit("10 per minute")
 def create_action_plan(assessment_id):
@@ -1035,11 +2481,10 @@ def create_action_plan(assessment_id):
     
     try:
         # Validate input
-        schema = ActionPlanSchema()
-        data = schema.load(request.get_json() or {})
+        data = load_payload(action_plan_schema, request.get_json() or {}, fast_load_action_plan)
         
-        # Verify assessment ownership
-        assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
+        # Verify assessment ownership and look for an existing plan in one query
+        assessment, existing_plan_id = load_owned_assessment(user_id, assessment_id)
         if not assessment:
             return jsonify({'error': 'Avaliação não encontrada'}), 404
         
@@ -1048,31 +2493,24 @@ def create_action_plan(assessment_id):
             return jsonify({'error': 'A avaliação deve estar completa antes de criar o plano de ação'}), 400
         
         # Check if action plan already exists
-        existing_plan = ActionPlan.query.filter_by(assessment_id=assessment_id).first()
-        if existing_plan:
+        if existing_plan_id is not None:
             return jsonify({
                 'error': 'Plano de ação já existe para esta avaliação',
-                'existing_plan_id': existing_plan.id
+                'existing_plan_id': existing_plan_id
             }), 409
         
         # Verify focus area exists
-        focus_area = LifeArea.query.get(data['focus_area_id'])
-        if not focus_area:
+        catalog = get_catalog()
+        if data['focus_area_id'] not in catalog.area_by_id:
             return jsonify({'error': 'Área de foco inválida'}), 400
         
         # Validate contribution points if provided
-        contribution_points = data.get('contribution_points', [])
-        if contribution_points:
-            # Validate that all life areas exist
-            life_area_ids = [cp.get('life_area_id') for cp in contribution_points]
-            existing_areas = LifeArea.query.filter(LifeArea.id.in_(life_area_ids)).count()
-            if existing_areas != len(life_area_ids):
-                return jsonify({'error': 'Uma ou mais áreas da vida não existem'}), 400
-            
-            # Validate contribution points sum to 100
-            total_points = sum(cp.get('points', 0) for cp in contribution_points)
-            if total_points != 100:
-                return jsonify({'error': f'Os pontos de contribuição devem somar 100, obtido {total_points}'}), 400
+        points = {}
+        if data['contribution_points']:
+            try:
+                points = parse_contribution_points(data['contribution_points'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
         # Create action plan
         action_plan = ActionPlan(
@@ -1080,43 +2518,33 @@ def create_action_plan(assessment_id):
             focus_area_id=data['focus_area_id']
         )
         db.session.add(action_plan)
+        bump_assessment_version(assessment)
         db.session.flush()  # Get the ID without committing
         
-        # Add contribution points
-        for cp_data in contribution_points:
-            if 'life_area_id' not in cp_data or 'points' not in cp_data:
-                continue
-            
-            contribution_point = ActionContributionPoint(
-                action_plan_id=action_plan.id,
-                life_area_id=cp_data['life_area_id'],
-                contribution_points=cp_data['points']
-            )
-            db.session.add(contribution_point)
-        
-        # Add actions
-        actions_data = data.get('actions', [])
-        for action_data in actions_data:
-            if not action_data.get('action_text') or not action_data.get('strategy_text'):
-                continue  # Skip incomplete actions
-            
-            target_date = None
-            if action_data.get('target_date'):
-                try:
-                    target_date = datetime.strptime(action_data['target_date'], '%Y-%m-%d').date()
-                except ValueError:
-                    return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
-            
-            action = Action(
-                action_plan_id=action_plan.id,
-                action_text=action_data['action_text'],
-                strategy_text=action_data['strategy_text'],
-                target_date=target_date,
-                status=action_data.get('status', 'planned')
-            )
-            db.session.add(action)
+        # Contribution points and actions: one bulk INSERT each, whatever
+        # their number (incomplete actions were already dropped by the schema)
+        now = datetime.utcnow()
+        if points:
+            db.session.execute(ActionContributionPoint.__table__.insert(), [{
+                'action_plan_id': action_plan.id,
+                'life_area_id': life_area_id,
+                'contribution_points': contribution_points,
+                'created_at': now,
+                'updated_at': now
+            } for life_area_id, contribution_points in points.items()])
+        if data['actions']:
+            db.session.execute(Action.__table__.insert(), [{
+                'action_plan_id': action_plan.id,
+                'action_text': action_data['action_text'],
+                'strategy_text': action_data['strategy_text'],
+                'target_date': action_data['target_date'],
+                'status': action_data['status'] or 'planned',
+                'created_at': now,
+                'updated_at': now
+            } for action_data in data['actions']])
         
         db.session.commit()
+        ownership_cache.set((user_id, assessment_id), AssessmentOwnership(action_plan.id))
         
         logger.info(f"Action plan {action_plan.id} created for assessment {assessment_id} by user {user_id}")
         
@@ -1124,7 +2552,7 @@ def create_action_plan(assessment_id):
             'id': action_plan.id,
             'message': 'Plano de ação criado com sucesso',
             'focus_area_id': action_plan.focus_area_id,
-            'created_at': action_plan.created_at.isoformat()
+            'created_at': action_plan.created_at
         }), 201
         
     except ValidationError as e:
@@ -1135,10 +2563,15 @@ def create_action_plan(assessment_id):
         return jsonify({'error': 'Falha ao criar plano de ação. Tente novamente.'}), 500
 
 @app.route('/api/assessments/<int:assessment_id>/action-plan', methods=['PUT'])
+@query_budget(12)
 @jwt_required()
 @limiter.limit("10 per minute")
 def update_action_plan(assessment_id):
-    """Update existing action plan"""
+    """Update existing action plan.
+
+    Actions that carry their `id` are updated in place, new ones (no id)
+    inserted and missing ones deleted; see sync_plan_actions.
+    """
     user_id = get_jwt_identity()
     
     try:
@@ -1146,81 +2579,57 @@ def update_action_plan(assessment_id):
         if not data:
             return jsonify({'error': 'Nenhum dado fornecido'}), 400
         
+        # Validate everything before writing
+        try:
+            data = load_payload(action_plan_schema, data, functools.partial(fast_load_action_plan, partial=True),
+                                partial=ACTION_PLAN_UPDATE_FIELDS)
+        except ValidationError as err:
+            return jsonify({'error': 'Dados inválidos', 'details': err.messages}), 400
+        plan_values = {'updated_at': datetime.utcnow()}
+        if 'focus_area_id' in data:
+            if data['focus_area_id'] not in get_catalog().area_by_id:
+                return jsonify({'error': 'Área de foco inválida'}), 400
+            plan_values['focus_area_id'] = data['focus_area_id']
+        actions = data.get('actions')
+        try:
+            points = parse_contribution_points(data['contribution_points']) \
+                if 'contribution_points' in data else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Verify assessment ownership
-        assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
-        if not assessment:
+        ownership = get_assessment_ownership(user_id, assessment_id)
+        if not ownership:
             return jsonify({'error': 'Avaliação não encontrada'}), 404
         
-        # Get existing action plan
-        action_plan = ActionPlan.query.filter_by(assessment_id=assessment_id).first()
-        if not action_plan:
+        # Update the plan row, which also confirms it belongs to this assessment
+        action_plan_id = claim_action_plan(
+            user_id, assessment_id, ownership,
+            lambda plan_id: ActionPlan.query.filter_by(id=plan_id, assessment_id=assessment_id)
+                .update(plan_values, synchronize_session=False)
+        )
+        if action_plan_id is None:
             return jsonify({'error': 'Plano de ação não encontrado'}), 404
         
-        # Update focus area if provided
-        if 'focus_area_id' in data:
-            focus_area = LifeArea.query.get(data['focus_area_id'])
-            if not focus_area:
-                return jsonify({'error': 'Área de foco inválida'}), 400
-            action_plan.focus_area_id = data['focus_area_id']
-            action_plan.updated_at = datetime.utcnow()
-        
-        # Update contribution points if provided
-        if 'contribution_points' in data:
-            contribution_points = data['contribution_points']
-            
-            # Validate contribution points sum to 100
-            total_points = sum(cp.get('points', 0) for cp in contribution_points)
-            if total_points != 100:
-                return jsonify({'error': f'Os pontos de contribuição devem somar 100, obtido {total_points}'}), 400
-            
-            # Delete existing contribution points
-            ActionContributionPoint.query.filter_by(action_plan_id=action_plan.id).delete()
-            
-            # Add new contribution points
-            for cp_data in contribution_points:
-                if 'life_area_id' not in cp_data or 'points' not in cp_data:
-                    continue
-                
-                contribution_point = ActionContributionPoint(
-                    action_plan_id=action_plan.id,
-                    life_area_id=cp_data['life_area_id'],
-                    contribution_points=cp_data['points']
-                )
-                db.session.add(contribution_point)
-        
-        # Update actions if provided
-        if 'actions' in data:
-            # For simplicity, replace all actions
-            Action.query.filter_by(action_plan_id=action_plan.id).delete()
-            
-            actions_data = data['actions']
-            for action_data in actions_data:
-                if not action_data.get('action_text') or not action_data.get('strategy_text'):
-                    continue
-                
-                target_date = None
-                if action_data.get('target_date'):
-                    try:
-                        target_date = datetime.strptime(action_data['target_date'], '%Y-%m-%d').date()
-                    except ValueError:
-                        return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD'}), 400
-                
-                action = Action(
-                    action_plan_id=action_plan.id,
-                    action_text=action_data['action_text'],
-                    strategy_text=action_data['strategy_text'],
-                    target_date=target_date,
-                    status=action_data.get('status', 'planned')
-                )
-                db.session.add(action)
-        
+        changes = {}
+        if points is not None:
+            changes['contribution_points'] = sync_contribution_points(action_plan_id, points)
+        if actions is not None:
+            try:
+                changes['actions'] = sync_plan_actions(action_plan_id, actions)
+            except LookupError as e:
+                db.session.rollback()
+                return jsonify({'error': f'Ação {e.args[0]} não pertence a este plano'}), 400
+        
+        bump_assessment_version_by_id(assessment_id)
         db.session.commit()
         
-        logger.info(f"Action plan {action_plan.id} updated for assessment {assessment_id} by user {user_id}")
+        logger.info(f"Action plan {action_plan_id} updated for assessment {assessment_id} by user {user_id}: {changes}")
         
         return jsonify({
-            'id': action_plan.id,
-            'message': 'Plano de ação atualizado com sucesso'
+            'id': action_plan_id,
+            'message': 'Plano de ação atualizado com sucesso',
+            'changes': changes
         }), 200
         
     except Exception as e:
@@ -1228,7 +2637,48 @@ def update_action_plan(assessment_id):
         logger.error(f"Failed to update action plan for assessment {assessment_id}: {str(e)}")
         return jsonify({'error': 'Falha ao atualizar plano de ação. Tente novamente.'}), 500
 
+@app.route('/api/assessments/<int:assessment_id>/action-plan/actions/<int:action_id>', methods=['PATCH'])
+@query_budget(3)
+@jwt_required()
+@limiter.limit("30 per minute")
+def update_action_status(assessment_id, action_id):
+    """Change the status of a single action"""
+    user_id = get_jwt_identity()
+    
+    try:
+        status = (request.get_json(silent=True) or {}).get('status')
+        if status not in ACTION_STATUSES:
+            return jsonify({'error': 'Status de ação inválido'}), 400
+        
+        ownership = get_assessment_ownership(user_id, assessment_id)
+        if not ownership:
+            return jsonify({'error': 'Avaliação não encontrada'}), 404
+        
+        # Scoped to this assessment's plan, whatever plan id is cached
+        plan_id = db.select(ActionPlan.id).where(ActionPlan.assessment_id == assessment_id).scalar_subquery()
+        updated = Action.query.filter(Action.id == action_id, Action.action_plan_id == plan_id)\
+            .update({'status': status, 'updated_at': datetime.utcnow()}, synchronize_session=False)
+        if not updated:
+            return jsonify({'error': 'Ação não encontrada'}), 404
+        
+        bump_assessment_version_by_id(assessment_id)
+        db.session.commit()
+        
+        logger.info(f"Action {action_id} of assessment {assessment_id} set to {status} by user {user_id}")
+        
+        return jsonify({
+            'id': action_id,
+            'status': status,
+            'message': 'Ação atualizada com sucesso'
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to update action {action_id} for assessment {assessment_id}: {str(e)}")
+        return jsonify({'error': 'Falha ao atualizar ação. Tente novamente.'}), 500
+
 @app.route('/api/assessments/<int:assessment_id>/action-plan', methods=['DELETE'])
+@query_budget(5)
 @jwt_required()
 @limiter.limit("5 per minute")
 def delete_action_plan(assessment_id):
@@ -1237,24 +2687,29 @@ def delete_action_plan(assessment_id):
     
     try:
         # Verify assessment ownership
-        assessment = Assessment.query.filter_by(id=assessment_id, user_id=user_id).first()
-        if not assessment:
+        ownership = get_assessment_ownership(user_id, assessment_id)
+        if not ownership:
             return jsonify({'error': 'Avaliação não encontrada'}), 404
         
-        # Get action plan
-        action_plan = ActionPlan.query.filter_by(assessment_id=assessment_id).first()
-        if not action_plan:
+        # Delete the plan row first: scoped to this assessment, so a stale
+        # cached plan id can never touch another user's data
+        action_plan_id = claim_action_plan(
+            user_id, assessment_id, ownership,
+            lambda plan_id: ActionPlan.query.filter_by(id=plan_id, assessment_id=assessment_id)
+                .delete(synchronize_session=False)
+        )
+        if action_plan_id is None:
             return jsonify({'error': 'Plano de ação não encontrado'}), 404
         
         # Delete related data (foreign key constraints with CASCADE should handle this)
-        Action.query.filter_by(action_plan_id=action_plan.id).delete()
-        ActionContributionPoint.query.filter_by(action_plan_id=action_plan.id).delete()
+        Action.query.filter_by(action_plan_id=action_plan_id).delete()
+        ActionContributionPoint.query.filter_by(action_plan_id=action_plan_id).delete()
         
-        # Delete action plan
-        db.session.delete(action_plan)
+        bump_assessment_version_by_id(assessment_id)
         db.session.commit()
+        ownership_cache.set((user_id, assessment_id), AssessmentOwnership(None))
         
-        logger.info(f"Action plan {action_plan.id} deleted for assessment {assessment_id} by user {user_id}")
+        logger.info(f"Action plan {action_plan_id} deleted for assessment {assessment_id} by user {user_id}")
         
         return jsonify({'message': 'Plano de ação excluído com sucesso'}), 200
         
@@ -1263,6 +2718,207 @@ def delete_action_plan(assessment_id):
         logger.error(f"Failed to delete action plan for assessment {assessment_id}: {str(e)}")
         return jsonify({'error': 'Falha ao excluir plano de ação. Tente novamente.'}), 500
 
+# CLI COMMANDS
+
+@app.cli.command('bump-catalog-version')
+def bump_catalog_version():
+    """Force every worker to reload the question catalog on its next check"""
+    version = CatalogVersion.query.first()
+    if version:
+        version.version += 1
+    else:
+        version = CatalogVersion(version=1)
+        db.session.add(version)
+    db.session.commit()
+    logger.info(f"Catalog version bumped to {version.version}")
+
+@app.cli.command('calibrate-password-hash')
+@click.option('--target-ms', default=250, show_default=True, help='Target milliseconds per hash')
+@click.option('--algorithm', type=click.Choice(['bcrypt', 'argon2id']), default=PASSWORD_HASH_ALGORITHM,
+              show_default=True)
+@click.option('--memory-cost', default=65536, show_default=True, help='argon2id memory in KiB')
+@click.option('--parallelism', default=1, show_default=True, help='argon2id lanes')
+def calibrate_password_hash(target_ms, algorithm, memory_cost, parallelism):
+    """Find the password hash cost that fits a per-hash time budget on this host"""
+    if algorithm == 'bcrypt':
+        cost, measured, measurements = calibrate(
+            lambda rounds: make_hasher('bcrypt', rounds=rounds), range(10, 17), target_ms)
+        settings = {'BCRYPT_ROUNDS': cost}
+    else:
+        cost, measured, measurements = calibrate(
+            lambda time_cost: make_hasher('argon2id', time_cost=time_cost,
+                                          memory_cost=memory_cost, parallelism=parallelism),
+            range(1, 11), target_ms)
+        settings = {'ARGON2_TIME_COST': cost, 'ARGON2_MEMORY_COST': memory_cost,
+                    'ARGON2_PARALLELISM': parallelism}
+    
+    for candidate, elapsed in measurements:
+        click.echo(f"{algorithm} cost={candidate}: {elapsed:.1f} ms")
+    click.echo(f"Selected cost {cost} ({measured:.1f} ms, target {target_ms} ms). Add to .env:")
+    click.echo(f"PASSWORD_HASH_ALGORITHM={algorithm}")
+    for key, value in settings.items():
+        click.echo(f"{key}={value}")
+
+@app.cli.command('rebuild-summaries')
+@click.option('--batch-size', default=500, show_default=True, help='Assessments per transaction')
+def rebuild_summaries(batch_size):
+    """Backfill assessment_summaries from assessments, responses and area_scores"""
+    last_id = 0
+    rebuilt = 0
+    while True:
+        assessments = Assessment.query.filter(Assessment.id > last_id)\
+            .order_by(Assessment.id).limit(batch_size).all()
+        if not assessments:
+            break
+        
+        assessment_ids = [assessment.id for assessment in assessments]
+        response_counts = dict(
+            db.session.query(Response.assessment_id, db.func.count(Response.id))
+            .filter(Response.assessment_id.in_(assessment_ids))
+            .group_by(Response.assessment_id)
+        )
+        area_scores = load_summary_area_scores(
+            [assessment.id for assessment in assessments if assessment.status == 'completed']
+        )
+        
+        bulk_upsert(
+            db.session, AssessmentSummary.__table__,
+            [summary_row(
+                assessment,
+                response_counts.get(assessment.id, 0),
+                area_scores.get(assessment.id, [])
+            ) for assessment in assessments],
+            conflict_columns=('assessment_id',),
+            update_columns=SUMMARY_COLUMNS
+        )
+        db.session.commit()
+        
+        rebuilt += len(assessments)
+        last_id = assessment_ids[-1]
+        logger.info(f"Rebuilt {rebuilt} assessment summaries")
+
+@app.cli.command('cohort-stats')
+@click.option('--chunk-size', default=ANALYTICS_CHUNK_SIZE, show_default=True, help='Rows fetched per chunk')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), help='Write JSON here instead of stdout')
+def cohort_stats(chunk_size, output):
+    """Print population score distributions and area correlations as JSON"""
+    started = time.perf_counter()
+    body = json.dumps(compute_cohort_statistics(chunk_size), ensure_ascii=False, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(body + '\n')
+    else:
+        click.echo(body)
+    logger.info(f"Cohort statistics computed in {time.perf_counter() - started:.1f}s")
+
+@app.cli.command('import-assessments')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'input_format', type=click.Choice(['csv', 'ndjson']),
+              help='Defaults to the file extension')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Assessments per transaction')
+@click.option('--create-users', is_flag=True, help='Create unknown users (login disabled until a password reset)')
+@click.option('--dry-run', is_flag=True, help='Validate the file without writing anything')
+def import_assessments(path, input_format, batch_size, create_users, dry_run):
+    """Bulk import historical assessments and responses from CSV or NDJSON"""
+    if input_format is None:
+        input_format = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+    errors = []
+    def on_error(line, message):
+        errors.append((line, message))
+        logger.warning(f"Line {line}: {message}")
+
+    known_users = {}
+    imported = {'assessments': 0, 'responses': 0, 'users': 0}
+    started = time.perf_counter()
+
+    def flush(batch):
+        for attempt in range(2):
+            try:
+                new_users, created_users = resolve_import_users(batch, known_users, create_users)
+                user_ids = {**known_users, **new_users}
+                accepted = [record for record in batch if record.user_email in user_ids]
+                counts = import_assessment_batch(accepted, user_ids) if accepted else {}
+                db.session.commit()
+                break
+            except sqlalchemy.exc.IntegrityError:
+                # Another writer took one of the allocated ids; retry with fresh ones
+                db.session.rollback()
+                if attempt:
+                    raise
+
+        for record in batch:
+            if record.user_email not in user_ids:
+                on_error(record.line, f"Usuário não encontrado: {record.user_email}")
+        known_users.update(new_users)
+        imported['users'] += created_users
+        imported['assessments'] += counts.get('assessments', 0)
+        imported['responses'] += counts.get('responses', 0)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Imported {imported['assessments']} assessments, {imported['responses']} responses "
+            f"({imported['responses'] / elapsed:.0f} responses/s)"
+        )
+
+    with open(path, encoding='utf-8', newline='') as stream:
+        batch = []
+        validated = 0
+        for record in iter_assessments(stream, input_format, get_catalog().question_ids, on_error):
+            validated += 1
+            if dry_run:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    elapsed = time.perf_counter() - started
+    if dry_run:
+        click.echo(f"Validated {validated} assessments, {len(errors)} rejected in {elapsed:.1f}s")
+    else:
+        click.echo(
+            f"Imported {imported['assessments']} assessments and {imported['responses']} responses "
+            f"({imported['users']} new users), {len(errors)} rejected in {elapsed:.1f}s: "
+            f"{imported['assessments'] / elapsed:.0f} assessments/s, {imported['responses'] / elapsed:.0f} responses/s"
+        )
+
+@app.cli.command('jobs-worker')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Seconds to sleep when the queue is empty')
+@click.option('--lease-seconds', default=JOB_LEASE_SECONDS, show_default=True,
+              help='Seconds before a running job of a dead worker is retried')
+@click.option('--once', is_flag=True, help='Exit once the queue is empty')
+def jobs_worker(poll_interval, lease_seconds, once):
+    """Run background jobs; start one process per desired worker"""
+    worker_id = worker_name()
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    logger.info(f"Job worker {worker_id} started")
+    
+    processed = 0
+    while not stopping:
+        ran = run_next_job(db.session, Job.__table__, JOB_HANDLERS, worker_id, lease_seconds)
+        # Fresh session per job so the identity map does not grow
+        db.session.remove()
+        if ran:
+            processed += 1
+        elif once:
+            break
+        else:
+            time.sleep(poll_interval)
+    logger.info(f"Job worker {worker_id} stopped after {processed} jobs")
+
+@app.cli.command('jobs-purge')
+@click.option('--older-than-days', default=30, show_default=True)
+def jobs_purge(older_than_days):
+    """Delete finished jobs older than the given age"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = Job.query.filter(Job.status.in_(('succeeded', 'failed')), Job.finished_at < cutoff)\
+        .delete(synchronize_session=False)
+    db.session.commit()
+    logger.info(f"Purged {deleted} jobs finished before {cutoff.isoformat()}")
+
 # Create tables and run app
 if __name__ == '__main__':
     with app.app_context():
@@ -0,0 +1,248 @@
+# benchmarks/audit_query_budgets.py
+"""Audit the SQL statement budget of every API endpoint.
+
+Runs a scripted session against SQLite (register, take an assessment, build
+an action plan, ...) with QUERY_BUDGET_MODE=strict and checks that:
+
+* every route in app.py declares a budget with @query_budget,
+* no request exceeds its route's budget,
+* statement counts do not grow with the amount of data (N+1 check): list
+  and batch endpoints are exercised with growing inputs (later calls may
+  use fewer statements thanks to per-worker caches, never more).
+
+Note that SQLite batches multi-row INSERTs where MySQL may not, so this is a
+lower bound for MySQL; the production warning (QUERY_BUDGET_MODE=warn) and
+wol_http_request_sql_statements cover the rest.
+
+Exits non-zero on any violation, so it can run in CI.
+
+Usage: python benchmarks/audit_query_budgets.py [--verbose]
+"""
+import argparse
+import os
+import sys
+
+os.environ['QUERY_BUDGET_MODE'] = 'strict'
+os.environ.setdefault('METRICS_TOKEN', 'audit-metrics-token')
+os.environ.setdefault('ADMIN_EMAILS', 'audit@example.com')
+
+from common import count_queries, load_app
+
+SKIP_ENDPOINTS = {'static'}
+
+
+class Auditor:
+    def __init__(self, app_module, verbose=False):
+        self.app_module = app_module
+        self.client = app_module.app.test_client()
+        self.verbose = verbose
+        self.seen = {}
+        self.failures = []
+
+    def call(self, method, path, expected_status, **kwargs):
+        with count_queries(self.app_module) as counter:
+            response = self.client.open(path, method=method, **kwargs)
+
+        adapter = self.app_module.app.url_map.bind('localhost')
+        endpoint, _ = adapter.match(path.split('?')[0], method=method)
+        budget = getattr(self.app_module.app.view_functions[endpoint], 'query_budget', None)
+        self.seen.setdefault(endpoint, []).append(counter['count'])
+
+        status = response.status_code
+        if status != expected_status:
+            self.failures.append(
+                f"{method} {path}: expected {expected_status}, got {status} {response.get_data(as_text=True)[:200]}"
+            )
+        elif budget is not None and counter['count'] > budget:
+            self.failures.append(f"{method} {path}: {counter['count']} statements > budget {budget}")
+
+        if self.verbose:
+            print(f"{method:6} {path:55} {status} statements={counter['count']:3} budget={budget}")
+        return response
+
+    def check_not_growing(self, endpoint):
+        counts = self.seen.get(endpoint, [])
+        if any(later > earlier for earlier, later in zip(counts, counts[1:])):
+            self.failures.append(f"{endpoint}: statement count grows with input size {counts}")
+
+
+def answers(question_ids, score=7):
+    return {'responses': [{'question_id': qid, 'score': score} for qid in question_ids]}
+
+
+def run(auditor):
+    app_module = auditor.app_module
+    with app_module.app.app_context():
+        catalog = app_module.get_catalog()
+    area = catalog.areas[0]
+    subcategory = catalog.subcategories_for(area.id)[0]
+    question_ids = sorted(catalog.question_ids)
+
+    auditor.call('GET', '/api/health', 200)
+    auditor.call('GET', '/api/metrics', 200, headers={'Authorization': f"Bearer {os.environ['METRICS_TOKEN']}"})
+    auditor.call('GET', '/api/debug/test-error', 403)
+    auditor.call('POST', '/api/auth/register', 201, json={
+        'name': 'Audit User', 'email': 'audit@example.com', 'password': 'audit-password'
+    })
+    login = auditor.call('POST', '/api/auth/login', 200, json={
+        'email': 'audit@example.com', 'password': 'audit-password'
+    })
+    headers = {'Authorization': f"Bearer {login.get_json()['access_token']}"}
+
+    auditor.call('GET', '/api/questionnaire', 200)
+    auditor.call('GET', '/api/life-areas', 200)
+    auditor.call('GET', f'/api/life-areas/{area.id}/subcategories', 200)
+    auditor.call('GET', f'/api/subcategories/{subcategory.id}/questions', 200)
+
+    auditor.call('GET', '/api/user/assessments', 200, headers=headers)
+    auditor.call('GET', '/api/user/last-assessment', 404, headers=headers)
+
+    started = auditor.call('POST', '/api/assessments/start', 201, headers=headers)
+    assessment_id = started.get_json()['id']
+    auditor.call('POST', '/api/assessments/start', 200, headers=headers)
+
+    # Autosave: one answer, then a page, then the rest in one batch
+    auditor.call('POST', f'/api/assessments/{assessment_id}/responses', 200,
+                 headers=headers, json=answers(question_ids[:1]))
+    auditor.call('POST', f'/api/assessments/{assessment_id}/responses', 200,
+                 headers=headers, json=answers(question_ids[:12]))
+    auditor.call('POST', f'/api/assessments/{assessment_id}/responses', 200,
+                 headers=headers, json=answers(question_ids, score=8))
+    # Compact dense formats (wire.py): same answers, no more statements
+    dense = {'catalog_version': catalog.version, 'scores': [8] * len(catalog.question_order)}
+    auditor.call('POST', f'/api/assessments/{assessment_id}/responses', 200, headers=headers, json=dense,
+                 content_type=app_module.DENSE_JSON)
+    auditor.call('POST', f'/api/assessments/{assessment_id}/responses', 200,
+                 headers={**headers, app_module.CATALOG_VERSION_HEADER: catalog.version},
+                 data=bytes([8] * len(catalog.question_order)), content_type=app_module.DENSE_BINARY)
+    auditor.check_not_growing('save_responses')
+    auditor.call('POST', f'/api/assessments/{assessment_id}/responses', 409, headers=headers,
+                 json={**dense, 'catalog_version': 'stale'}, content_type=app_module.DENSE_JSON)
+
+    auditor.call('POST', '/api/assessments/continue-or-create', 200, headers=headers)
+    auditor.call('GET', f'/api/assessments/{assessment_id}', 200, headers=headers)
+    auditor.call('GET', f'/api/assessments/{assessment_id}/responses', 200, headers=headers)
+    resumed = auditor.call('GET', f'/api/assessments/{assessment_id}/resume', 200, headers=headers).get_json()
+    if len(resumed['responses']) != len(question_ids):
+        auditor.failures.append(f"resume returned {len(resumed['responses'])} of {len(question_ids)} answers")
+    auditor.call('PATCH', f'/api/assessments/{assessment_id}/progress', 200,
+                 headers=headers, json={'current_area_index': 1})
+
+    auditor.call('POST', f'/api/assessments/{assessment_id}/calculate', 200, headers=headers)
+
+    # Async calculate: queue (twice, same job), run the worker, poll
+    queued = auditor.call('POST', f'/api/assessments/{assessment_id}/calculate?mode=async', 202, headers=headers)
+    auditor.call('POST', f'/api/assessments/{assessment_id}/calculate', 202,
+                 headers={**headers, 'Prefer': 'respond-async'})
+    job_url = queued.get_json()['status_url']
+    auditor.call('GET', job_url, 200, headers=headers)
+    with app_module.app.app_context():
+        while app_module.run_next_job(app_module.db.session, app_module.Job.__table__,
+                                      app_module.JOB_HANDLERS, 'audit'):
+            pass
+    finished = auditor.call('GET', job_url, 200, headers=headers)
+    if finished.get_json()['status'] != 'succeeded':
+        auditor.failures.append(f"GET {job_url}: job did not succeed {finished.get_json()}")
+
+    auditor.call('GET', f'/api/assessments/{assessment_id}/results', 200, headers=headers)
+    auditor.call('GET', f'/api/assessments/{assessment_id}/results', 200, headers=headers)
+    auditor.call('GET', '/api/user/last-assessment', 200, headers=headers)
+    last = auditor.call('GET', '/api/user/last-assessment', 200, headers={**headers, 'Accept': app_module.DENSE_BINARY})
+    if last.get_data() != bytes([8] * len(catalog.question_order)):
+        auditor.failures.append(f"last-assessment binary scores do not round-trip: {last.get_data()!r}")
+    auditor.call('GET', '/api/user/last-assessment', 200, headers={**headers, 'Accept': app_module.DENSE_JSON})
+    auditor.call('GET', f'/api/assessments/{assessment_id}/results', 200, headers={**headers, 'Accept': app_module.DENSE_JSON})
+    auditor.call('GET', '/api/user/trends', 200, headers=headers)
+    auditor.call('GET', '/api/admin/cohort-stats', 200, headers=headers)
+    # Buffered: the export runs its queries while the body streams
+    auditor.call('GET', '/api/user/export', 200, headers=headers, buffered=True)
+
+    # Listing must not grow with the number of assessments
+    for _ in range(5):
+        created = auditor.call('POST', '/api/assessments', 201, headers=headers, json={})
+        auditor.call('POST', f"/api/assessments/{created.get_json()['id']}/responses", 200,
+                     headers=headers, json=answers(question_ids[:3]))
+    last_id = created.get_json()['id']
+    auditor.call('POST', f'/api/assessments/{last_id}/complete', 400, headers=headers)
+    auditor.call('POST', f'/api/assessments/{last_id}/responses', 200, headers=headers, json=answers(question_ids))
+    auditor.call('POST', f'/api/assessments/{last_id}/complete', 200, headers=headers)
+    auditor.call('POST', f'/api/assessments/{last_id}/complete', 200, headers=headers)
+    auditor.call('PATCH', f'/api/assessments/{last_id}/progress', 409, headers=headers, json={'current_area_index': 0})
+    auditor.seen.pop('get_user_assessments', None)
+    auditor.call('GET', '/api/user/assessments', 200, headers=headers)
+    auditor.call('GET', '/api/user/assessments?limit=2', 200, headers=headers)
+    auditor.check_not_growing('get_user_assessments')
+
+    plan = {
+        'focus_area_id': area.id,
+        'contribution_points': [
+            {'life_area_id': a.id, 'points': p}
+            for a, p in zip(catalog.areas[:3], (50, 30, 20))
+        ],
+        'actions': [
+            {'action_text': f'Ação {i}', 'strategy_text': f'Estratégia {i}', 'target_date': '2030-01-01'}
+            for i in range(5)
+        ]
+    }
+    # Creating a plan must not grow with the number of actions
+    for action_count in (1, 30):
+        auditor.call('POST', f'/api/assessments/{last_id}/action-plan', 201, headers=headers, json={
+            **plan, 'actions': [{**plan['actions'][0], 'action_text': f'Ação {i}'} for i in range(action_count)]
+        })
+        auditor.call('DELETE', f'/api/assessments/{last_id}/action-plan', 200, headers=headers)
+    auditor.check_not_growing('create_action_plan')
+
+    auditor.call('POST', f'/api/assessments/{assessment_id}/action-plan', 201, headers=headers, json=plan)
+    stored = auditor.call('GET', f'/api/assessments/{assessment_id}/action-plan', 200, headers=headers).get_json()
+
+    # Diff update: keep two actions (one edited), drop three, add one
+    kept = stored['actions'][:2]
+    plan['actions'] = [
+        {**kept[0], 'status': 'in_progress'},
+        kept[1],
+        {'action_text': 'Nova ação', 'strategy_text': 'Nova estratégia', 'target_date': None},
+    ]
+    plan['contribution_points'][0]['points'] = 60
+    plan['contribution_points'][1]['points'] = 40
+    plan['contribution_points'].pop()
+    updated = auditor.call('PUT', f'/api/assessments/{assessment_id}/action-plan', 200, headers=headers, json=plan)
+    expected = {
+        'actions': {'inserted': 1, 'updated': 1, 'deleted': 3},
+        'contribution_points': {'upserted': 2, 'deleted': 1}
+    }
+    if updated.get_json()['changes'] != expected:
+        auditor.failures.append(f"PUT action-plan: unexpected changes {updated.get_json()['changes']}")
+    auditor.call('PATCH', f"/api/assessments/{assessment_id}/action-plan/actions/{kept[1]['id']}", 200,
+                 headers=headers, json={'status': 'completed'})
+    stored = auditor.call('GET', f'/api/assessments/{assessment_id}/action-plan', 200, headers=headers).get_json()
+    if [(a['id'], a['status']) for a in stored['actions'][:2]] != [(kept[0]['id'], 'in_progress'),
+                                                                   (kept[1]['id'], 'completed')]:
+        auditor.failures.append(f"action-plan diff did not keep action ids: {stored['actions']}")
+    auditor.call('DELETE', f'/api/assessments/{assessment_id}/action-plan', 200, headers=headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    app_module = load_app()
+    auditor = Auditor(app_module, verbose=args.verbose)
+    run(auditor)
+
+    for endpoint, view in app_module.app.view_functions.items():
+        if endpoint in SKIP_ENDPOINTS:
+            continue
+        if getattr(view, 'query_budget', None) is None:
+            auditor.failures.append(f"{endpoint}: no @query_budget declared")
+        if endpoint not in auditor.seen:
+            auditor.failures.append(f"{endpoint}: not exercised by the audit")
+
+    for failure in auditor.failures:
+        print(f"FAIL {failure}")
+    print(f"{len(auditor.seen)} endpoints audited, {len(auditor.failures)} failures")
+    sys.exit(1 if auditor.failures else 0)
+
+
+if __name__ == '__main__':
+    main()
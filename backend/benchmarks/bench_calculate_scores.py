@@ -0,0 +1,125 @@
+# benchmarks/bench_calculate_scores.py
+"""Compare the set-based scoring engine with the original per-subcategory loop.
+
+Usage: python benchmarks/bench_calculate_scores.py [--iterations N]
+"""
+import argparse
+import json
+import random
+import statistics
+from datetime import datetime
+
+from common import count_queries, load_app, percentile, register_user, timed
+
+
+def legacy_calculate(m, assessment_id):
+    """The calculate_scores body as it was before the scoring engine."""
+    db = m.db
+    subcategory_results = []
+    for subcategory in m.Subcategory.query.all():
+        responses = db.session.query(m.Response)\
+            .join(m.Question, m.Response.question_id == m.Question.id)\
+            .filter(m.Response.assessment_id == assessment_id,
+                    m.Question.subcategory_id == subcategory.id).all()
+        if responses:
+            avg_score = sum(r.score for r in responses) / len(responses)
+            percentage = (avg_score / 10) * 100
+            existing = m.SubcategoryScore.query.filter_by(
+                assessment_id=assessment_id, subcategory_id=subcategory.id).first()
+            if existing:
+                existing.average_score = avg_score
+                existing.percentage = percentage
+                existing.calculated_at = datetime.utcnow()
+            else:
+                db.session.add(m.SubcategoryScore(
+                    assessment_id=assessment_id, subcategory_id=subcategory.id,
+                    average_score=avg_score, percentage=percentage))
+            subcategory_results.append({
+                'subcategory_id': subcategory.id,
+                'subcategory_name': subcategory.name,
+                'life_area_id': subcategory.life_area_id,
+                'average_score': round(float(avg_score), 1),
+                'percentage': round(float(percentage), 1)
+            })
+
+    area_results = []
+    for area in m.LifeArea.query.all():
+        scores = [r for r in subcategory_results if r['life_area_id'] == area.id]
+        if scores:
+            area_avg_score = sum(s['average_score'] for s in scores) / len(scores)
+            area_percentage = (area_avg_score / 10) * 100
+            existing = m.AreaScore.query.filter_by(
+                assessment_id=assessment_id, life_area_id=area.id).first()
+            if existing:
+                existing.average_score = area_avg_score
+                existing.percentage = area_percentage
+                existing.calculated_at = datetime.utcnow()
+            else:
+                db.session.add(m.AreaScore(
+                    assessment_id=assessment_id, life_area_id=area.id,
+                    average_score=area_avg_score, percentage=area_percentage))
+            area_results.append({
+                'life_area_id': area.id,
+                'life_area_name': area.name,
+                'average_score': round(float(area_avg_score), 1),
+                'percentage': round(float(area_percentage), 1),
+                'color': area.color
+            })
+    db.session.commit()
+    return {'area_results': area_results, 'subcategory_results': subcategory_results}
+
+
+def engine_calculate(m, assessment_id):
+    scores = m.calculate_assessment_scores(assessment_id)
+    m.db.session.commit()
+    return {'area_results': scores.area_results, 'subcategory_results': scores.subcategory_results}
+
+
+def measure(m, func, assessment_id, iterations):
+    latencies, queries, output = [], [], None
+    for _ in range(iterations):
+        with count_queries(m) as counter:
+            output, elapsed = timed(func, m, assessment_id)
+        m.db.session.expire_all()
+        latencies.append(elapsed)
+        queries.append(counter['count'])
+    return output, {
+        'queries_per_call': statistics.median(queries),
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    m = load_app()
+    client = m.app.test_client()
+    headers = register_user(client, 'bench-scores@example.com')
+    assessment_id = client.post('/api/assessments', headers=headers).get_json()['id']
+
+    rng = random.Random(42)
+    with m.app.app_context():
+        question_ids = [q.id for q in m.Question.query.all()]
+    client.post(f'/api/assessments/{assessment_id}/responses', headers=headers, json={
+        'responses': [{'question_id': qid, 'score': rng.randint(0, 10)} for qid in question_ids]
+    })
+
+    with m.app.app_context():
+        legacy_output, legacy = measure(m, legacy_calculate, assessment_id, args.iterations)
+        engine_output, engine = measure(m, engine_calculate, assessment_id, args.iterations)
+
+    print(json.dumps({
+        'benchmark': 'calculate_scores',
+        'iterations': args.iterations,
+        'identical_output': legacy_output == engine_output,
+        'legacy': legacy,
+        'scoring_engine': engine,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
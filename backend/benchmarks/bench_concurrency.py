@@ -0,0 +1,199 @@
+# benchmarks/bench_concurrency.py
+"""Concurrency benchmark for the gunicorn worker profiles.
+
+Starts gunicorn once per worker profile (sync, gthread, gevent) with the
+settings from gunicorn.conf.py, then drives N concurrent keep-alive clients
+against a mix of endpoints (health check, questionnaire, an authenticated
+assessment listing) and reports throughput and latency percentiles as JSON.
+
+Usage: python benchmarks/bench_concurrency.py [--profiles sync,gthread,gevent]
+           [--clients 50,200,1000] [--duration 10] [--database-url URL]
+"""
+import argparse
+import asyncio
+import json
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BACKEND_DIR, percentile
+
+ENDPOINTS = ('/api/health', '/api/questionnaire', '/api/user/assessments')
+
+
+def gunicorn_command(profile, bind, log_dir):
+    """Build a gunicorn command line from gunicorn.conf.py for ``profile``."""
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=profile, GUNICORN_BIND=bind)
+    saved = dict(os.environ)
+    os.environ.update(env)
+    try:
+        conf = runpy.run_path(os.path.join(BACKEND_DIR, 'gunicorn.conf.py'))
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    # Flags override the production-only settings (user, log paths); an empty
+    # config keeps gunicorn from loading ./gunicorn.conf.py on its own
+    empty_config = os.path.join(log_dir, 'empty.conf.py')
+    open(empty_config, 'w').close()
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app:app',
+        '--config', empty_config,
+        '--bind', conf['bind'],
+        '--workers', str(conf['workers']),
+        '--worker-class', conf['worker_class'],
+        '--threads', str(conf['threads']),
+        '--worker-connections', str(conf['worker_connections']),
+        '--timeout', str(conf['timeout']),
+        '--keep-alive', str(conf['keepalive']),
+        '--error-logfile', os.path.join(log_dir, f'{profile}-error.log'),
+        '--log-level', 'warning',
+    ]
+    return command, env
+
+
+def prepare_database(database_url):
+    """Create the schema, seed the catalog and return a bearer token."""
+    from common import load_app, register_user
+
+    app_module = load_app(database_url)
+    client = app_module.app.test_client()
+    headers = register_user(client, f'concurrency-{int(time.time())}@example.com')
+    return headers['Authorization']
+
+
+async def http_get(reader, writer, host, path, token):
+    request = (
+        f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: identity\r\n'
+        f'Authorization: {token}\r\nConnection: keep-alive\r\n\r\n'
+    )
+    writer.write(request.encode('ascii'))
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    length = 0
+    close = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value.strip())
+        elif name == 'connection' and value.strip().lower() == 'close':
+            close = True
+    if length:
+        await reader.readexactly(length)
+    return status, close
+
+
+async def client_loop(host, port, token, deadline, latencies, errors, index):
+    reader = writer = None
+    request_number = index
+    while time.perf_counter() < deadline:
+        path = ENDPOINTS[request_number % len(ENDPOINTS)]
+        request_number += 1
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            status, close = await http_get(reader, writer, f'{host}:{port}', path, token)
+            if status >= 400:
+                errors[status] = errors.get(status, 0) + 1
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, token, clients, duration):
+    latencies = []
+    errors = {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        client_loop(host, port, token, deadline, latencies, errors, i) for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - started
+    return {
+        'clients': clients,
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'errors': errors,
+    }
+
+
+def wait_for_port(host, port, timeout=20):
+    import socket
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not start on {host}:{port}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--profiles', default='sync,gthread,gevent')
+    parser.add_argument('--clients', default='50,200,1000')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=5057)
+    parser.add_argument('--database-url', default=None,
+                        help='defaults to a scratch SQLite file (use MySQL for realistic numbers)')
+    args = parser.parse_args()
+
+    if args.database_url is None:
+        fd, path = tempfile.mkstemp(prefix='wol-bench-', suffix='.db')
+        os.close(fd)
+        args.database_url = f'sqlite:///{path}'
+    token = prepare_database(args.database_url)
+
+    host = '127.0.0.1'
+    log_dir = tempfile.mkdtemp(prefix='wol-gunicorn-')
+    results = []
+    for profile in args.profiles.split(','):
+        command, env = gunicorn_command(profile, f'{host}:{args.port}', log_dir)
+        env['DATABASE_URL'] = args.database_url
+        env['RATELIMIT_ENABLED'] = 'False'
+        process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+        try:
+            wait_for_port(host, args.port)
+            # Warm up: let every worker import the app and load the catalog
+            asyncio.run(run_load(host, args.port, token, 16, 3.0))
+            for clients in (int(c) for c in args.clients.split(',')):
+                result = asyncio.run(run_load(host, args.port, token, clients, args.duration))
+                result['profile'] = profile
+                results.append(result)
+                print(json.dumps(result), file=sys.stderr)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(json.dumps({'database_url': args.database_url.split('@')[-1], 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
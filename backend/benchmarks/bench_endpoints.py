@@ -0,0 +1,314 @@
+# benchmarks/bench_endpoints.py
+"""Endpoint benchmark suite over a seeded synthetic dataset.
+
+Seeds a database with datagen.py and times the main user flows:
+register, login, save_responses, calculate, results, the dashboard listing
+and action-plan create/get/update/delete. Runs either in-process through the
+Flask test client or over HTTP against gunicorn (started here with the
+settings from gunicorn.conf.py, or an already running server via --url).
+
+Results are printed as JSON (throughput, p50/p95/p99, status counts per
+scenario) so runs can be saved and diffed.
+
+Usage: python benchmarks/bench_endpoints.py [--mode inprocess|http]
+           [--users 100] [--assessments 5] [--requests 200] [--concurrency 8]
+           [--scenarios login,results,...] [--url http://host:port]
+           [--database-url URL] [--output results.json]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from common import BACKEND_DIR, load_app, percentile
+from datagen import BENCH_PASSWORD, generate, user_email
+
+SCENARIOS = (
+    'register', 'login', 'save_responses', 'calculate', 'results', 'dashboard',
+    'action_plan_create', 'action_plan_get', 'action_plan_update', 'action_plan_delete',
+)
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, json_body=None, headers=None):
+        response = self._client.open(path, method=method, json=json_body, headers=headers)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    """Keep-alive JSON client; one connection per thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self._host, self._port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def request(self, method, path, json_body=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(self._host, self._port, timeout=60)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+
+class Workload:
+    """Per-scenario request factories over the generated dataset."""
+
+    def __init__(self, app_module, dataset):
+        self.dataset = dataset
+        with app_module.app.app_context():
+            self.tokens = {
+                user_id: f"Bearer {app_module.create_access_token(identity=user_id)}"
+                for user_id in dataset['users']
+            }
+            catalog = app_module.get_catalog()
+        question_ids = sorted(catalog.question_ids)
+        self.pages = [question_ids[i:i + 12] for i in range(0, len(question_ids), 12)]
+        self.area_ids = [area.id for area in catalog.areas]
+        self.run_id = int(time.time())
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        # Completed assessments without a plan feed create -> update -> delete
+        self._plan_pool = list(dataset['without_plan'])
+        self._plans_created = []
+
+    def auth(self, user_id):
+        return {'Authorization': self.tokens[user_id]}
+
+    def pick(self, items):
+        return items[next(self._counter) % len(items)]
+
+    def plan_payload(self, actions):
+        return {
+            'focus_area_id': self.area_ids[0],
+            'contribution_points': [
+                {'life_area_id': area_id, 'points': points}
+                for area_id, points in zip(self.area_ids[:3], (50, 30, 20))
+            ],
+            'actions': [
+                {'action_text': f'Ação {i}', 'strategy_text': f'Estratégia {i}', 'target_date': '2030-01-01'}
+                for i in range(actions)
+            ]
+        }
+
+    def register(self):
+        n = next(self._counter)
+        return 'POST', '/api/auth/register', {
+            'name': 'Bench Register', 'email': f'bench-register-{self.run_id}-{n}@example.com',
+            'password': BENCH_PASSWORD
+        }, None
+
+    def login(self):
+        return 'POST', '/api/auth/login', {
+            'email': user_email(self.pick(self.dataset['users'])), 'password': BENCH_PASSWORD
+        }, None
+
+    def save_responses(self):
+        user_id, assessment_id = self.pick(self.dataset['in_progress'])
+        page = self.pages[next(self._counter) % len(self.pages)]
+        return 'POST', f'/api/assessments/{assessment_id}/responses', {
+            'responses': [{'question_id': qid, 'score': (qid * 7) % 11} for qid in page]
+        }, self.auth(user_id)
+
+    def calculate(self):
+        user_id, assessment_id = self.pick(self.dataset['completed'])
+        return 'POST', f'/api/assessments/{assessment_id}/calculate', None, self.auth(user_id)
+
+    def results(self):
+        user_id, assessment_id = self.pick(self.dataset['completed'])
+        return 'GET', f'/api/assessments/{assessment_id}/results', None, self.auth(user_id)
+
+    def dashboard(self):
+        user_id = self.pick(self.dataset['users'])
+        return 'GET', '/api/user/assessments', None, self.auth(user_id)
+
+    def action_plan_create(self):
+        with self._lock:
+            if not self._plan_pool:
+                return None
+            user_id, assessment_id = self._plan_pool.pop()
+            self._plans_created.append((user_id, assessment_id))
+        return 'POST', f'/api/assessments/{assessment_id}/action-plan', self.plan_payload(3), self.auth(user_id)
+
+    def action_plan_get(self):
+        user_id, assessment_id = self.pick(self.dataset['with_plan'])
+        return 'GET', f'/api/assessments/{assessment_id}/action-plan', None, self.auth(user_id)
+
+    def action_plan_update(self):
+        user_id, assessment_id = self.pick(self._plans_created or self.dataset['with_plan'])
+        return 'PUT', f'/api/assessments/{assessment_id}/action-plan', self.plan_payload(4), self.auth(user_id)
+
+    def action_plan_delete(self):
+        with self._lock:
+            if not self._plans_created:
+                return None
+            user_id, assessment_id = self._plans_created.pop()
+        return 'DELETE', f'/api/assessments/{assessment_id}/action-plan', None, self.auth(user_id)
+
+
+def run_scenario(client, factory, requests, concurrency):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one(_):
+        spec = factory()
+        if spec is None:
+            return
+        method, path, body, headers = spec
+        started = time.perf_counter()
+        try:
+            status, _ = client.request(method, path, body, headers)
+        except (http.client.HTTPException, OSError) as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if isinstance(status, int) and status < 400:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(requests):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(statuses.values())
+    return {
+        'requests': total,
+        'errors': total - len(latencies),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'statuses': statuses,
+    }
+
+
+def start_gunicorn(database_url, port):
+    from bench_concurrency import gunicorn_command, wait_for_port
+
+    log_dir = tempfile.mkdtemp(prefix='wol-gunicorn-')
+    command, env = gunicorn_command(os.getenv('GUNICORN_WORKER_CLASS', 'sync'), f'127.0.0.1:{port}', log_dir)
+    env.update(DATABASE_URL=database_url, RATELIMIT_ENABLED='False')
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    wait_for_port('127.0.0.1', port)
+    return process
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--assessments', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads (http mode)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--url', default=None, help='benchmark a running server instead of starting gunicorn')
+    parser.add_argument('--port', type=int, default=5058)
+    parser.add_argument('--database-url', default=None, help='defaults to a scratch SQLite file')
+    parser.add_argument('--output', default=None, help='write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.database_url is None:
+        fd, path = tempfile.mkstemp(prefix='wol-bench-', suffix='.db')
+        os.close(fd)
+        args.database_url = f'sqlite:///{path}'
+    app_module = load_app(args.database_url)
+    dataset = generate(app_module, args.users, args.assessments, args.seed)
+    workload = Workload(app_module, dataset)
+
+    server = None
+    if args.mode == 'http':
+        if args.url is None:
+            server = start_gunicorn(args.database_url, args.port)
+            args.url = f'http://127.0.0.1:{args.port}'
+        client = HttpClient(args.url)
+        concurrency = args.concurrency
+    else:
+        client = InProcessClient(app_module.app)
+        concurrency = 1
+
+    # Warm up: import the app in every worker and load the catalog
+    run_scenario(client, lambda: ('GET', '/api/questionnaire', None, None), 50, max(concurrency, 4))
+
+    results = {}
+    try:
+        for name in scenarios:
+            results[name] = run_scenario(client, getattr(workload, name), args.requests, concurrency)
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'mode': args.mode,
+            'url': args.url,
+            'database': args.database_url.split('://')[0],
+            'users': args.users,
+            'assessments_per_user': args.assessments,
+            'seed': args.seed,
+            'requests_per_scenario': args.requests,
+            'concurrency': concurrency,
+        },
+        'scenarios': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
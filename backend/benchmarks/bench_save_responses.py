@@ -0,0 +1,65 @@
+# benchmarks/bench_save_responses.py
+"""Load test for POST /api/assessments/<id>/responses (autosave path).
+
+Replays page-sized batches (12 questions, one life area) against the app and
+reports SQL statements per request and latency percentiles.
+
+Usage: python benchmarks/bench_save_responses.py [--requests N] [--page-size 12]
+"""
+import argparse
+import json
+import random
+import statistics
+
+from common import count_queries, load_app, percentile, register_user, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--page-size', type=int, default=12)
+    args = parser.parse_args()
+
+    m = load_app()
+    client = m.app.test_client()
+    headers = register_user(client, 'bench-responses@example.com')
+    assessment_id = client.post('/api/assessments', headers=headers).get_json()['id']
+
+    with m.app.app_context():
+        question_ids = [q.id for q in m.Question.query.order_by(m.Question.id).all()]
+    pages = [question_ids[i:i + args.page_size] for i in range(0, len(question_ids), args.page_size)]
+
+    rng = random.Random(42)
+    url = f'/api/assessments/{assessment_id}/responses'
+    latencies, statements = [], []
+    for i in range(args.requests):
+        payload = {'responses': [
+            {'question_id': qid, 'score': rng.randint(0, 10)} for qid in pages[i % len(pages)]
+        ]}
+        with count_queries(m) as counter:
+            response, elapsed = timed(client.post, url, headers=headers, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f'Unexpected status {response.status_code}: {response.get_json()}')
+        latencies.append(elapsed)
+        statements.append(counter['count'])
+
+    print(json.dumps({
+        'benchmark': 'save_responses',
+        'requests': args.requests,
+        'page_size': args.page_size,
+        'statements_per_request': {
+            'min': min(statements),
+            'median': statistics.median(statements),
+            'max': max(statements),
+        },
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
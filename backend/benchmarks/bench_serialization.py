@@ -0,0 +1,184 @@
+# benchmarks/bench_serialization.py
+"""CPU cost of building and encoding JSON response bodies.
+
+For the get_user_assessments page (up to ASSESSMENTS_MAX_PAGE_SIZE summaries)
+and the get_assessment_results payload, times the rows -> response body step,
+alone and together with the queries that load the rows:
+
+* hand_built: ORM rows turned into per-route dicts calling
+  ``.isoformat()``/``float()`` per field, encoded by Flask's stdlib provider
+  (what the routes used to do);
+* serializers: the column selects and compiled serializers in app.py,
+  encoded by serialization.OrjsonProvider.
+
+Both bodies must decode to the same document. Prints JSON with microseconds
+per response.
+
+Usage: python benchmarks/bench_serialization.py [--assessments 100] [--iterations 500]
+"""
+import argparse
+import json
+import random
+import timeit
+
+from flask.json.provider import DefaultJSONProvider
+
+from common import load_app
+
+
+def per_call_us(func, iterations):
+    # Best of 5 runs: least disturbed by other processes
+    return round(min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6, 2)
+
+
+def seed(m, client, assessment_count):
+    """One user with ``assessment_count`` completed assessments"""
+    token = client.post('/api/auth/register', json={
+        'name': 'Maria Silva', 'email': 'maria@example.com', 'password': 'S3nha-segura!'
+    }).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    with m.app.app_context():
+        question_order = m.get_catalog().question_order
+    rng = random.Random(42)
+    for _ in range(assessment_count):
+        assessment_id = client.post('/api/assessments', headers=headers).get_json()['id']
+        client.post(f'/api/assessments/{assessment_id}/responses', headers=headers, json={'responses': [
+            {'question_id': question_id, 'score': rng.randint(0, 10)} for question_id in question_order
+        ]})
+        client.post(f'/api/assessments/{assessment_id}/calculate', headers=headers)
+    return headers, assessment_id
+
+
+def hand_built_summary(summary):
+    return {
+        'id': summary.assessment_id,
+        'title': summary.title,
+        'status': summary.status,
+        'current_area_index': summary.current_area_index,
+        'started_at': summary.started_at.isoformat(),
+        'completed_at': summary.completed_at.isoformat() if summary.completed_at else None,
+        'response_count': summary.response_count,
+        'area_scores': summary.area_scores
+    }
+
+
+def hand_built_results(assessment, area_rows, subcategory_rows):
+    return {
+        'assessment': {
+            'id': assessment.id,
+            'title': assessment.title,
+            'status': assessment.status,
+            'started_at': assessment.started_at.isoformat(),
+            'completed_at': assessment.completed_at.isoformat() if assessment.completed_at else None
+        },
+        'area_results': [{
+            'life_area_id': row.life_area_id,
+            'life_area_name': row.life_area_name,
+            'color': row.color or '#999',
+            'average_score': float(row.average_score),
+            'percentage': float(row.percentage)
+        } for row in area_rows],
+        'subcategory_results': [{
+            'subcategory_id': row.subcategory_id,
+            'subcategory_name': row.subcategory_name,
+            'life_area_id': row.life_area_id,
+            'life_area_name': row.life_area_name,
+            'average_score': float(row.average_score),
+            'percentage': float(row.percentage)
+        } for row in subcategory_rows]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--assessments', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    m = load_app()
+    client = m.app.test_client()
+    headers, assessment_id = seed(m, client, args.assessments)
+    db = m.db
+
+    with m.app.app_context():
+        def legacy_rows():
+            summaries = m.AssessmentSummary.query.order_by(m.AssessmentSummary.started_at.desc())\
+                .limit(m.ASSESSMENTS_MAX_PAGE_SIZE).all()
+            assessment = db.session.get(m.Assessment, assessment_id)
+            area_rows = db.session.query(
+                m.AreaScore.life_area_id, m.LifeArea.name.label('life_area_name'), m.LifeArea.color,
+                m.AreaScore.average_score, m.AreaScore.percentage
+            ).join(m.LifeArea, m.AreaScore.life_area_id == m.LifeArea.id)\
+                .filter(m.AreaScore.assessment_id == assessment_id).order_by(m.LifeArea.display_order).all()
+            return summaries, assessment, area_rows, subcategory_rows(m.SUBCATEGORY_RESULT_COLUMNS)
+
+        def compiled_rows():
+            summaries = db.session.query(*m.SUMMARY_LIST_COLUMNS).order_by(m.AssessmentSummary.started_at.desc())\
+                .limit(m.ASSESSMENTS_MAX_PAGE_SIZE).all()
+            assessment = db.session.get(m.Assessment, assessment_id)
+            area_rows = db.session.query(*m.AREA_RESULT_COLUMNS)\
+                .join(m.LifeArea, m.AreaScore.life_area_id == m.LifeArea.id)\
+                .filter(m.AreaScore.assessment_id == assessment_id).order_by(m.LifeArea.display_order).all()
+            return summaries, assessment, area_rows, subcategory_rows(m.SUBCATEGORY_RESULT_COLUMNS)
+
+        def subcategory_rows(columns):
+            return db.session.query(*columns).select_from(m.SubcategoryScore)\
+                .join(m.Subcategory, m.SubcategoryScore.subcategory_id == m.Subcategory.id)\
+                .join(m.LifeArea, m.Subcategory.life_area_id == m.LifeArea.id)\
+                .filter(m.SubcategoryScore.assessment_id == assessment_id)\
+                .order_by(m.LifeArea.display_order, m.Subcategory.display_order).all()
+
+        stdlib = DefaultJSONProvider(m.app)
+        fast = m.app.json
+
+        def hand_built_list(rows):
+            return stdlib.response({
+                'assessments': [hand_built_summary(summary) for summary in rows[0]], 'next_cursor': None
+            }).get_data()
+
+        def serializers_list(rows):
+            return fast.response({
+                'assessments': [m.summary_to_dict(summary) for summary in rows[0]], 'next_cursor': None
+            }).get_data()
+
+        def hand_built_results_body(rows):
+            return stdlib.response(hand_built_results(*rows[1:])).get_data()
+
+        def serializers_results_body(rows):
+            _, assessment, area_rows, subcategory_rows_ = rows
+            return fast.response({
+                'assessment': m.assessment_info_to_dict(assessment),
+                'area_results': [m.area_result_to_dict(row) for row in area_rows],
+                'subcategory_results': [m.subcategory_result_to_dict(row) for row in subcategory_rows_]
+            }).get_data()
+
+        legacy, compiled = legacy_rows(), compiled_rows()
+        payloads = {
+            'get_user_assessments': (hand_built_list, serializers_list),
+            'get_assessment_results': (hand_built_results_body, serializers_results_body),
+        }
+
+        results = {}
+        for name, (hand_built, serializers) in payloads.items():
+            if json.loads(hand_built(legacy)) != json.loads(serializers(compiled)):
+                raise RuntimeError(f'{name}: bodies differ')
+            results[name] = {
+                'hand_built_us': per_call_us(lambda: hand_built(legacy), args.iterations),
+                'serializers_us': per_call_us(lambda: serializers(compiled), args.iterations),
+                'hand_built_with_queries_us': per_call_us(lambda: hand_built(legacy_rows()), args.iterations // 5),
+                'serializers_with_queries_us': per_call_us(
+                    lambda: serializers(compiled_rows()), args.iterations // 5),
+                'body_bytes': len(serializers(compiled)),
+            }
+            results[name]['speedup'] = round(results[name]['hand_built_us'] / results[name]['serializers_us'], 1)
+
+    print(json.dumps({
+        'benchmark': 'serialization',
+        'assessments': len(compiled[0]),
+        'iterations': args.iterations,
+        'payloads': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_validation.py
+"""CPU cost of request validation per request.
+
+Compares building a marshmallow schema on every call (what the handlers used
+to do) with the instances app.py builds once at import and with the one-pass
+fast paths tried before them (load_payload), for:
+
+* action plans with a growing number of actions (create and partial update);
+* a fully answered questionnaire (save_responses);
+* registration.
+
+Prints JSON with microseconds per validated request.
+
+Usage: python benchmarks/bench_validation.py [--iterations 500] [--actions 3 50 500]
+"""
+import argparse
+import functools
+import json
+import random
+import timeit
+
+from common import load_app
+
+
+def per_call_us(func, iterations):
+    # Best of 5 runs: least disturbed by other processes
+    return round(min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6, 2)
+
+
+def action_plan(catalog, action_count, with_ids=False):
+    areas = catalog.areas[:4]
+    return {
+        'focus_area_id': areas[0].id,
+        'contribution_points': [
+            {'life_area_id': area.id, 'points': points} for area, points in zip(areas, (40, 30, 20, 10))
+        ],
+        'actions': [
+            {
+                **({'id': i + 1, 'created_at': '2024-01-01T00:00:00'} if with_ids else {}),
+                'action_text': f'Ação {i}',
+                'strategy_text': f'Estratégia {i}',
+                'target_date': '2030-01-01' if i % 2 else None,
+                'status': 'planned'
+            }
+            for i in range(action_count)
+        ]
+    }
+
+
+def compare(m, schema_class, schema, fast_load, payload, iterations, **load_kwargs):
+    if fast_load is not None and fast_load(payload) != schema.load(payload, **load_kwargs):
+        raise RuntimeError(f'{schema_class.__name__}: fast path and schema disagree')
+
+    fresh = per_call_us(lambda: schema_class().load(payload, **load_kwargs), iterations)
+    reused = per_call_us(lambda: schema.load(payload, **load_kwargs), iterations)
+    result = {'per_call_schema_us': fresh, 'precompiled_us': reused}
+    if fast_load is not None:
+        result['fast_path_us'] = per_call_us(
+            lambda: m.load_payload(schema, payload, fast_load, **load_kwargs), iterations
+        )
+    result['speedup'] = round(fresh / min(reused, result.get('fast_path_us', reused)), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--actions', type=int, nargs='+', default=[3, 50, 500])
+    args = parser.parse_args()
+
+    m = load_app()
+    with m.app.app_context():
+        catalog = m.get_catalog()
+    rng = random.Random(42)
+
+    results = {}
+    for action_count in args.actions:
+        iterations = max(args.iterations * 3 // max(action_count, 3), 10)
+        results[f'action_plan_create_{action_count}'] = compare(
+            m, m.ActionPlanSchema, m.action_plan_schema, m.fast_load_action_plan,
+            action_plan(catalog, action_count), iterations
+        )
+        results[f'action_plan_update_{action_count}'] = compare(
+            m, m.ActionPlanSchema, m.action_plan_schema,
+            functools.partial(m.fast_load_action_plan, partial=True),
+            action_plan(catalog, action_count, with_ids=True), iterations, partial=m.ACTION_PLAN_UPDATE_FIELDS
+        )
+
+    responses = {'responses': [
+        {'question_id': question_id, 'score': rng.randint(0, 10)} for question_id in catalog.question_order
+    ]}
+    results['save_responses'] = compare(
+        m, m.ResponsesSchema, m.responses_schema, m.fast_load_responses, responses, args.iterations
+    )
+    registration = {'name': 'Maria Silva', 'email': 'maria@example.com', 'password': 'S3nha-segura'}
+    results['register'] = compare(
+        m, m.UserRegistrationSchema, m.user_registration_schema, None, registration, args.iterations
+    )
+
+    print(json.dumps({
+        'benchmark': 'validation',
+        'questions': len(catalog.question_order),
+        'iterations': args.iterations,
+        'payloads': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
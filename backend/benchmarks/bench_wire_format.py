@@ -0,0 +1,103 @@
+# benchmarks/bench_wire_format.py
+"""CPU cost of the answer wire formats: JSON objects vs compact dense arrays.
+
+For a fully answered questionnaire, times what the API does per request:
+
+* parse (save_responses): JSON decode + load_payload + catalog check for
+  the list of ``{question_id, score}`` objects, versus the one-pass
+  validators in wire.py for the dense JSON array and the binary form;
+* serialize (last-assessment): the ``{question_id: score}`` JSON object
+  versus the dense JSON array and the binary form.
+
+Also reports payload sizes. Prints JSON with microseconds per operation.
+
+Usage: python benchmarks/bench_wire_format.py [--iterations 2000]
+"""
+import argparse
+import json
+import random
+import timeit
+
+from common import load_app
+
+
+def per_call_us(func, iterations):
+    # Best of 5 runs: least disturbed by other processes
+    return round(min(timeit.repeat(func, number=iterations, repeat=5)) / iterations * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    m = load_app()
+    with m.app.app_context():
+        catalog = m.get_catalog()
+    order = catalog.question_order
+    rng = random.Random(42)
+    answers = {question_id: rng.randint(0, 10) for question_id in order}
+
+    requests = {
+        'json_objects': json.dumps({'responses': [
+            {'question_id': question_id, 'score': score} for question_id, score in answers.items()
+        ]}).encode(),
+        'dense_json': json.dumps({'catalog_version': catalog.version, 'scores': m.encode_dense(answers, order)}).encode(),
+        'dense_binary': m.encode_binary(answers, order),
+    }
+
+    def parse_json_objects():
+        data = m.load_payload(m.responses_schema, json.loads(requests['json_objects']), m.fast_load_responses)
+        return {r['question_id']: r['score'] for r in data['responses'] if r['question_id'] in catalog.question_ids}
+
+    def parse_dense_json():
+        body = json.loads(requests['dense_json'])
+        m.check_version(body['catalog_version'], catalog.version)
+        return m.decode_dense(body['scores'], order)
+
+    def parse_dense_binary():
+        return m.decode_binary(requests['dense_binary'], order)
+
+    parsers = {
+        'json_objects': parse_json_objects,
+        'dense_json': parse_dense_json,
+        'dense_binary': parse_dense_binary,
+    }
+    for name, parse in parsers.items():
+        if parse() != answers:
+            raise RuntimeError(f'{name} does not round-trip')
+
+    header = {'assessment_id': 1, 'completed_at': '2024-01-01T00:00:00'}
+    with m.app.app_context():
+        serializers = {
+            'json_objects': lambda: m.app.json.dumps({**header, 'responses': answers}).encode(),
+            'dense_json': lambda: m.app.json.dumps({
+                **header, 'catalog_version': catalog.version, 'scores': m.encode_dense(answers, order)
+            }).encode(),
+            'dense_binary': lambda: m.encode_binary(answers, order),
+        }
+        results = {
+            name: {
+                'parse_us': per_call_us(parsers[name], args.iterations),
+                'serialize_us': per_call_us(serializers[name], args.iterations),
+                'request_bytes': len(requests[name]),
+                'response_bytes': len(serializers[name]()),
+            }
+            for name in parsers
+        }
+
+    baseline = results['json_objects']
+    for result in results.values():
+        result['parse_speedup'] = round(baseline['parse_us'] / result['parse_us'], 1)
+        result['serialize_speedup'] = round(baseline['serialize_us'] / result['serialize_us'], 1)
+
+    print(json.dumps({
+        'benchmark': 'wire_format',
+        'questions': len(order),
+        'iterations': args.iterations,
+        'formats': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
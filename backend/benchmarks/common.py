@@ -0,0 +1,100 @@
+# benchmarks/common.py
+"""Shared helpers for the backend benchmarks.
+
+Benchmarks run the real Flask app in-process against a throwaway SQLite
+database seeded with the question catalog from database/schema.sql.
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_PATH = os.path.join(BACKEND_DIR, 'database', 'schema.sql')
+CATALOG_TABLES = ('life_areas', 'subcategories', 'questions')
+
+
+def load_app(database_url=None):
+    """Import backend/app.py against a scratch database and seed the catalog."""
+    if database_url is None:
+        fd, path = tempfile.mkstemp(prefix='wol-bench-', suffix='.db')
+        os.close(fd)
+        database_url = f'sqlite:///{path}'
+
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret-key')
+    os.environ.setdefault('FLASK_DEBUG', 'False')
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    import app as app_module
+    app_module.limiter.enabled = False
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        seed_catalog(app_module.db)
+    return app_module
+
+
+def catalog_inserts():
+    """Yield the INSERT statements for the catalog tables in schema.sql."""
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        sql = f.read()
+    for match in re.finditer(r'INSERT INTO\s+(\w+)\s*\(.*?\);', sql, re.S):
+        if match.group(1) in CATALOG_TABLES:
+            yield match.group(0)
+
+
+def seed_catalog(db):
+    """Load the life areas, subcategories and questions from schema.sql."""
+    if db.session.execute(db.text('SELECT COUNT(*) FROM questions')).scalar():
+        return
+    for statement in catalog_inserts():
+        db.session.execute(db.text(statement))
+    db.session.commit()
+
+
+@contextmanager
+def count_queries(app_module):
+    """Count SQL statements sent through the app's engine inside the block."""
+    from sqlalchemy import event
+
+    with app_module.app.app_context():
+        engine = app_module.db.engine
+    counter = {'count': 0}
+
+    def before_cursor_execute(*args, **kwargs):
+        counter['count'] += 1
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def register_user(client, email, name='Benchmark User', password='benchmark-password'):
+    """Register a user through the API and return auth headers."""
+    response = client.post('/api/auth/register', json={
+        'name': name, 'email': email, 'password': password
+    })
+    if response.status_code != 201:
+        raise RuntimeError(f'Registration failed: {response.status_code} {response.get_json()}')
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def timed(func, *args, **kwargs):
+    """Run ``func`` and return ``(result, elapsed_ms)``."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
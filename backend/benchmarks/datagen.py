@@ -0,0 +1,210 @@
+# benchmarks/datagen.py
+"""Seeded synthetic dataset for the benchmarks.
+
+Generates N users with M assessments each on top of the schema.sql catalog:
+every completed assessment has a full set of responses, subcategory/area
+scores computed with the real scoring engine, a summary row and (usually) an
+action plan. Each user's newest assessment is left in progress, half
+answered, so autosave and calculate have something realistic to work on.
+
+The same seed always produces the same dataset, so benchmark runs are
+comparable. Rows are written with multi-row INSERTs in batches of users.
+
+Usage: python benchmarks/datagen.py --users 200 --assessments 5 [--seed 42]
+           [--database-url URL]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import load_app
+
+BENCH_PASSWORD = 'benchmark-password'
+EMAIL_TEMPLATE = 'bench-user-{}@example.com'
+
+
+def user_email(index):
+    return EMAIL_TEMPLATE.format(index)
+
+
+def next_id(db, table):
+    return (db.session.execute(db.select(db.func.max(table.c.id))).scalar() or 0) + 1
+
+
+def generate(app_module, users=100, assessments_per_user=5, seed=42, action_plan_ratio=0.7, batch_users=50):
+    """Insert the dataset and return a description of what was created."""
+    rng = random.Random(seed)
+    m = app_module
+    db = m.db
+
+    with m.app.app_context():
+        catalog = m.get_catalog()
+        password_hash = m.hash_password(BENCH_PASSWORD)
+        question_ids = sorted(catalog.question_ids)
+        area_ids = [area.id for area in catalog.areas]
+
+        ids = {
+            'user': next_id(db, m.User.__table__),
+            'assessment': next_id(db, m.Assessment.__table__),
+            'plan': next_id(db, m.ActionPlan.__table__),
+        }
+        first_user_index = ids['user']
+        created = {'users': [], 'completed': [], 'in_progress': [], 'with_plan': [], 'without_plan': []}
+        now = datetime.utcnow()
+
+        for batch_start in range(0, users, batch_users):
+            rows = {name: [] for name in (
+                'users', 'assessments', 'responses', 'subcategory_scores', 'area_scores',
+                'summaries', 'plans', 'actions', 'points'
+            )}
+            for _ in range(batch_start, min(batch_start + batch_users, users)):
+                user_id = ids['user']
+                ids['user'] += 1
+                rows['users'].append({
+                    'id': user_id,
+                    'email': user_email(user_id),
+                    'password_hash': password_hash,
+                    'name': f'Bench User {user_id}',
+                    'created_at': now,
+                    'updated_at': now
+                })
+                created['users'].append(user_id)
+
+                # Each user has a personal baseline per area that drifts over time
+                baseline = {area_id: rng.uniform(3, 8) for area_id in area_ids}
+                for index in range(assessments_per_user):
+                    assessment_id = ids['assessment']
+                    ids['assessment'] += 1
+                    completed = index < assessments_per_user - 1
+                    started_at = now - timedelta(days=30 * (assessments_per_user - index), minutes=rng.randint(0, 600))
+                    completed_at = started_at + timedelta(minutes=rng.randint(10, 90)) if completed else None
+                    answered = question_ids if completed else question_ids[:len(question_ids) // 2]
+
+                    totals = {}
+                    for question_id in answered:
+                        subcategory_id = catalog.question_subcategory[question_id]
+                        area_id = catalog.subcategory_area[subcategory_id]
+                        score = max(0, min(10, round(rng.gauss(baseline[area_id] + index * 0.2, 1.5))))
+                        score_sum, count = totals.get(subcategory_id, (0, 0))
+                        totals[subcategory_id] = (score_sum + score, count + 1)
+                        rows['responses'].append({
+                            'assessment_id': assessment_id,
+                            'question_id': question_id,
+                            'score': score,
+                            'created_at': started_at,
+                            'updated_at': started_at
+                        })
+
+                    assessment = m.Assessment(
+                        id=assessment_id,
+                        user_id=user_id,
+                        title='Avaliação da Roda da Vida',
+                        status='completed' if completed else 'in_progress',
+                        current_area_index=len(area_ids) - 1 if completed else len(area_ids) // 2,
+                        started_at=started_at,
+                        completed_at=completed_at,
+                        version=1
+                    )
+                    rows['assessments'].append({
+                        column.name: getattr(assessment, column.key)
+                        for column in m.Assessment.__table__.columns
+                    })
+
+                    area_scores = []
+                    if completed:
+                        scores = m.compute_scores(totals, catalog.subcategories_by_id_order, catalog.areas_by_id_order)
+                        for subcategory_id, (avg_score, percentage) in scores.subcategory_scores.items():
+                            rows['subcategory_scores'].append({
+                                'assessment_id': assessment_id,
+                                'subcategory_id': subcategory_id,
+                                'average_score': round(avg_score, 1),
+                                'percentage': round(percentage, 2),
+                                'calculated_at': completed_at
+                            })
+                        for area_id, (avg_score, percentage) in scores.area_scores.items():
+                            rows['area_scores'].append({
+                                'assessment_id': assessment_id,
+                                'life_area_id': area_id,
+                                'average_score': round(avg_score, 1),
+                                'percentage': round(percentage, 2),
+                                'calculated_at': completed_at
+                            })
+                        area_scores = m.summary_area_scores(scores)
+                        created['completed'].append((user_id, assessment_id))
+                    else:
+                        created['in_progress'].append((user_id, assessment_id))
+
+                    rows['summaries'].append(m.summary_row(assessment, len(answered), area_scores))
+
+                    if completed and rng.random() < action_plan_ratio:
+                        plan_id = ids['plan']
+                        ids['plan'] += 1
+                        rows['plans'].append({
+                            'id': plan_id,
+                            'assessment_id': assessment_id,
+                            'focus_area_id': min(scores.area_scores, key=lambda a: scores.area_scores[a][0]),
+                            'created_at': completed_at,
+                            'updated_at': completed_at
+                        })
+                        for action_index in range(rng.randint(1, 5)):
+                            rows['actions'].append({
+                                'action_plan_id': plan_id,
+                                'action_text': f'Ação {action_index + 1}',
+                                'strategy_text': f'Estratégia {action_index + 1}',
+                                'target_date': (completed_at + timedelta(days=30 * (action_index + 1))).date(),
+                                'status': rng.choice(('planned', 'in_progress', 'completed')),
+                                'created_at': completed_at,
+                                'updated_at': completed_at
+                            })
+                        for area_id, points in zip(rng.sample(area_ids, 3), (50, 30, 20)):
+                            rows['points'].append({
+                                'action_plan_id': plan_id,
+                                'life_area_id': area_id,
+                                'contribution_points': points,
+                                'created_at': completed_at
+                            })
+                        created['with_plan'].append((user_id, assessment_id))
+                    elif completed:
+                        created['without_plan'].append((user_id, assessment_id))
+
+            for name, table in (
+                ('users', m.User.__table__),
+                ('assessments', m.Assessment.__table__),
+                ('responses', m.Response.__table__),
+                ('subcategory_scores', m.SubcategoryScore.__table__),
+                ('area_scores', m.AreaScore.__table__),
+                ('summaries', m.AssessmentSummary.__table__),
+                ('plans', m.ActionPlan.__table__),
+                ('actions', m.Action.__table__),
+                ('points', m.ActionContributionPoint.__table__),
+            ):
+                if rows[name]:
+                    db.session.execute(table.insert(), rows[name])
+            db.session.commit()
+
+    created['first_user_id'] = first_user_index
+    created['password'] = BENCH_PASSWORD
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--assessments', type=int, default=5, help='per user; the newest stays in progress')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default=None, help='defaults to a scratch SQLite file')
+    args = parser.parse_args()
+
+    app_module = load_app(args.database_url)
+    started = time.perf_counter()
+    created = generate(app_module, args.users, args.assessments, args.seed)
+    print(
+        f"Generated {len(created['users'])} users, {len(created['completed'])} completed and "
+        f"{len(created['in_progress'])} in-progress assessments, {len(created['with_plan'])} action plans "
+        f"in {time.perf_counter() - started:.1f}s ({app_module.app.config['SQLALCHEMY_DATABASE_URI']})"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# cache.py
+"""Pluggable cache for serialized API responses, plus a small TTL cache.
+
+Response cache keys are expected to embed a version (e.g.
+``results:<id>:<version>``), so entries never need explicit invalidation:
+bumping the version simply makes the old entry unreachable until it is
+evicted.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class NullCache:
+    """Cache that stores nothing (RESPONSE_CACHE_BACKEND=none)."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+class LRUCache:
+    """In-process LRU bounded by the total size of the cached values."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = value
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+
+
+class TTLCache:
+    """Per-process LRU of Python objects that also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisCache:
+    """Shared cache in Redis; entries expire after ``ttl`` seconds."""
+
+    def __init__(self, url, ttl=3600, prefix='wol:cache:'):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        try:
+            return self._client.get(self.prefix + key)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache get failed: {e}")
+            return None
+
+    def set(self, key, value):
+        try:
+            self._client.set(self.prefix + key, value, ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache set failed: {e}")
+
+    def delete(self, key):
+        try:
+            self._client.delete(self.prefix + key)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache delete failed: {e}")
+
+
+def make_cache(backend, max_bytes=16 * 1024 * 1024, redis_url=None, ttl=3600):
+    """Build a cache from configuration ('memory', 'redis' or 'none')."""
+    if backend == 'memory':
+        return LRUCache(max_bytes=max_bytes)
+    if backend == 'redis':
+        if not redis_url:
+            raise ValueError("RESPONSE_CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisCache(redis_url, ttl=ttl)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f"Unsupported response cache backend: {backend}")
@@ -0,0 +1,142 @@
+# catalog.py
+"""In-process cache of the question catalog.
+
+Life areas, subcategories and questions are seeded reference data, so each
+worker loads the whole tree once into immutable structures and only goes back
+to the database when the catalog version token changes.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+import brotli
+
+LifeAreaEntry = namedtuple('LifeAreaEntry', ['id', 'name', 'description', 'color', 'icon', 'display_order'])
+SubcategoryEntry = namedtuple('SubcategoryEntry', ['id', 'name', 'description', 'display_order', 'life_area_id'])
+QuestionEntry = namedtuple('QuestionEntry', ['id', 'question_text', 'question_order', 'subcategory_id'])
+
+
+class EncodedPayload:
+    """A JSON document serialized once and kept in every supported encoding."""
+
+    __slots__ = ('identity', 'gzip', 'br', 'etag')
+
+    def __init__(self, payload):
+        self.identity = json.dumps(
+            payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True
+        ).encode('utf-8')
+        self.gzip = gzip.compress(self.identity, compresslevel=9, mtime=0)
+        self.br = brotli.compress(self.identity, mode=brotli.MODE_TEXT)
+        self.etag = hashlib.sha256(self.identity).hexdigest()[:32]
+
+    def etag_for(self, encoding):
+        """Strong validators must differ per content-coding."""
+        return self.etag if encoding == 'identity' else f'{self.etag}-{encoding}'
+
+    def body_for(self, encoding):
+        return getattr(self, encoding)
+
+
+def _group(entries, key):
+    grouped = {}
+    for entry in entries:
+        grouped.setdefault(getattr(entry, key), []).append(entry)
+    return MappingProxyType({k: tuple(v) for k, v in grouped.items()})
+
+
+class Catalog:
+    """Read-only snapshot of the area -> subcategory -> question tree."""
+
+    def __init__(self, version, areas, subcategories, questions):
+        self.version = version
+
+        # Children ordered the same way the per-level endpoints always did
+        self.areas = tuple(sorted(areas, key=lambda a: (a.display_order, a.name)))
+        self.subcategories_by_area = _group(
+            sorted(subcategories, key=lambda s: (s.display_order, s.name)), 'life_area_id')
+        self.questions_by_subcategory = _group(
+            sorted(questions, key=lambda q: (q.question_order, q.id)), 'subcategory_id')
+
+        # Primary key order, used where output historically followed table order
+        self.areas_by_id_order = tuple(sorted(areas, key=lambda a: a.id))
+        self.subcategories_by_id_order = tuple(sorted(subcategories, key=lambda s: s.id))
+
+        self.area_by_id = MappingProxyType({a.id: a for a in areas})
+        self.subcategory_by_id = MappingProxyType({s.id: s for s in subcategories})
+        self.question_by_id = MappingProxyType({q.id: q for q in questions})
+        self.question_ids = frozenset(self.question_by_id)
+
+        self.question_subcategory = MappingProxyType({q.id: q.subcategory_id for q in questions})
+        self.subcategory_area = MappingProxyType({s.id: s.life_area_id for s in subcategories})
+
+        # Questionnaire order: index positions of the compact wire formats (wire.py)
+        self.area_order = tuple(area.id for area in self.areas)
+        self.subcategory_order = tuple(
+            sub.id for area in self.areas for sub in self.subcategories_for(area.id))
+        self.question_order = tuple(
+            q.id for sub_id in self.subcategory_order for q in self.questions_for(sub_id))
+
+        # Pre-serialized payloads for the catalog endpoints
+        self.questionnaire = EncodedPayload({
+            'version': version,
+            'question_order': list(self.question_order),
+            'areas': [dict(area._asdict(), subcategories=[
+                dict(sub._asdict(), questions=[q._asdict() for q in self.questions_for(sub.id)])
+                for sub in self.subcategories_for(area.id)
+            ]) for area in self.areas]
+        })
+        self.life_areas_json = EncodedPayload([area._asdict() for area in self.areas])
+        self.subcategories_json = MappingProxyType({
+            area.id: EncodedPayload([sub._asdict() for sub in self.subcategories_for(area.id)])
+            for area in self.areas
+        })
+        self.questions_json = MappingProxyType({
+            sub.id: EncodedPayload([q._asdict() for q in self.questions_for(sub.id)])
+            for sub in self.subcategories_by_id_order
+        })
+
+    def subcategories_for(self, area_id):
+        return self.subcategories_by_area.get(area_id, ())
+
+    def questions_for(self, subcategory_id):
+        return self.questions_by_subcategory.get(subcategory_id, ())
+
+
+class CatalogCache:
+    """Per-worker holder that reloads the catalog when its version changes.
+
+    ``load_version`` must be cheap (one query); it is called at most once per
+    ``refresh_interval`` seconds. ``load_catalog(version)`` builds a new
+    :class:`Catalog` and is only called when the token differs.
+    """
+
+    def __init__(self, load_catalog, load_version, refresh_interval=60):
+        self._load_catalog = load_catalog
+        self._load_version = load_version
+        self._refresh_interval = refresh_interval
+        self._catalog = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - self._checked_at < self._refresh_interval:
+            return catalog
+
+        with self._lock:
+            if self._catalog is not None and time.monotonic() - self._checked_at < self._refresh_interval:
+                return self._catalog
+
+            version = self._load_version()
+            if self._catalog is None or self._catalog.version != version:
+                self._catalog = self._load_catalog(version)
+            self._checked_at = time.monotonic()
+            return self._catalog
+
+    def invalidate(self):
+        """Force a version check on the next :meth:`get`."""
+        self._checked_at = 0.0
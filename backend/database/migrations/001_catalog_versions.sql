@@ -0,0 +1,7 @@
+-- 001: manual catalog version read by every worker's catalog cache
+-- (`flask bump-catalog-version`). Fresh installs get it from schema.sql.
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    version INT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
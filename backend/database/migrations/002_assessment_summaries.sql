@@ -0,0 +1,18 @@
+-- 002: denormalized dashboard listing rows. After applying, backfill them
+-- with `flask rebuild-summaries`. Fresh installs get it from schema.sql.
+CREATE TABLE IF NOT EXISTS assessment_summaries (
+    assessment_id INT PRIMARY KEY,
+    user_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    status ENUM('in_progress', 'completed') NOT NULL,
+    current_area_index INT NOT NULL DEFAULT 0,
+    response_count INT NOT NULL DEFAULT 0,
+    started_at TIMESTAMP NOT NULL,
+    completed_at TIMESTAMP NULL,
+    area_scores JSON NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (assessment_id) REFERENCES assessments(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_summary_user_started (user_id, started_at, assessment_id),
+    INDEX idx_summary_user_status_completed (user_id, status, completed_at)
+);
@@ -0,0 +1,5 @@
+-- 003: per-assessment version keying the results/action-plan response cache.
+-- Apply once: MySQL has no ADD COLUMN IF NOT EXISTS, so a second run fails
+-- with "Duplicate column name 'version'" and changes nothing.
+-- Fresh installs get it from schema.sql.
+ALTER TABLE assessments ADD COLUMN version INT NOT NULL DEFAULT 1;
@@ -0,0 +1,22 @@
+-- 004: background job queue (async calculate, `flask jobs-worker`).
+-- Fresh installs get it from schema.sql.
+CREATE TABLE IF NOT EXISTS jobs (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    kind VARCHAR(50) NOT NULL,
+    idempotency_key VARCHAR(191) NULL UNIQUE,
+    user_id INT NULL,
+    payload JSON NOT NULL,
+    status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100) NULL,
+    locked_at TIMESTAMP NULL,
+    last_error TEXT NULL,
+    result JSON NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_job_status_run_after (status, run_after, id)
+);
@@ -41,6 +41,14 @@ CREATE TABLE questions (
     FOREIGN KEY (subcategory_id) REFERENCES subcategories(id) ON DELETE CASCADE
 );
 
+-- Manual catalog version, bumped with `flask bump-catalog-version` after
+-- editing questions so every worker reloads its in-memory catalog
+CREATE TABLE catalog_versions (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    version INT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 -- User assessments
 CREATE TABLE assessments (
     id INT PRIMARY KEY AUTO_INCREMENT,
@@ -50,6 +58,7 @@ CREATE TABLE assessments (
     current_area_index INT DEFAULT 0,
     started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     completed_at TIMESTAMP NULL,
+    version INT NOT NULL DEFAULT 1,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
@@ -91,6 +100,25 @@ CREATE TABLE area_scores (
     UNIQUE KEY unique_area_score (assessment_id, life_area_id)
 );
 
+-- Denormalized per-assessment listing rows, maintained by the API on
+-- save/calculate; backfill with `flask rebuild-summaries`
+CREATE TABLE assessment_summaries (
+    assessment_id INT PRIMARY KEY,
+    user_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    status ENUM('in_progress', 'completed') NOT NULL,
+    current_area_index INT NOT NULL DEFAULT 0,
+    response_count INT NOT NULL DEFAULT 0,
+    started_at TIMESTAMP NOT NULL,
+    completed_at TIMESTAMP NULL,
+    area_scores JSON NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (assessment_id) REFERENCES assessments(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_summary_user_started (user_id, started_at, assessment_id),
+    INDEX idx_summary_user_status_completed (user_id, status, completed_at)
+);
+
 -- Action plans
 CREATE TABLE action_plans (
     id INT PRIMARY KEY AUTO_INCREMENT,
@@ -127,6 +155,28 @@ CREATE TABLE action_contribution_points (
     UNIQUE KEY unique_contribution (action_plan_id, life_area_id)
 );
 
+-- Background jobs (flask jobs-worker)
+CREATE TABLE jobs (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    kind VARCHAR(50) NOT NULL,
+    idempotency_key VARCHAR(191) NULL UNIQUE,
+    user_id INT NULL,
+    payload JSON NOT NULL,
+    status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100) NULL,
+    locked_at TIMESTAMP NULL,
+    last_error TEXT NULL,
+    result JSON NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_job_status_run_after (status, run_after, id)
+);
+
 -- Add index for better query performance
 CREATE INDEX idx_action_plan_contribution ON action_contribution_points(action_plan_id);
 CREATE INDEX idx_assessment_user ON assessments(user_id, completed_at DESC);
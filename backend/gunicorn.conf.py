@@ -1,7 +1,22 @@
-bind = "127.0.0.1:5000"
-workers = 4
-worker_class = "sync"
-timeout = 120
+import os
+import shutil
+import tempfile
+
+from dotenv import load_dotenv
+
+# Worker settings may live in the same .env as the app settings
+load_dotenv()
+
+# Worker profile: "sync" (one request per worker), "gthread" (a thread pool
+# per worker) or "gevent" (cooperative greenlets; PyMySQL is pure Python so
+# DB calls yield). The app derives its DB pool size from the same variables.
+bind = os.getenv('GUNICORN_BIND', "127.0.0.1:5000")
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', "sync")
+threads = int(os.getenv('GUNICORN_THREADS', 8 if worker_class == "gthread" else 1))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
 max_requests = 1000
 max_requests_jitter = 50
 user = "wheelapp"
@@ -10,3 +25,19 @@ tmp_upload_dir = None
 errorlog = "/var/log/wheeloflife/gunicorn_error.log"
 accesslog = "/var/log/wheeloflife/gunicorn_access.log"
 loglevel = "info"
+
+# Prometheus metrics are aggregated across workers through files in this
+# directory; it must be set before the app (and prometheus_client) is imported.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'wheeloflife-metrics'))
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to the new ones
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,134 @@
+# importer.py
+"""Streaming parser for bulk assessment imports (flask import-assessments).
+
+Two input formats are accepted, both read one record at a time:
+
+* CSV, one row per response::
+
+      user_email,user_name,assessment_ref,title,started_at,completed_at,question_id,score
+
+  Consecutive rows with the same (user_email, assessment_ref) form one
+  assessment; ``user_name``, ``title`` and ``completed_at`` are optional.
+
+* NDJSON, one assessment per line::
+
+      {"user_email": "...", "started_at": "...", "completed_at": "...",
+       "responses": [{"question_id": 1, "score": 7}, ...]}
+
+  ``responses`` may also be an object mapping question id to score.
+
+Records are validated against the question catalog; invalid ones are
+reported through ``on_error(line, message)`` and skipped.
+"""
+import csv
+import json
+from collections import namedtuple
+from datetime import datetime
+from itertools import groupby
+
+ImportedAssessment = namedtuple('ImportedAssessment', [
+    'line',          # first input line of the record, for error reports
+    'user_email',
+    'user_name',
+    'title',
+    'started_at',
+    'completed_at',  # None imports the assessment as in progress
+    'responses',     # {question_id: score}
+])
+
+CSV_REQUIRED_COLUMNS = ('user_email', 'assessment_ref', 'started_at', 'question_id', 'score')
+
+
+class InvalidRecord(ValueError):
+    """A record that fails validation."""
+
+
+def parse_timestamp(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        raise InvalidRecord(f"{field} inválido: {value!r}")
+
+
+def parse_responses(items, question_ids):
+    responses = {}
+    for question_id, score in items:
+        try:
+            question_id, score = int(question_id), int(score)
+        except (TypeError, ValueError):
+            raise InvalidRecord(f"Resposta inválida: question_id={question_id!r} score={score!r}")
+        if question_id not in question_ids:
+            raise InvalidRecord(f"Pergunta {question_id} não existe")
+        if not 0 <= score <= 10:
+            raise InvalidRecord(f"Pontuação fora do intervalo 0-10: {score}")
+        responses[question_id] = score
+    if not responses:
+        raise InvalidRecord("Avaliação sem respostas")
+    return responses
+
+
+def build_assessment(line, record, items, question_ids):
+    email = (record.get('user_email') or '').strip().lower()
+    if '@' not in email:
+        raise InvalidRecord(f"E-mail inválido: {email!r}")
+
+    started_at = parse_timestamp(record.get('started_at'), 'started_at')
+    if started_at is None:
+        raise InvalidRecord("started_at é obrigatório")
+    completed_at = parse_timestamp(record.get('completed_at'), 'completed_at')
+    if completed_at is not None and completed_at < started_at:
+        raise InvalidRecord("completed_at anterior a started_at")
+
+    return ImportedAssessment(
+        line=line,
+        user_email=email,
+        user_name=(record.get('user_name') or '').strip() or email.split('@')[0],
+        title=(record.get('title') or '').strip() or None,
+        started_at=started_at,
+        completed_at=completed_at,
+        responses=parse_responses(items, question_ids)
+    )
+
+
+def iter_csv(stream, question_ids, on_error):
+    reader = csv.DictReader(stream)
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise InvalidRecord(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+    # Line numbers count the header as line 1
+    rows = ((reader.line_num, row) for row in reader)
+    for _, group in groupby(rows, key=lambda item: (item[1]['user_email'], item[1]['assessment_ref'])):
+        group = list(group)
+        line, first = group[0]
+        try:
+            yield build_assessment(line, first, [(row['question_id'], row['score']) for _, row in group], question_ids)
+        except InvalidRecord as e:
+            on_error(line, str(e))
+
+
+def iter_ndjson(stream, question_ids, on_error):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+            responses = record.get('responses') or []
+            if isinstance(responses, dict):
+                items = list(responses.items())
+            else:
+                items = [(item.get('question_id'), item.get('score')) for item in responses]
+            yield build_assessment(line, record, items, question_ids)
+        except (InvalidRecord, ValueError, AttributeError) as e:
+            on_error(line, str(e))
+
+
+def iter_assessments(stream, input_format, question_ids, on_error):
+    """Yield validated ImportedAssessment records from a text stream."""
+    if input_format == 'csv':
+        return iter_csv(stream, question_ids, on_error)
+    if input_format == 'ndjson':
+        return iter_ndjson(stream, question_ids, on_error)
+    raise ValueError(f"Unsupported import format: {input_format}")
@@ -0,0 +1,184 @@
+# jobs.py
+"""Database-backed background job queue.
+
+Jobs are rows in the ``jobs`` table, so the queue needs no extra service and
+shares backups and transactions with the data it works on:
+
+* ``enqueue_job`` inserts a job, or returns the existing one when a job with
+  the same idempotency key was already submitted.
+* Workers (``flask jobs-worker``) claim jobs with a conditional UPDATE, so
+  any number of worker processes can poll the same table without row locks
+  (works on MySQL and SQLite alike). A claim is a lease: a job whose worker
+  died is picked up again once ``lease_seconds`` have passed.
+* A handler's writes and the job's completion are committed together, and
+  only while the worker still holds the lease; on failure the job is retried
+  with exponential backoff until ``max_attempts`` is reached, then marked
+  ``failed``.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import sqlalchemy.exc
+from sqlalchemy import and_, insert, or_, select, update
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+DEFAULT_MAX_ATTEMPTS = 3
+CLAIM_CANDIDATES = 10  # ids fetched per claim attempt; others may grab some first
+
+
+def retry_delay(attempts: int, base: float = 5, cap: float = 600) -> float:
+    """Seconds to wait before the next attempt (5s, 10s, 20s, ... up to cap)"""
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def get_job(session, table, job_id):
+    row = session.execute(select(table).where(table.c.id == job_id)).first()
+    return dict(row._mapping) if row else None
+
+
+def enqueue_job(session, table, kind, payload, idempotency_key=None, user_id=None,
+                max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Insert and commit a job; returns ``(job, created)``.
+
+    With an idempotency key, a second submission returns the first job
+    instead of creating another one (also under concurrent submissions,
+    through the unique key).
+    """
+    if idempotency_key is not None:
+        existing = session.execute(select(table).where(table.c.idempotency_key == idempotency_key)).first()
+        if existing:
+            return dict(existing._mapping), False
+
+    now = datetime.utcnow()
+    job = {
+        'kind': kind,
+        'idempotency_key': idempotency_key,
+        'user_id': user_id,
+        'payload': payload,
+        'status': 'queued',
+        'attempts': 0,
+        'max_attempts': max_attempts,
+        'run_after': now,
+        'created_at': now,
+        'updated_at': now
+    }
+    try:
+        job['id'] = session.execute(insert(table).values(**job)).inserted_primary_key[0]
+        session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        # Lost the race against a concurrent submission with the same key
+        session.rollback()
+        if idempotency_key is None:
+            raise
+        existing = session.execute(select(table).where(table.c.idempotency_key == idempotency_key)).one()
+        return dict(existing._mapping), False
+    return job, True
+
+
+def retry_job(session, table, job_id):
+    """Queue a failed job again with a fresh attempt budget (caller commits)"""
+    now = datetime.utcnow()
+    session.execute(update(table).where(table.c.id == job_id, table.c.status == 'failed').values(
+        status='queued', attempts=0, run_after=now, last_error=None, finished_at=None, updated_at=now
+    ))
+
+
+def claim_job(session, table, worker_id, lease_seconds, now=None):
+    """Lease the oldest runnable job to ``worker_id``; returns it or None"""
+    now = now or datetime.utcnow()
+    expired = and_(table.c.status == 'running', table.c.locked_at < now - timedelta(seconds=lease_seconds))
+
+    # Expired leases without attempts left will never succeed
+    session.execute(update(table).where(expired, table.c.attempts >= table.c.max_attempts).values(
+        status='failed', last_error='Lease expired', finished_at=now, updated_at=now
+    ))
+
+    runnable = or_(
+        and_(table.c.status == 'queued', table.c.run_after <= now),
+        and_(expired, table.c.attempts < table.c.max_attempts)
+    )
+    candidates = session.execute(
+        select(table.c.id).where(runnable).order_by(table.c.id).limit(CLAIM_CANDIDATES)
+    ).scalars().all()
+    for job_id in candidates:
+        claimed = session.execute(update(table).where(table.c.id == job_id, runnable).values(
+            status='running', locked_by=worker_id, locked_at=now,
+            attempts=table.c.attempts + 1, updated_at=now
+        )).rowcount
+        if claimed:
+            session.commit()
+            return get_job(session, table, job_id)
+    session.commit()
+    return None
+
+
+def lease_held(table, job):
+    """Still running under this claim: the lease did not expire into another worker's hands"""
+    return and_(table.c.id == job['id'], table.c.status == 'running', table.c.locked_by == job['locked_by'])
+
+
+def finish_job(session, table, job, result=None) -> bool:
+    """Mark the job succeeded; False (nothing written) when the lease was lost"""
+    now = datetime.utcnow()
+    return session.execute(update(table).where(lease_held(table, job)).values(
+        status='succeeded', result=result, last_error=None, locked_by=None,
+        finished_at=now, updated_at=now
+    )).rowcount > 0
+
+
+def fail_job(session, table, job, error) -> bool:
+    """Schedule a retry, or mark the job failed when out of attempts.
+
+    False (nothing written) when the lease was lost.
+    """
+    now = datetime.utcnow()
+    if job['attempts'] >= job['max_attempts']:
+        values = {'status': 'failed', 'finished_at': now}
+    else:
+        values = {'status': 'queued', 'run_after': now + timedelta(seconds=retry_delay(job['attempts']))}
+    updated = session.execute(update(table).where(lease_held(table, job)).values(
+        last_error=error[-2000:], locked_by=None, updated_at=now, **values
+    )).rowcount
+    if not updated:
+        logger.warning(f"Job {job['id']} lease lost by {job['locked_by']}; failure not recorded")
+    return updated > 0
+
+
+def run_next_job(session, table, handlers, worker_id, lease_seconds=300) -> bool:
+    """Claim and run one job; returns False when the queue is empty.
+
+    ``handlers`` maps job kind -> ``handler(payload) -> result``.
+    """
+    job = claim_job(session, table, worker_id, lease_seconds)
+    if job is None:
+        return False
+
+    started = time.perf_counter()
+    try:
+        handler = handlers.get(job['kind'])
+        if handler is None:
+            raise LookupError(f"No handler for job kind '{job['kind']}'")
+        result = handler(job['payload'])
+        if not finish_job(session, table, job, result):
+            # Another worker owns the job now: drop this run's writes with it
+            session.rollback()
+            logger.warning(f"Job {job['id']} lease lost by {job['locked_by']}; result discarded")
+            return True
+        session.commit()
+        logger.info(f"Job {job['id']} ({job['kind']}) succeeded in {time.perf_counter() - started:.3f}s")
+    except Exception as e:
+        session.rollback()
+        fail_job(session, table, job, traceback.format_exc())
+        session.commit()
+        logger.error(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']} failed: {e}")
+    return True
@@ -0,0 +1,287 @@
+# metrics.py
+"""Prometheus metrics for the backend.
+
+Exposed on ``/api/metrics`` (text format) for internal scraping only. Under
+gunicorn, PROMETHEUS_MULTIPROC_DIR is set by gunicorn.conf.py before the app
+is imported; every worker then writes its samples to files in that directory
+and a scrape of any worker returns the aggregate across all of them.
+"""
+import functools
+import logging
+import os
+import time
+
+from flask import current_app, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Requests, labelled by Flask endpoint name (bounded, unlike raw paths)
+REQUESTS = Counter(
+    'wol_http_requests_total',
+    'HTTP requests handled',
+    ['method', 'endpoint', 'status']
+)
+REQUEST_SECONDS = Histogram(
+    'wol_http_request_seconds',
+    'Request latency from before_request to after_request',
+    ['method', 'endpoint'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10)
+)
+RESPONSE_BYTES = Histogram(
+    'wol_http_response_bytes',
+    'Response body size (before gzip/brotli done by the proxy)',
+    ['method', 'endpoint'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+
+# SQL, per request and overall
+REQUEST_SQL_STATEMENTS = Histogram(
+    'wol_http_request_sql_statements',
+    'SQL statements executed while handling one request',
+    ['method', 'endpoint'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+REQUEST_SQL_SECONDS = Histogram(
+    'wol_http_request_sql_seconds',
+    'Time spent in SQL statements while handling one request',
+    ['method', 'endpoint'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+SQL_STATEMENTS = Counter(
+    'wol_db_statements_total',
+    'SQL statements executed (including CLI commands and background work)'
+)
+SQL_SECONDS = Counter(
+    'wol_db_statement_seconds_total',
+    'Total time spent executing SQL statements'
+)
+
+QUERY_BUDGET_EXCEEDED = Counter(
+    'wol_query_budget_exceeded_total',
+    'Requests that executed more SQL statements than their route allows',
+    ['endpoint']
+)
+
+# Password hashing pool
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    'wol_password_hash_queue_seconds',
+    'Time a password hash waited for a pool worker',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    'wol_password_hash_seconds',
+    'Time to compute one password hash or verification',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2.5)
+)
+
+# Connection pool
+POOL_CHECKOUT_SECONDS = Histogram(
+    'wol_db_pool_checkout_seconds',
+    'Time to check a connection out of the pool, including the pre-ping',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+)
+POOL_WAIT_SECONDS = Histogram(
+    'wol_db_pool_wait_seconds',
+    'Time spent waiting for a free pooled connection (excludes the pre-ping)',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 20)
+)
+POOL_TIMEOUTS = Counter(
+    'wol_db_pool_timeouts_total',
+    'Checkouts that gave up after pool_timeout'
+)
+POOL_CHECKED_OUT = Gauge(
+    'wol_db_pool_checked_out',
+    'Connections currently checked out of the pool',
+    multiprocess_mode='livesum'
+)
+POOL_OVERFLOW = Gauge(
+    'wol_db_pool_overflow',
+    'Connections open beyond pool_size (negative while the pool is filling)',
+    multiprocess_mode='livesum'
+)
+POOL_SIZE = Gauge(
+    'wol_db_pool_size',
+    'Configured pool_size',
+    multiprocess_mode='livesum'
+)
+POOL_CONNECTIONS = Counter(
+    'wol_db_pool_connections_total',
+    'New DBAPI connections opened by the pool'
+)
+POOL_INVALIDATIONS = Counter(
+    'wol_db_pool_invalidations_total',
+    'Pooled connections invalidated (failed pre-ping, disconnects, recycling)',
+    ['kind']
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait and total checkout time."""
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+        return connection
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def instrument_pool(engine):
+    """Track pool occupancy and invalidations for ``engine``."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    POOL_SIZE.set(pool.size())
+
+    def on_checkout(*args):
+        POOL_CHECKED_OUT.set(pool.checkedout())
+        POOL_OVERFLOW.set(pool.overflow())
+
+    def on_checkin(*args):
+        # Fires before the connection is returned to the queue
+        POOL_CHECKED_OUT.set(max(pool.checkedout() - 1, 0))
+        POOL_OVERFLOW.set(pool.overflow())
+
+    event.listen(pool, 'checkout', on_checkout)
+    event.listen(pool, 'checkin', on_checkin)
+    event.listen(pool, 'connect', lambda *args: POOL_CONNECTIONS.inc())
+    event.listen(pool, 'invalidate', lambda *args: POOL_INVALIDATIONS.labels('hard').inc())
+    event.listen(pool, 'soft_invalidate', lambda *args: POOL_INVALIDATIONS.labels('soft').inc())
+
+
+def observe_request(labels, started, request_g):
+    REQUEST_SECONDS.labels(*labels).observe(time.perf_counter() - started)
+    REQUEST_SQL_STATEMENTS.labels(*labels).observe(request_g.get('metrics_sql_statements', 0))
+    REQUEST_SQL_SECONDS.labels(*labels).observe(request_g.get('metrics_sql_seconds', 0.0))
+
+
+def instrument_app(app, engine):
+    """Record per-request latency, response size and SQL statement metrics."""
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql_statements = 0
+        g.metrics_sql_seconds = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        labels = (request.method, endpoint)
+        REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+        if response.is_streamed:
+            # The body (and its queries) is generated after this hook: record
+            # once it has been sent, from the same g the SQL listeners update
+            request_g = g._get_current_object()
+            response.call_on_close(lambda: observe_request(labels, started, request_g))
+        else:
+            RESPONSE_BYTES.labels(*labels).observe(response.calculate_content_length() or 0)
+            observe_request(labels, started, g)
+        return response
+
+    # One statement runs at a time per connection, so a single start time is
+    # enough; one left by a statement that raised is overwritten by the next
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['metrics_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop('metrics_started')
+        SQL_STATEMENTS.inc()
+        SQL_SECONDS.inc(elapsed)
+        if has_request_context() and 'metrics_sql_statements' in g:
+            g.metrics_sql_statements += 1
+            g.metrics_sql_seconds += elapsed
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a route exceeds its query budget."""
+
+
+def query_budget(max_statements):
+    """Declare the maximum number of SQL statements a route may execute.
+
+    Counts come from instrument_app(). Depending on QUERY_BUDGET_MODE a
+    request over budget is logged ('warn'), raises QueryBudgetExceeded
+    ('strict', for tests and staging) or is ignored ('off').
+
+    A streamed response runs its queries after the view returns, so the
+    check is left to within_query_budget(), which must wrap the generator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            g.query_budget = (func.__name__, max_statements)
+            response = func(*args, **kwargs)
+            if not getattr(response, 'is_streamed', False):
+                check_query_budget(func.__name__, max_statements)
+            return response
+
+        wrapper.query_budget = max_statements
+        return wrapper
+    return decorator
+
+
+def within_query_budget(generator):
+    """Check the route's query budget once a streamed body has been generated.
+
+    Wrap the generator inside stream_with_context(), so the request context
+    is still active when the check runs.
+    """
+    try:
+        yield from generator
+    finally:
+        budget = g.pop('query_budget', None)
+        if budget is not None:
+            check_query_budget(*budget)
+
+
+def check_query_budget(endpoint, max_statements):
+    mode = current_app.config.get('QUERY_BUDGET_MODE', 'warn')
+    statements = g.get('metrics_sql_statements', 0)
+    if mode == 'off' or statements <= max_statements:
+        return
+
+    QUERY_BUDGET_EXCEEDED.labels(endpoint).inc()
+    message = (
+        f"Query budget exceeded: endpoint={endpoint} method={request.method} "
+        f"path={request.path} statements={statements} budget={max_statements}"
+    )
+    if mode == 'strict':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def observe_password_hash(queue_wait, hash_time):
+    """PasswordHashingService observer."""
+    PASSWORD_HASH_QUEUE_SECONDS.observe(queue_wait)
+    PASSWORD_HASH_SECONDS.observe(hash_time)
+
+
+def render_metrics():
+    """Return ``(body, content_type)`` for the metrics endpoint."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
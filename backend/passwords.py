@@ -0,0 +1,349 @@
+# passwords.py
+"""Password hashing service.
+
+Hashers are pluggable (bcrypt, argon2id) and every stored hash carries its
+algorithm and cost parameters, so the cost can be raised at any time: old
+hashes keep verifying and are upgraded on the next successful login.
+
+Hashing is deliberately CPU heavy, so hashes are computed in a small
+process pool instead of on the request thread. Both bounds are host-wide,
+shared by every gunicorn worker through lock files (:class:`HostSlots`):
+at most ``workers`` hashes run at once, and when ``workers + max_pending``
+are already in flight the service fails fast with :class:`PasswordHasherBusy`
+rather than letting logins queue up behind each other and starve ordinary
+API traffic.
+"""
+import fcntl
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import argon2
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated or a hash timed out."""
+
+
+# Slot descriptors held by this process. A forked child (pool processes are
+# forked on demand, possibly while a request holds a slot) would otherwise
+# keep the flock alive for its whole life.
+_held_slots = set()
+_held_slots_lock = threading.Lock()
+
+
+def _close_inherited_slots():
+    global _held_slots_lock
+    # Another thread may have held the lock when the process forked
+    _held_slots_lock = threading.Lock()
+    for fd in _held_slots:
+        os.close(fd)
+    _held_slots.clear()
+
+
+os.register_at_fork(after_in_child=_close_inherited_slots)
+
+
+class HostSlots:
+    """Counting semaphore shared by every process on the host.
+
+    One lock file per slot in ``directory``; holding a slot is holding an
+    exclusive flock on its file. The kernel drops the lock when the holder
+    exits, so a crashed worker never leaks a slot. Every acquire opens the
+    file anew, so threads of one process contend like separate processes.
+    """
+
+    def __init__(self, directory, name, count, poll_interval=0.005):
+        self.directory = directory
+        self.name = name
+        self.count = count
+        self.poll_interval = poll_interval
+
+    def try_acquire(self):
+        """A held slot (to pass to ``release``), or None when all are taken"""
+        os.makedirs(self.directory, exist_ok=True)
+        for index in range(self.count):
+            fd = os.open(os.path.join(self.directory, f'{self.name}-{index}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            with _held_slots_lock:
+                _held_slots.add(fd)
+            return fd
+        return None
+
+    def acquire(self, timeout):
+        """Wait up to ``timeout`` seconds for a slot; None if none freed up"""
+        deadline = time.monotonic() + timeout
+        while True:
+            slot = self.try_acquire()
+            if slot is not None or time.monotonic() >= deadline:
+                return slot
+            time.sleep(self.poll_interval)
+
+    def release(self, slot):
+        with _held_slots_lock:
+            _held_slots.discard(slot)
+        os.close(slot)  # Last descriptor of the lock: the flock goes with it
+
+
+class BcryptHasher:
+    """bcrypt; the cost is stored in the hash itself (``$2b$<rounds>$...``)."""
+
+    algorithm = 'bcrypt'
+    prefixes = ('$2a$', '$2b$', '$2y$')
+
+    def __init__(self, rounds=12):
+        self.rounds = rounds
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)).decode('ascii')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('ascii'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return int(password_hash.split('$')[2]) != self.rounds
+
+    def describe(self) -> dict:
+        return {'algorithm': self.algorithm, 'rounds': self.rounds}
+
+
+class Argon2Hasher:
+    """argon2id; parameters are stored in the PHC string (``m=,t=,p=``)."""
+
+    algorithm = 'argon2id'
+    prefixes = ('$argon2id$',)
+
+    def __init__(self, time_cost=3, memory_cost=65536, parallelism=1):
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=argon2.Type.ID
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            return self._hasher.verify(password_hash, password)
+        except argon2.exceptions.VerifyMismatchError:
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self._hasher.check_needs_rehash(password_hash)
+
+    def describe(self) -> dict:
+        return {
+            'algorithm': self.algorithm,
+            'time_cost': self.time_cost,
+            'memory_cost': self.memory_cost,
+            'parallelism': self.parallelism
+        }
+
+
+def make_hasher(algorithm: str, **params):
+    """Build a hasher by algorithm name ('bcrypt' or 'argon2id')."""
+    if algorithm == 'bcrypt':
+        return BcryptHasher(**params)
+    if algorithm == 'argon2id':
+        return Argon2Hasher(**params)
+    raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+
+
+def _run_in_slot(run_slots, timeout, func, *args):
+    """Wait for a host-wide run slot, then call ``func``; in the pool process"""
+    slot = run_slots.acquire(timeout)
+    if slot is None:
+        raise PasswordHasherBusy('Timed out waiting for a hashing slot')
+    try:
+        started = time.monotonic()
+        result = func(*args)
+        return result, started, time.monotonic()
+    finally:
+        run_slots.release(slot)
+
+
+def _hash(run_slots, timeout, hasher, password):
+    return _run_in_slot(run_slots, timeout, hasher.hash, password)
+
+
+def _verify(run_slots, timeout, hasher, password, password_hash):
+    return _run_in_slot(run_slots, timeout, hasher.verify, password, password_hash)
+
+
+def calibrate(build_hasher, costs, target_ms, samples=3):
+    """Pick the highest cost whose median hash time stays within ``target_ms``.
+
+    ``build_hasher(cost)`` returns a hasher for each candidate in ``costs``
+    (ascending). Returns ``(cost, measured_ms, measurements)``; falls back to
+    the cheapest cost when even that exceeds the target.
+    """
+    measurements = []
+    chosen = None
+    for cost in costs:
+        hasher = build_hasher(cost)
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            hasher.hash('calibration-password')
+            timings.append((time.perf_counter() - started) * 1000)
+        measured = sorted(timings)[len(timings) // 2]
+        measurements.append((cost, measured))
+        if measured > target_ms:
+            break
+        chosen = (cost, measured)
+
+    if chosen is None:
+        chosen = measurements[0]
+    return chosen[0], chosen[1], measurements
+
+
+class PasswordHashingService:
+    """Process pool for password hash/verify calls, bounded host-wide.
+
+    New hashes use ``hasher``; stored hashes are verified with whichever of
+    ``hasher`` or ``legacy_hashers`` produced them.
+
+    ``workers`` hashes run at once and ``max_pending`` more may wait for
+    them, counted across every process that uses the same ``slots_dir``.
+    ``workers=0`` runs hashes inline on the calling thread (development and
+    benchmarks); the limits still apply, with one run slot.
+    """
+
+    def __init__(self, hasher, legacy_hashers=(), workers=2, max_pending=4, timeout=10.0, slots_dir=None):
+        self.hasher = hasher
+        self.hashers = [hasher] + [h for h in legacy_hashers if h.algorithm != hasher.algorithm]
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self.capacity = max(workers, 1) + max_pending
+        slots_dir = slots_dir or os.path.join(tempfile.gettempdir(), 'wheeloflife-password-slots')
+        self.admission_slots = HostSlots(slots_dir, 'admission', self.capacity)
+        self.run_slots = HostSlots(slots_dir, 'run', max(workers, 1))
+        self._in_flight = 0  # This process only; the limits are enforced by the slots
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'completed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'queue_wait_seconds_total': 0.0,
+            'queue_wait_seconds_max': 0.0,
+            'hash_seconds_total': 0.0,
+            'hash_seconds_max': 0.0,
+        }
+        # Callables invoked with (queue_wait, hash_time) after each completed hash
+        self.observers = []
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, self.hasher, password)
+
+    def verify(self, password: str, password_hash) -> bool:
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode('ascii')
+        hasher = self.identify(password_hash)
+        if hasher is None:
+            return False
+        return self._run(_verify, hasher, password, password_hash)
+
+    def identify(self, password_hash: str):
+        """Return the configured hasher that produced ``password_hash``."""
+        for hasher in self.hashers:
+            if password_hash.startswith(hasher.prefixes):
+                return hasher
+        return None
+
+    def needs_rehash(self, password_hash) -> bool:
+        """True when the hash uses another algorithm or outdated parameters."""
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode('ascii')
+        if self.identify(password_hash) is not self.hasher:
+            return True
+        return self.hasher.needs_rehash(password_hash)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self._stats, in_flight=self._in_flight, capacity=self.capacity)
+
+    def _get_executor(self):
+        # Pools do not survive fork, so each gunicorn worker builds its own.
+        # 'fork' keeps children from re-importing the app as __main__.
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('fork')
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, func, *args):
+        ticket = self.admission_slots.try_acquire()
+        if ticket is None:
+            with self._stats_lock:
+                self._stats['rejected'] += 1
+            raise PasswordHasherBusy('Password hashing pool is saturated')
+        with self._stats_lock:
+            self._in_flight += 1
+
+        def release(_future=None):
+            self.admission_slots.release(ticket)
+            with self._stats_lock:
+                self._in_flight -= 1
+
+        submitted = time.monotonic()
+        if self.workers <= 0:
+            try:
+                result, started, finished = func(self.run_slots, self.timeout, *args)
+            finally:
+                release()
+        else:
+            try:
+                future = self._get_executor().submit(func, self.run_slots, self.timeout, *args)
+            except BaseException:
+                release()
+                raise
+            # The slot is freed when the hash really ends: a hash that is
+            # already running cannot be cancelled after a timeout below
+            future.add_done_callback(release)
+            try:
+                result, started, finished = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                self._record(timed_out=True)
+                raise PasswordHasherBusy('Password hashing timed out')
+
+        self._record(queue_wait=max(started - submitted, 0.0), hash_time=finished - started)
+        return result
+
+    def _record(self, queue_wait=None, hash_time=None, timed_out=False):
+        with self._stats_lock:
+            if timed_out:
+                self._stats['timeouts'] += 1
+            else:
+                self._stats['completed'] += 1
+                self._stats['queue_wait_seconds_total'] += queue_wait
+                self._stats['queue_wait_seconds_max'] = max(self._stats['queue_wait_seconds_max'], queue_wait)
+                self._stats['hash_seconds_total'] += hash_time
+                self._stats['hash_seconds_max'] = max(self._stats['hash_seconds_max'], hash_time)
+
+        if queue_wait is not None:
+            for observer in self.observers:
+                observer(queue_wait, hash_time)
@@ -0,0 +1,69 @@
+# scoring.py
+"""Scoring engine for Wheel of Life assessments.
+
+Scores are computed from per-subcategory response totals fetched in a single
+grouped query; everything else (subcategory averages, area averages built from
+the rounded subcategory averages, percentages) is an in-memory reduction over
+the question catalog.
+"""
+from collections import namedtuple
+
+ScoreResult = namedtuple('ScoreResult', [
+    'subcategory_results',  # JSON payload, one dict per answered subcategory
+    'area_results',         # JSON payload, one dict per answered life area
+    'subcategory_scores',   # {subcategory_id: (average_score, percentage)}
+    'area_scores',          # {life_area_id: (average_score, percentage)}
+    'response_count',       # number of responses that were scored
+])
+
+
+def compute_scores(totals, subcategories, life_areas):
+    """Reduce grouped response totals into subcategory and area scores.
+
+    ``totals`` maps ``subcategory_id -> (score_sum, response_count)``.
+    ``subcategories`` and ``life_areas`` are iterated in output order and
+    must expose ``id``/``name`` (plus ``life_area_id`` and ``color``).
+    """
+    subcategory_results = []
+    subcategory_scores = {}
+    for subcategory in subcategories:
+        score_sum, count = totals.get(subcategory.id, (0, 0))
+        if not count:
+            continue
+
+        avg_score = int(score_sum) / int(count)
+        percentage = (avg_score / 10) * 100
+        subcategory_scores[subcategory.id] = (avg_score, percentage)
+        subcategory_results.append({
+            'subcategory_id': subcategory.id,
+            'subcategory_name': subcategory.name,
+            'life_area_id': subcategory.life_area_id,
+            'average_score': round(float(avg_score), 1),
+            'percentage': round(float(percentage), 1)
+        })
+
+    # Area averages are built from the rounded subcategory averages
+    by_area = {}
+    for result in subcategory_results:
+        by_area.setdefault(result['life_area_id'], []).append(result['average_score'])
+
+    area_results = []
+    area_scores = {}
+    for area in life_areas:
+        averages = by_area.get(area.id)
+        if not averages:
+            continue
+
+        area_avg_score = sum(averages) / len(averages)
+        area_percentage = (area_avg_score / 10) * 100
+        area_scores[area.id] = (area_avg_score, area_percentage)
+        area_results.append({
+            'life_area_id': area.id,
+            'life_area_name': area.name,
+            'average_score': round(float(area_avg_score), 1),
+            'percentage': round(float(area_percentage), 1),
+            'color': area.color
+        })
+
+    response_count = sum(int(count) for _, count in totals.values())
+    return ScoreResult(subcategory_results, area_results, subcategory_scores, area_scores, response_count)
@@ -0,0 +1,71 @@
+# serialization.py
+"""JSON encoding for API responses.
+
+``OrjsonProvider`` replaces Flask's stdlib JSON provider for ``jsonify``,
+``request.get_json`` and ``app.json``. datetime and date values are encoded
+natively as ISO 8601 (the same text as ``.isoformat()`` for the naive UTC
+datetimes stored here) and Decimal values from Numeric columns as numbers,
+so payloads can carry model values as they are.
+
+``serializer`` (model instances) and ``row_serializer`` (query rows)
+compile a dict layout once, at import, instead of every route building its
+dicts field by field.
+"""
+import operator
+from decimal import Decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+# Integer keys ({question_id: score}) are written as strings, like json.dumps
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_default(value):
+    """Types orjson does not encode itself"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=encode_default, option=DUMPS_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """Compact UTF-8 output, keys in insertion order"""
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def serializer(*fields):
+    """Compile ``obj -> dict`` for the given fields.
+
+    Each field is an attribute name, or a ``(key, attribute)`` pair to
+    publish it under another key; dotted attributes are followed. Values are
+    not converted: OrjsonProvider encodes datetime, date and Decimal.
+    """
+    keys = tuple(field if isinstance(field, str) else field[0] for field in fields)
+    attributes = [field if isinstance(field, str) else field[1] for field in fields]
+    get = operator.attrgetter(*attributes)
+    if len(keys) == 1:
+        return lambda obj: {keys[0]: get(obj)}
+    return lambda obj: dict(zip(keys, get(obj)))
+
+
+def row_serializer(*keys):
+    """Compile ``row -> dict`` for query rows selected in ``keys`` order.
+
+    Positional: SQLAlchemy rows are tuples, and unpacking them is several
+    times faster than reading each column through a row attribute.
+    """
+    return lambda row: dict(zip(keys, row))
@@ -0,0 +1,40 @@
+# upsert.py
+"""Dialect-aware bulk upsert helper.
+
+Builds a single multi-row ``INSERT ... ON DUPLICATE KEY UPDATE`` (MySQL) or
+``INSERT ... ON CONFLICT DO UPDATE`` (PostgreSQL/SQLite) statement so a whole
+batch of rows is written in one round trip instead of a SELECT + INSERT/UPDATE
+pair per row.
+"""
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+
+def bulk_upsert(session, table, rows, conflict_columns, update_columns):
+    """Insert ``rows`` into ``table`` updating ``update_columns`` on conflict.
+
+    ``conflict_columns`` must match a unique constraint of the table (e.g.
+    ``('assessment_id', 'question_id')`` for ``uq_assessment_question``).
+    Returns the number of rows sent to the database.
+    """
+    if not rows:
+        return 0
+
+    dialect = session.get_bind().dialect.name
+
+    if dialect == 'mysql':
+        stmt = mysql.insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update({
+            column: stmt.inserted[column] for column in update_columns
+        })
+    elif dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    else:
+        raise NotImplementedError(f"Bulk upsert not supported for dialect '{dialect}'")
+
+    session.execute(stmt)
+    return len(rows)
@@ -0,0 +1,70 @@
+# wire.py
+"""Compact wire formats for assessment answers and scores.
+
+Instead of a list of ``{question_id, score}`` objects, answers travel as a
+dense array of scores in catalog question order (``Catalog.question_order``,
+the questionnaire order), tagged with the catalog version it was built for:
+
+* ``application/vnd.wol.scores+json``:
+  ``{"catalog_version": "...", "scores": [7, null, 10, ...]}``
+* ``application/vnd.wol.scores``: one byte per question (0-10, 255 for
+  unanswered); the catalog version travels in the ``X-Catalog-Version``
+  header.
+
+Decoding validates the whole array in one pass, without per-item schema
+objects. Error messages are returned to clients as-is.
+"""
+DENSE_JSON = 'application/vnd.wol.scores+json'
+DENSE_BINARY = 'application/vnd.wol.scores'
+CATALOG_VERSION_HEADER = 'X-Catalog-Version'
+
+MAX_SCORE = 10
+UNANSWERED = 255
+
+
+class WireFormatError(ValueError):
+    """A compact payload that cannot be decoded."""
+
+
+class StaleCatalogVersion(WireFormatError):
+    """The payload was built for another version of the question catalog."""
+
+
+def check_version(version, catalog_version):
+    if version != catalog_version:
+        raise StaleCatalogVersion(version)
+
+
+def encode_dense(values_by_id, order) -> list:
+    """Values in ``order``, None where missing"""
+    return [values_by_id.get(entity_id) for entity_id in order]
+
+
+def encode_binary(answers, question_order) -> bytes:
+    return bytes([answers.get(question_id, UNANSWERED) for question_id in question_order])
+
+
+def decode_dense(scores, question_order) -> dict:
+    """``[score or None, ...]`` -> ``{question_id: score}``"""
+    if not isinstance(scores, list) or len(scores) != len(question_order):
+        raise WireFormatError(f'Esperadas {len(question_order)} pontuações na ordem do catálogo')
+
+    answers = {}
+    for question_id, score in zip(question_order, scores):
+        if score is None:
+            continue
+        if type(score) is not int or not 0 <= score <= MAX_SCORE:
+            raise WireFormatError(f'Pontuação inválida para a pergunta {question_id}')
+        answers[question_id] = score
+    return answers
+
+
+def decode_binary(data: bytes, question_order) -> dict:
+    if len(data) != len(question_order):
+        raise WireFormatError(f'Esperados {len(question_order)} bytes na ordem do catálogo')
+
+    answers = {question_id: score for question_id, score in zip(question_order, data) if score != UNANSWERED}
+    if answers and max(answers.values()) > MAX_SCORE:
+        question_id = next(q for q, score in answers.items() if score > MAX_SCORE)
+        raise WireFormatError(f'Pontuação inválida para a pergunta {question_id}')
+    return answers
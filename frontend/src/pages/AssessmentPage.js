@@ -220,33 +220,24 @@ const AssessmentPage = () => {
 
   const loadAssessmentData = async () => {
     try {
-      // Load assessment details
-      const assessmentResponse = await api.get(`/assessments/${id}`);
-      setAssessment(assessmentResponse.data);
-      setCurrentAreaIndex(assessmentResponse.data.current_area_index || 0);
-      
-      // Load life areas
-      const areasResponse = await api.get('/life-areas');
-      setAreas(areasResponse.data);
+      // Load assessment details, progress and saved answers in one request
+      const resumeResponse = await api.get(`/assessments/${id}/resume`);
+      setAssessment(resumeResponse.data.assessment);
+      setCurrentAreaIndex(resumeResponse.data.current_area_index || 0);
+      setResponses(resumeResponse.data.responses || {});
+
+      // Load the whole questionnaire (areas, subcategories and questions) at once
+      const questionnaireResponse = await api.get('/questionnaire');
+      setAreas(questionnaireResponse.data.areas);
       
       // Initialize wheel data structure
-      const initialWheelData = areasResponse.data.map(area => ({
+      const initialWheelData = questionnaireResponse.data.areas.map(area => ({
         name: area.name,
         value: 0,
         percentage: 0,
         color: area.color
       }));
       setWheelData(initialWheelData);
-      
-      // Load existing responses if any
-      const responsesResponse = await api.get(`/assessments/${id}/responses`);
-      if (responsesResponse.data.responses) {
-        const existingResponses = {};
-        responsesResponse.data.responses.forEach(r => {
-          existingResponses[r.question_id] = r.score;
-        });
-        setResponses(existingResponses);
-      }
     } catch (error) {
       console.error('Error loading assessment data:', error);
       toast.error('Erro ao carregar avaliação');
@@ -276,35 +267,31 @@ const AssessmentPage = () => {
     }
   }, [currentAreaIndex, areas]);
 
-  const loadQuestionsForArea = async (areaId) => {
-    try {
-      const subcategoriesResponse = await api.get(`/life-areas/${areaId}/subcategories`);
-      const allQuestions = [];
-      
-      for (const subcategory of subcategoriesResponse.data) {
-        const questionsResponse = await api.get(`/subcategories/${subcategory.id}/questions`);
-        allQuestions.push({
-          subcategory: subcategory,
-          questions: questionsResponse.data
-        });
-      }
-      
-      setCurrentQuestions(allQuestions);
-      
-      // Apply prefilled responses if available and not already set
-      if (hasPrefilledData && Object.keys(responses).length === 0) {
-        const newResponses = { ...responses };
-        allQuestions.forEach(group => {
-          group.questions.forEach(question => {
-            if (prefilledResponses[question.id] !== undefined && !newResponses[question.id]) {
-              newResponses[question.id] = prefilledResponses[question.id];
-            }
-          });
-        });
-        setResponses(newResponses);
-      }
-    } catch (error) {
+  const loadQuestionsForArea = (areaId) => {
+    const area = areas.find(a => a.id === areaId);
+    if (!area) {
       toast.error('Erro ao carregar perguntas');
+      return;
+    }
+
+    const allQuestions = area.subcategories.map(subcategory => ({
+      subcategory: subcategory,
+      questions: subcategory.questions
+    }));
+    
+    setCurrentQuestions(allQuestions);
+    
+    // Apply prefilled responses if available and not already set
+    if (hasPrefilledData && Object.keys(responses).length === 0) {
+      const newResponses = { ...responses };
+      allQuestions.forEach(group => {
+        group.questions.forEach(question => {
+          if (prefilledResponses[question.id] !== undefined && !newResponses[question.id]) {
+            newResponses[question.id] = prefilledResponses[question.id];
+          }
+        });
+      });
+      setResponses(newResponses);
     }
   };
 
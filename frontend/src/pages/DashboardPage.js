@@ -195,7 +195,9 @@ const DashboardPage = () => {
   const navigate = useNavigate();
   const { logout } = useAuth();
   const [assessments, setAssessments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadAssessments();
@@ -205,6 +207,7 @@ const DashboardPage = () => {
     try {
       const response = await api.get('/user/assessments');
       setAssessments(response.data.assessments);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('Erro ao carregar avaliações');
     } finally {
@@ -212,6 +215,19 @@ const DashboardPage = () => {
     }
   };
 
+  const loadMoreAssessments = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await api.get('/user/assessments', { params: { cursor: nextCursor } });
+      setAssessments(prev => [...prev, ...response.data.assessments]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Erro ao carregar avaliações');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     const date = new Date(dateString);
     return date.toLocaleDateString('pt-BR', {
@@ -371,6 +387,14 @@ const DashboardPage = () => {
           </NewAssessmentCard>
         </AssessmentGrid>
         
+        {nextCursor && (
+          <div style={{ textAlign: 'center', marginBottom: '3rem' }}>
+            <Button className="secondary" onClick={loadMoreAssessments} disabled={loadingMore}>
+              {loadingMore ? 'Carregando...' : 'Carregar mais avaliações'}
+            </Button>
+          </div>
+        )}
+        
         {assessments.filter(a => a.status === 'completed').length >= 2 && (
           <ComparisonSection>
             <h2 style={{ marginBottom: '1rem' }}>Comparar Avaliações</h2>